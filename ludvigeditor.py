@@ -2,32 +2,106 @@ import sys
 import os
 import subprocess
 import socket
+import errno
 import json
 import threading
-import zipfile
-import tempfile
 import shutil
-import importlib.util
+import bisect
+import fnmatch
+import re
+import importlib
+import hashlib
+import codecs
+import time
+import signal
 import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Callable
 from pathlib import Path
-import webbrowser  # Для открытия ссылки на скачивание Git
 
 from PyQt6.QtWidgets import *
-from PyQt6.QtGui import (QAction, QKeySequence, QFileSystemModel, QShortcut, 
-                         QCursor, QIcon, QFont, QPixmap, QColor, QPalette)
+from PyQt6.QtGui import (QAction, QKeySequence, QShortcut, 
+                         QCursor, QIcon, QFont, QPixmap, QColor, QPalette, QPainter,
+                         QDesktopServices, QTextCursor, QTextCharFormat, QImageReader)
 from PyQt6.QtCore import (QUrl, Qt, QDir, QTimer, QThread, pyqtSignal, 
                           QObject, QSettings, QStandardPaths, QSize, 
-                          QMimeData, QByteArray, QBuffer, QIODevice)
-from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineProfile, QWebEngineScript
+                          QMimeData, QByteArray, QBuffer, QIODevice,
+                          QRunnable, QThreadPool, QSocketNotifier,
+                          QAbstractListModel, QAbstractItemModel, QSortFilterProxyModel,
+                          QModelIndex, QEvent, QFileSystemWatcher,
+                          QProcess, QProcessEnvironment)
+
+# ===== Ленивая загрузка QtWebEngine =====
+# QtWebEngine тянет за собой Chromium, поэтому импортируем его при первом обращении
+_WEBENGINE_CLASSES = {
+    'QWebEngineView': 'PyQt6.QtWebEngineWidgets',
+    'QWebEnginePage': 'PyQt6.QtWebEngineCore',
+    'QWebEngineProfile': 'PyQt6.QtWebEngineCore',
+    'QWebEngineScript': 'PyQt6.QtWebEngineCore',
+}
+
+def _webengine(name: str):
+    """Получаем класс QtWebEngine, импортируя модуль при первом обращении"""
+    cls = globals().get(name)
+    if cls is None:
+        cls = getattr(importlib.import_module(_WEBENGINE_CLASSES[name]), name)
+        globals()[name] = cls
+    return cls
+
+def __getattr__(name):
+    # PEP 562: ludvigeditor.QWebEngineView и т.п. доступны снаружи как раньше
+    if name in _WEBENGINE_CLASSES:
+        return _webengine(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ===== Конфигурация =====
 APP_NAME = "LudvigEditor"
 APP_VERSION = "1.0.0" # Текущая версия
 UPDATE_URL = "https://github.com/ludvig2457/LudvigEditor/raw/refs/heads/main/update.txt"
 SETTINGS = QSettings("Ludvig2457", APP_NAME)
+# Папка самого редактора (abspath считается один раз при импорте)
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Сколько хранить найденный путь к Git (сек); отрицательный результат — меньше,
+# чтобы свежеустановленный Git подхватился после перезапуска
+GIT_PATH_CACHE_TTL = 7 * 24 * 60 * 60
+GIT_MISSING_CACHE_TTL = 60 * 60
+
+# Статус Git переиспользуется, пока не изменились .git/index и .git/HEAD,
+# но не дольше этого срока (правки рабочих файлов индекс не трогают)
+GIT_STATUS_CACHE_TTL = 5
+
+# Сколько коммитов показывает окно Git Log (строки подгружаются по мере вывода git log)
+GIT_LOG_LIMIT = 500
+
+# Редактор Monaco: онлайн-версия и сколько (сек) доверять прошлой проверке сети между запусками
+REMOTE_EDITOR_URL = "https://ludvig2457.github.io/editor.html"
+EDITOR_PROBE_TTL = 5 * 60
+# Через сколько мс после старта заранее поднять общий редактор (None - только при открытии файла)
+EDITOR_WARMUP_DELAY = 2000
+
+# Где искать Git, если его нет в PATH (считается один раз при импорте)
+try:
+    _LOGIN = os.getlogin()
+except OSError:
+    _LOGIN = None
+
+_GIT_CANDIDATES = [
+    'C:\\Program Files\\Git\\bin\\git.exe',
+    'C:\\Program Files (x86)\\Git\\bin\\git.exe',
+    'C:\\Program Files\\Git\\cmd\\git.exe',
+]
+if _LOGIN:
+    _GIT_CANDIDATES.append('C:\\Users\\' + _LOGIN + '\\AppData\\Local\\Programs\\Git\\bin\\git.exe')
+
+# Дочерние процессы без консольного окна (флаг есть только на Windows)
+_NO_WINDOW = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+
+# Окружение для git собирается один раз: без необязательных блокировок индекса
+# (фоновый status не мешает git в терминале) и без запросов пароля в консоли
+_GIT_ENV = dict(os.environ, GIT_OPTIONAL_LOCKS='0', GIT_TERMINAL_PROMPT='0')
 
 # ===== Папки расширений =====
 EXT_DIR = os.path.join(QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation), APP_NAME, "extensions")
@@ -39,31 +113,263 @@ EXT_SCRIPTS = os.path.join(EXT_DIR, "scripts")
 for path in [EXT_DIR, EXT_INSTALLED, EXT_STORAGE, EXT_SCRIPTS]:
     os.makedirs(path, exist_ok=True)
 
+# umask читаем один раз при импорте: os.umask меняет его для всего процесса,
+# а временные папки создаются и из фоновых потоков
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def _make_staging_dir() -> str:
+    """Временная папка для установки рядом с расширениями
+    
+    mkdtemp создаёт папку с правами 0700, а она потом переносится на место
+    расширения - выставляем обычные права, как у os.makedirs.
+    """
+    import tempfile
+    
+    staging_dir = tempfile.mkdtemp(prefix='install-', dir=EXT_DIR)
+    os.chmod(staging_dir, 0o777 & ~_UMASK)
+    return staging_dir
+
+# ===== JSON =====
+# orjson необязателен: если установлен, разбор и сериализация идут в C
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_loads(data):
+    """Разбираем JSON из str или bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(obj, indent: bool = False) -> str:
+    """Сериализуем объект в JSON строку (не-ASCII символы не экранируются)"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option).decode('utf-8')
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False)
+
+def _json_dumpb(obj, indent: bool = False) -> bytes:
+    """Сериализуем объект в JSON (UTF-8 байты)"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return _json_dumps(obj, indent).encode('utf-8')
+
+def _json_digest(data: bytes) -> bytes:
+    """Короткий хэш содержимого файла"""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+def _write_json_if_changed(path: str, obj, last_digest: Optional[bytes] = None) -> bytes:
+    """Атомарно пишем JSON, если содержимое отличается от записанного в прошлый раз
+    
+    Возвращает хэш содержимого — его нужно передать при следующем вызове.
+    """
+    data = _json_dumpb(obj, indent=True)
+    digest = _json_digest(data)
+    if digest == last_digest and os.path.exists(path):
+        return digest
+    
+    # Пишем во временный файл рядом и подменяем одним rename
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return digest
+
+# ===== Кэш манифестов =====
+# путь -> ((mtime_ns, size), data); запись устаревает при изменении файла
+_manifest_cache: Dict[str, tuple] = {}
+
+def _load_manifest_raw(manifest_path: str, stat: Optional[os.stat_result] = None) -> dict:
+    """Читаем package.json, повторно не разбирая неизменившийся файл"""
+    if stat is None:
+        stat = os.stat(manifest_path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    
+    cached = _manifest_cache.get(manifest_path)
+    if cached is not None and cached[0] == key:
+        return dict(cached[1])
+    
+    with open(manifest_path, 'rb') as f:
+        data = _json_loads(f.read())
+    if isinstance(data, dict):
+        # Ключи у всех манифестов одни и те же — храним по одной копии строки
+        data = {sys.intern(k): v for k, v in data.items()}
+    _manifest_cache[manifest_path] = (key, data)
+    # Отдаём копию, чтобы вызывающий код не испортил кэш
+    return dict(data)
+
+def _update_manifest_cache(manifest_path: str, data: dict):
+    """Обновляем запись кэша после записи манифеста на диск"""
+    try:
+        stat = os.stat(manifest_path)
+    except OSError:
+        _manifest_cache.pop(manifest_path, None)
+        return
+    _manifest_cache[manifest_path] = ((stat.st_mtime_ns, stat.st_size), dict(data))
+
 # ===== Проверка интернета =====
+INTERNET_CHECK_TTL = 30  # Сколько секунд доверяем последнему результату
+
+_internet_state = {'online': None, 'checked_at': 0.0}
+_internet_probe = None  # Идущая асинхронная проверка
+
+# connect() неблокирующего сокета ещё выполняется (10035 - WSAEWOULDBLOCK)
+_CONNECT_IN_PROGRESS = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN, 10035}
+
+def _cached_internet() -> Optional[bool]:
+    """Последний результат проверки, если он ещё не устарел"""
+    if time.monotonic() - _internet_state['checked_at'] < INTERNET_CHECK_TTL:
+        return _internet_state['online']
+    return None
+
+def _remember_internet(online: bool):
+    _internet_state['online'] = online
+    _internet_state['checked_at'] = time.monotonic()
+
 def check_internet(host="8.8.8.8", port=53, timeout=3):
+    """Блокирующая проверка — в GUI потоке используйте check_internet_async"""
+    online = _cached_internet()
+    if online is not None:
+        return online
     try:
-        socket.setdefaulttimeout(timeout)
-        socket.socket(socket.AF_INET, socket.SOCK_STREAM).connect((host, port))
-        return True
+        with socket.create_connection((host, port), timeout=timeout):
+            online = True
     except Exception:
-        return False
+        online = False
+    _remember_internet(online)
+    return online
+
+def check_internet_async(callback: Callable[[bool], None], host="8.8.8.8", port=53, timeout=3):
+    """Проверяем интернет без блокировки, результат приходит в callback(bool)"""
+    global _internet_probe
+    
+    online = _cached_internet()
+    if online is not None:
+        QTimer.singleShot(0, lambda: callback(online))
+        return
+    
+    # Проверка уже идёт — просто ждём её результата
+    if _internet_probe is not None:
+        _internet_probe['callbacks'].append(callback)
+        return
+    
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    probe = {'callbacks': [callback], 'notifiers': [], 'timer': QTimer()}
+    _internet_probe = probe
+    
+    def finish(online: bool):
+        global _internet_probe
+        if _internet_probe is not probe:
+            return
+        _internet_probe = None
+        probe['timer'].stop()
+        for notifier in probe['notifiers']:
+            notifier.setEnabled(False)
+            notifier.deleteLater()
+        sock.close()
+        _remember_internet(online)
+        for cb in probe['callbacks']:
+            cb(online)
+    
+    def on_ready(*_):
+        finish(sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0)
+    
+    result = sock.connect_ex((host, port))
+    if result not in _CONNECT_IN_PROGRESS:
+        # Соединение (или ошибка) случилось сразу
+        QTimer.singleShot(0, lambda: finish(result == 0))
+        return
+    
+    # Успех приходит как готовность к записи, ошибка на Windows - как исключение
+    for kind in (QSocketNotifier.Type.Write, QSocketNotifier.Type.Exception):
+        notifier = QSocketNotifier(sock.fileno(), kind)
+        notifier.activated.connect(on_ready)
+        probe['notifiers'].append(notifier)
+    
+    probe['timer'].setSingleShot(True)
+    probe['timer'].timeout.connect(lambda: finish(False))
+    probe['timer'].start(int(timeout * 1000))
+
+# ===== Фоновые задачи =====
+class _TaskSignals(QObject):
+    finished = pyqtSignal(object)  # Результат функции
+    failed = pyqtSignal(object)    # Исключение
+
+class BackgroundTask(QRunnable):
+    """Задача для QThreadPool: результат возвращается сигналом в GUI поток"""
+    
+    def __init__(self, fn: Callable, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = _TaskSignals()
+    
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.finished.emit(result)
+
+# Держим сигналы живыми, пока результат не доставлен в GUI поток
+_active_task_signals = set()
+
+def run_in_background(fn: Callable, *args, on_done: Optional[Callable] = None,
+                      on_error: Optional[Callable] = None, **kwargs):
+    """Запускаем fn в общем пуле потоков Qt; колбэки вызываются в GUI потоке"""
+    task = BackgroundTask(fn, *args, **kwargs)
+    signals = task.signals
+    _active_task_signals.add(signals)
+    
+    def deliver(callback, value):
+        _active_task_signals.discard(signals)
+        if callback is not None:
+            callback(value)
+    
+    signals.finished.connect(lambda result: deliver(on_done, result))
+    signals.failed.connect(lambda error: deliver(on_error, error))
+    QThreadPool.globalInstance().start(task)
 
 # ===== Класс манифеста расширения =====
+# Тип расширения по расширению главного файла
+_EXT_TYPES = {'.js': 'js', '.py': 'python'}
+
 class ExtensionManifest:
-    def __init__(self, manifest_path: str):
+    # Экземпляров столько же, сколько расширений — обходимся без __dict__
+    __slots__ = ('manifest_path', '_last_digest', 'name', 'version', 'description',
+                 'author', 'main', 'icon', 'enabled', 'dependencies', 'contributes',
+                 'activation_events', 'extension_dir', 'type', '_dict_cache')
+    
+    def __init__(self, manifest_path: str, data: Optional[dict] = None):
         self.manifest_path = manifest_path
-        self.load()
+        self._last_digest: Optional[bytes] = None  # Хэш последней записи save()
+        self._dict_cache: Optional[dict] = None    # Результат to_dict()
+        self.load(data)
     
-    def load(self):
-        """Загружаем манифест из файла"""
-        try:
-            with open(self.manifest_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except Exception as e:
-            data = {}
-            print(f"Error loading manifest {self.manifest_path}: {e}")
+    def load(self, data: Optional[dict] = None):
+        """Загружаем манифест из файла (или из уже разобранных данных)"""
+        if data is None:
+            try:
+                data = _load_manifest_raw(self.manifest_path)
+            except Exception as e:
+                data = {}
+                print(f"Error loading manifest {self.manifest_path}: {e}")
         
+        self._dict_cache = None
         self.name = data.get('name', 'unknown')
+        if isinstance(self.name, str):
+            # Имя - ключ во всех словарях менеджера
+            self.name = sys.intern(self.name)
         self.version = data.get('version', '1.0.0')
         self.description = data.get('description', '')
         self.author = data.get('author', 'Unknown')
@@ -76,15 +382,11 @@ class ExtensionManifest:
         self.extension_dir = os.path.dirname(self.manifest_path)
         
         # Определяем тип расширения
-        if self.main.endswith('.js'):
-            self.type = 'js'
-        elif self.main.endswith('.py'):
-            self.type = 'python'
-        else:
-            self.type = 'unknown'
+        self.type = _EXT_TYPES.get(os.path.splitext(self.main)[1].lower(), 'unknown')
     
     def save(self):
         """Сохраняем манифест в файл"""
+        self._dict_cache = None
         data = {
             'name': self.name,
             'version': self.version,
@@ -99,8 +401,10 @@ class ExtensionManifest:
         }
         
         try:
-            with open(self.manifest_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            digest = _write_json_if_changed(self.manifest_path, data, self._last_digest)
+            if digest != self._last_digest:
+                self._last_digest = digest
+                _update_manifest_cache(self.manifest_path, data)
             return True
         except Exception as e:
             print(f"Error saving manifest: {e}")
@@ -117,17 +421,29 @@ class ExtensionManifest:
         return None
     
     def to_dict(self) -> dict:
-        """Преобразуем в словарь для отображения"""
-        return {
-            'name': self.name,
-            'version': self.version,
-            'description': self.description,
-            'author': self.author,
-            'enabled': self.enabled,
-            'type': self.type,
-            'path': self.extension_dir,
-            'main': self.main
-        }
+        """Преобразуем в словарь для отображения (кэшируется до load/save)"""
+        if self._dict_cache is None:
+            self._dict_cache = {
+                'name': self.name,
+                'version': self.version,
+                'description': self.description,
+                'author': self.author,
+                'enabled': self.enabled,
+                'type': self.type,
+                'path': self.extension_dir,
+                'main': self.main
+            }
+        return dict(self._dict_cache)
+
+class ExtState:
+    """Состояние загруженного расширения: одна запись вместо трёх словарей"""
+    __slots__ = ('manifest', 'py_module', 'js_code')
+    
+    def __init__(self, manifest: ExtensionManifest, py_module: Any = None,
+                 js_code: Optional[str] = None):
+        self.manifest = manifest
+        self.py_module = py_module
+        self.js_code = js_code
 
 # ===== Менеджер расширений =====
 class ExtensionManager(QObject):
@@ -137,40 +453,136 @@ class ExtensionManager(QObject):
     extension_error = pyqtSignal(str, str)  # Имя расширения, ошибка
     extension_installed = pyqtSignal(str)   # Имя расширения
     extension_uninstalled = pyqtSignal(str) # Имя расширения
+    extensions_scanned = pyqtSignal()       # Фоновый скан завершён
+    extensions_changed = pyqtSignal()       # Список расширений или их состояние изменились
     
     def __init__(self, editor):
         super().__init__()
         self.editor = editor
         self.extensions: Dict[str, ExtensionManifest] = {}
-        self.loaded_extensions: Dict[str, Any] = {}
-        self.python_extensions: Dict[str, Any] = {}
-        self.js_extensions: Dict[str, str] = {}
+        self._sorted_names: List[tuple] = []  # (имя в нижнем регистре, имя) по порядку
+        self._ext_state: Dict[str, ExtState] = {}  # Только загруженные расширения
+        self.js_scripts: Dict[str, Any] = {}  # Имя -> QWebEngineScript в профиле
+        # Код для уже открытых страниц при массовой (пере)загрузке - уходит одним runJavaScript
+        self._view_js_batch: Optional[List[str]] = None
+        
+        # Установка по расширению файла (остальное - одиночный файл)
+        self._file_installers: Dict[str, Callable[[str], bool]] = {
+            '.zip': self.install_from_zip,
+            '.js': self.install_single_file,
+            '.py': self.install_single_file,
+        }
+        self._file_creators: Dict[str, Callable[[str, str], bool]] = {
+            'js': self._create_js_extension,
+            'python': self._create_python_extension,
+        }
         
-        self.load_manifest()
-        self.scan_extensions()
+        # Реестр пишется на диск пачкой: save_manifest() только ставит флаг
+        self._manifest_dirty = False
+        self._manifest_digest: Optional[bytes] = None  # Хэш содержимого manifest.json
+        self._manifest_timer = QTimer(self)
+        self._manifest_timer.setSingleShot(True)
+        self._manifest_timer.setInterval(250)
+        self._manifest_timer.timeout.connect(self.flush_manifest)
+        
+        # Кэш get_extension_list(); extensions_changed - один раз за проход цикла событий
+        self._ext_list_cache: Optional[List[dict]] = None
+        self._changed_timer = QTimer(self)
+        self._changed_timer.setSingleShot(True)
+        self._changed_timer.setInterval(0)
+        self._changed_timer.timeout.connect(self.extensions_changed.emit)
+        # Манифесты читаются в фоне — см. start_async_scan()
+    
+    @property
+    def loaded_extensions(self) -> Dict[str, ExtensionManifest]:
+        """Загруженные расширения (копия, для чтения)"""
+        return {name: st.manifest for name, st in self._ext_state.items()}
+    
+    @property
+    def python_extensions(self) -> Dict[str, Any]:
+        """Модули загруженных Python расширений (копия, для чтения)"""
+        return {name: st.py_module for name, st in self._ext_state.items()
+                if st.py_module is not None}
+    
+    @property
+    def js_extensions(self) -> Dict[str, str]:
+        """Код загруженных JS расширений (копия, для чтения)"""
+        return {name: st.js_code for name, st in self._ext_state.items()
+                if st.js_code is not None}
+    
+    def start_async_scan(self):
+        """Читаем манифесты в фоновом потоке, загружаем расширения — в главном"""
+        run_in_background(
+            lambda: (self._parse_registry(), self._scan_manifests()),
+            on_done=self._on_async_scan_finished,
+            on_error=lambda e: self.editor.log(f"❌ Error scanning extensions: {e}")
+        )
+    
+    def _on_async_scan_finished(self, results):
+        """Применяем результаты фонового скана"""
+        registry, scanned = results
+        self._apply_registry(registry)
+        self._apply_scan(scanned)
+        self.extensions_scanned.emit()
     
     def load_manifest(self):
         """Загружаем манифест расширений"""
-        if os.path.exists(EXT_MANIFEST):
-            try:
-                with open(EXT_MANIFEST, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for ext_path, ext_data in data.items():
-                        if os.path.exists(ext_path):
-                            ext = ExtensionManifest(ext_path)
-                            self.extensions[ext.name] = ext
-            except Exception as e:
-                self.editor.log(f"❌ Error loading manifest: {e}")
+        self._apply_registry(self._parse_registry())
+    
+    @classmethod
+    def _parse_registry(cls):
+        """Разбираем manifest.json и перечисленные в нём package.json (без Qt)
+        
+        Возвращает (хэш файла, [(путь, данные, ошибка), ...]).
+        """
+        try:
+            with open(EXT_MANIFEST, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return None, []
+        except Exception as e:
+            return None, [(EXT_MANIFEST, None, e)]
+        
+        try:
+            data = _json_loads(raw)
+            return _json_digest(raw), [cls._parse_manifest_file(ext_path) for ext_path in data]
+        except Exception as e:
+            return None, [(EXT_MANIFEST, None, e)]
+    
+    def _apply_registry(self, registry):
+        """Регистрируем расширения из реестра (без загрузки)"""
+        digest, parsed = registry
+        self._manifest_digest = digest
+        for manifest_path, data, error in parsed:
+            if error is not None:
+                self.editor.log(f"❌ Error loading manifest: {error}")
+            elif data is not None:
+                ext = ExtensionManifest(manifest_path, data)
+                self._register_extension(ext)
     
     def save_manifest(self):
+        """Помечаем манифест расширений для сохранения (запись через 250 мс)"""
+        self._manifest_dirty = True
+        if not self._manifest_timer.isActive():
+            self._manifest_timer.start()
+        return True
+    
+    def flush_manifest(self):
+        """Сразу записываем манифест, если есть несохранённые изменения"""
+        self._manifest_timer.stop()
+        if not self._manifest_dirty:
+            return True
+        self._manifest_dirty = False
+        return self._write_manifest()
+    
+    def _write_manifest(self):
         """Сохраняем манифест расширений"""
         data = {}
         for ext in self.extensions.values():
             data[ext.manifest_path] = ext.to_dict()
         
         try:
-            with open(EXT_MANIFEST, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self._manifest_digest = _write_json_if_changed(EXT_MANIFEST, data, self._manifest_digest)
             return True
         except Exception as e:
             self.editor.log(f"❌ Error saving manifest: {e}")
@@ -178,42 +590,74 @@ class ExtensionManager(QObject):
     
     def scan_extensions(self):
         """Сканируем папки на наличие расширений"""
-        if not os.path.exists(EXT_INSTALLED):
+        return self._apply_scan(self._scan_manifests())
+    
+    def _scan_manifests(self):
+        """Находим и разбираем package.json установленных расширений (без Qt)"""
+        # scandir отдаёт тип записи из readdir — без лишнего stat на каждую папку
+        try:
+            with os.scandir(EXT_INSTALLED) as entries:
+                candidates = [os.path.join(entry.path, 'package.json')
+                              for entry in entries if entry.is_dir()]
+        except FileNotFoundError:
             return []
         
+        # Читаем и разбираем манифесты параллельно, Qt здесь не трогаем
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(candidates)))) as executor:
+            return list(executor.map(self._parse_manifest_file, candidates))
+    
+    def _apply_scan(self, parsed) -> list:
+        """Создаём манифесты и загружаем включённые расширения (в главном потоке)"""
         extensions_found = []
-        for item in os.listdir(EXT_INSTALLED):
-            ext_path = os.path.join(EXT_INSTALLED, item)
-            manifest_path = os.path.join(ext_path, 'package.json')
+        self._begin_view_js_batch()
+        for manifest_path, data, error in parsed:
+            if error is not None:
+                self.editor.log(f"❌ Error loading extension {manifest_path}: {error}")
+                continue
+            if data is None:
+                continue
             
-            if os.path.exists(manifest_path):
-                try:
-                    ext = ExtensionManifest(manifest_path)
-                    self.extensions[ext.name] = ext
-                    extensions_found.append(ext)
-                    self.editor.log(f"🔍 Found extension: {ext.name} v{ext.version}")
+            try:
+                ext = ExtensionManifest(manifest_path, data)
+                self._register_extension(ext)
+                extensions_found.append(ext)
+                self.editor.log(f"🔍 Found extension: {ext.name} v{ext.version}")
+                
+                # Автозагрузка если включено (в главном потоке — трогает WebView)
+                if ext.enabled:
+                    self.load_extension(ext.name)
                     
-                    # Автозагрузка если включено
-                    if ext.enabled:
-                        self.load_extension(ext.name)
-                        
-                except Exception as e:
-                    self.editor.log(f"❌ Error loading extension {manifest_path}: {e}")
+            except Exception as e:
+                self.editor.log(f"❌ Error loading extension {manifest_path}: {e}")
         
+        self._flush_view_js_batch()
         self.save_manifest()
         return extensions_found
     
+    @staticmethod
+    def _parse_manifest_file(manifest_path: str):
+        """Разбираем package.json в рабочем потоке: (путь, данные, ошибка)"""
+        try:
+            stat = os.stat(manifest_path)
+        except FileNotFoundError:
+            return manifest_path, None, None
+        try:
+            # stat уже есть — кэш манифестов не будет делать его повторно
+            return manifest_path, _load_manifest_raw(manifest_path, stat), None
+        except Exception as e:
+            return manifest_path, None, e
+    
     def install_extension(self, path: str) -> bool:
         """Устанавливаем расширение из файла или папки"""
         try:
-            if os.path.isfile(path) and path.endswith('.zip'):
-                return self.install_from_zip(path)
-            elif os.path.isfile(path):
-                # Одиночный файл (JS или Python)
-                return self.install_single_file(path)
-            elif os.path.isdir(path):
+            if os.path.isdir(path):
                 # Папка с расширением
                 return self.install_from_folder(path)
+            elif os.path.isfile(path):
+                # ZIP архив или одиночный файл (JS или Python)
+                ext = os.path.splitext(path)[1].lower()
+                installer = self._file_installers.get(ext, self.install_single_file)
+                return installer(path)
             else:
                 self.editor.log(f"❌ Invalid path: {path}")
                 return False
@@ -224,21 +668,19 @@ class ExtensionManager(QObject):
     
     def install_from_zip(self, zip_path: str) -> bool:
         """Устанавливаем из ZIP архива"""
-        temp_dir = tempfile.mkdtemp()
+        # Распаковываем рядом с папкой расширений, чтобы перенос был одним rename
+        temp_dir = _make_staging_dir()
         try:
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(temp_dir)
-            
-            # Ищем package.json
-            for root, dirs, files in os.walk(temp_dir):
-                if 'package.json' in files:
-                    success = self.install_from_folder(root)
-                    if success:
-                        self.editor.log(f"✅ Extension installed from ZIP: {zip_path}")
-                        return True
-            
-            self.editor.log(f"❌ No package.json found in ZIP: {zip_path}")
-            return False
+            try:
+                folder = self._extract_zip(zip_path, temp_dir)
+            except ValueError as e:
+                self.editor.log(f"❌ {e}")
+                return False
+            
+            success = self.install_from_folder(folder, move=True)
+            if success:
+                self.editor.log(f"✅ Extension installed from ZIP: {zip_path}")
+            return success
             
         except Exception as e:
             self.editor.log(f"❌ Error extracting ZIP: {e}")
@@ -246,6 +688,93 @@ class ExtensionManager(QObject):
         finally:
             shutil.rmtree(temp_dir, ignore_errors=True)
     
+    @staticmethod
+    def _extract_zip(zip_path: str, temp_dir: str) -> str:
+        """Распаковываем расширение из архива в temp_dir; возвращаем папку с package.json"""
+        import zipfile
+        
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            # Ищем package.json по оглавлению архива, ничего не распаковывая
+            names = zip_ref.namelist()
+            packages = [n for n in names if n == 'package.json' or n.endswith('/package.json')]
+            if not packages:
+                raise ValueError(f"No package.json found in ZIP: {zip_path}")
+            
+            # Самый верхний package.json — корень расширения, берём только его файлы
+            package = min(packages, key=lambda n: n.count('/'))
+            prefix = package[:-len('package.json')]
+            zip_ref.extractall(temp_dir, members=[n for n in names if n.startswith(prefix)])
+        
+        return os.path.normpath(os.path.join(temp_dir, prefix))
+    
+    @staticmethod
+    def _stage_install(path: str) -> tuple:
+        """Тяжёлая часть установки (без Qt, для фонового потока)
+        
+        Папку копируем, архив распаковываем во временную папку рядом с расширениями.
+        Возвращаем (вид, путь для установки, временная папка или None).
+        """
+        is_zip = path.lower().endswith('.zip') and os.path.isfile(path)
+        if not is_zip and not os.path.isdir(path):
+            # Одиночный файл копируется быстро - ставим как обычно
+            return 'file', path, None
+        
+        temp_dir = _make_staging_dir()
+        try:
+            if is_zip:
+                folder = ExtensionManager._extract_zip(path, temp_dir)
+            else:
+                # Имя папки сохраняем: оно - имя расширения, если в package.json его нет
+                folder = os.path.join(temp_dir, os.path.basename(os.path.normpath(path)))
+                shutil.copytree(path, folder, copy_function=shutil.copyfile)
+        except BaseException:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        return 'folder', folder, temp_dir
+    
+    def install_extensions_async(self, paths: List[str], on_finished: Callable[[List[str], List[str]], None]):
+        """Устанавливаем несколько расширений параллельно
+        
+        Копирование и распаковка идут в пуле потоков, регистрация и загрузка -
+        в GUI потоке. on_finished(установленные пути, неудачные пути) вызывается
+        один раз, когда обработаны все пути.
+        """
+        installed: List[str] = []
+        failed: List[str] = []
+        if not paths:
+            on_finished(installed, failed)
+            return
+        
+        def finish_one(path: str, success: bool):
+            (installed if success else failed).append(path)
+            if len(installed) + len(failed) == len(paths):
+                on_finished(installed, failed)
+        
+        def on_staged(path: str, staged: tuple):
+            kind, staged_path, temp_dir = staged
+            try:
+                if kind == 'folder':
+                    success = self.install_from_folder(staged_path, move=True)
+                    if success and path.lower().endswith('.zip'):
+                        self.editor.log(f"✅ Extension installed from ZIP: {path}")
+                else:
+                    success = self.install_extension(staged_path)
+            finally:
+                if temp_dir:
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+            finish_one(path, success)
+        
+        def on_stage_failed(path: str, error: Exception):
+            self.editor.log(f"❌ Installation failed: {error}")
+            finish_one(path, False)
+        
+        for path in paths:
+            run_in_background(
+                self._stage_install, path,
+                on_done=lambda staged, path=path: on_staged(path, staged),
+                on_error=lambda e, path=path: on_stage_failed(path, e)
+            )
+    
     def install_single_file(self, file_path: str) -> bool:
         """Устанавливаем одиночный файл (JS или Python)"""
         filename = os.path.basename(file_path)
@@ -254,13 +783,11 @@ class ExtensionManager(QObject):
         # Ограничиваем имя для безопасности
         name = name.replace(' ', '_').replace('.', '_')[:50]
         
-        if ext.lower() == '.js':
-            return self._create_js_extension(name, file_path)
-        elif ext.lower() == '.py':
-            return self._create_python_extension(name, file_path)
-        else:
+        creator = self._file_creators.get(_EXT_TYPES.get(ext.lower()))
+        if creator is None:
             self.editor.log(f"❌ Unsupported file type: {ext}")
             return False
+        return creator(name, file_path)
     
     def _create_js_extension(self, name: str, js_path: str) -> bool:
         """Создаем JS расширение"""
@@ -290,14 +817,14 @@ class ExtensionManager(QObject):
             # Сохраняем манифест
             manifest_path = os.path.join(ext_dir, 'package.json')
             with open(manifest_path, 'w', encoding='utf-8') as f:
-                json.dump(manifest, f, indent=2)
+                f.write(_json_dumps(manifest, indent=True))
             
             # Копируем JS файл
             shutil.copy2(js_path, os.path.join(ext_dir, os.path.basename(js_path)))
             
             # Загружаем расширение
             ext = ExtensionManifest(manifest_path)
-            self.extensions[ext.name] = ext
+            self._register_extension(ext)
             self.save_manifest()
             
             if ext.enabled:
@@ -335,14 +862,14 @@ class ExtensionManager(QObject):
             # Сохраняем манифест
             manifest_path = os.path.join(ext_dir, 'package.json')
             with open(manifest_path, 'w', encoding='utf-8') as f:
-                json.dump(manifest, f, indent=2)
+                f.write(_json_dumps(manifest, indent=True))
             
             # Копируем Python файл
             shutil.copy2(py_path, os.path.join(ext_dir, os.path.basename(py_path)))
             
             # Загружаем расширение
             ext = ExtensionManifest(manifest_path)
-            self.extensions[ext.name] = ext
+            self._register_extension(ext)
             self.save_manifest()
             
             if ext.enabled:
@@ -356,32 +883,42 @@ class ExtensionManager(QObject):
             self.editor.log(f"❌ Error creating Python extension: {e}")
             return False
     
-    def install_from_folder(self, folder_path: str) -> bool:
-        """Устанавливаем из папки (полное расширение с package.json)"""
-        manifest_path = os.path.join(folder_path, 'package.json')
-        if not os.path.exists(manifest_path):
-            self.editor.log(f"❌ No package.json found in {folder_path}")
-            return False
+    def install_from_folder(self, folder_path: str, move: bool = False) -> bool:
+        """Устанавливаем из папки (полное расширение с package.json)
         
+        move=True - папка временная (распакованный архив) и переносится целиком.
+        """
+        manifest_path = os.path.join(folder_path, 'package.json')
         try:
             # Читаем манифест для получения имени
-            with open(manifest_path, 'r', encoding='utf-8') as f:
-                manifest_data = json.load(f)
+            try:
+                manifest_data = _load_manifest_raw(manifest_path)
+            except FileNotFoundError:
+                self.editor.log(f"❌ No package.json found in {folder_path}")
+                return False
             
             ext_name = manifest_data.get('name', os.path.basename(folder_path))
             dest_dir = os.path.join(EXT_INSTALLED, ext_name)
             
-            # Удаляем старую версию если есть
-            if os.path.exists(dest_dir):
-                shutil.rmtree(dest_dir)
+            if move:
+                staged_dir = folder_path
+            else:
+                # Папку пользователя не трогаем: копируем во временную
+                # папку на том же томе, а на место ставим одним rename
+                staged_dir = _make_staging_dir()
+                shutil.copytree(folder_path, staged_dir,
+                                copy_function=shutil.copyfile, dirs_exist_ok=True)
             
-            # Копируем всю папку
-            shutil.copytree(folder_path, dest_dir)
+            try:
+                self._replace_dir(staged_dir, dest_dir)
+            finally:
+                if not move:
+                    shutil.rmtree(staged_dir, ignore_errors=True)
             
             # Загружаем манифест
             new_manifest_path = os.path.join(dest_dir, 'package.json')
             ext = ExtensionManifest(new_manifest_path)
-            self.extensions[ext.name] = ext
+            self._register_extension(ext)
             self.save_manifest()
             
             if ext.enabled:
@@ -396,6 +933,28 @@ class ExtensionManager(QObject):
             traceback.print_exc()
             return False
     
+    @staticmethod
+    def _replace_dir(src_dir: str, dest_dir: str):
+        """Ставим src_dir на место dest_dir, старую версию убираем после переноса"""
+        import tempfile
+        
+        trash_dir = None
+        if os.path.exists(dest_dir):
+            # Старую версию сначала отодвигаем rename'ом, удаляем в самом конце
+            trash_dir = tempfile.mkdtemp(prefix='old-', dir=EXT_DIR)
+            os.replace(dest_dir, os.path.join(trash_dir, 'ext'))
+        
+        try:
+            # На одном томе это один rename, иначе shutil сам скопирует
+            shutil.move(src_dir, dest_dir)
+        except Exception:
+            if trash_dir:
+                os.replace(os.path.join(trash_dir, 'ext'), dest_dir)
+            raise
+        finally:
+            if trash_dir:
+                shutil.rmtree(trash_dir, ignore_errors=True)
+    
     def load_extension(self, name: str) -> bool:
         """Загружаем расширение"""
         if name not in self.extensions:
@@ -408,7 +967,7 @@ class ExtensionManager(QObject):
             self.editor.log(f"⚠️ Extension disabled: {name}")
             return False
         
-        if name in self.loaded_extensions:
+        if name in self._ext_state:
             self.editor.log(f"⚠️ Extension already loaded: {name}")
             return True
         
@@ -430,22 +989,26 @@ class ExtensionManager(QObject):
     def _load_js_extension(self, ext: ExtensionManifest) -> bool:
         """Загружаем JavaScript расширение"""
         main_path = ext.get_main_path()
-        if not os.path.exists(main_path):
-            self.editor.log(f"❌ Main file not found: {main_path}")
-            return False
-        
         try:
-            with open(main_path, 'r', encoding='utf-8') as f:
-                js_code = f.read()
+            try:
+                with open(main_path, 'r', encoding='utf-8') as f:
+                    js_code = f.read()
+            except FileNotFoundError:
+                self.editor.log(f"❌ Main file not found: {main_path}")
+                return False
             
-            # Сохраняем код расширения
-            self.js_extensions[ext.name] = js_code
+            # Обёртку (с экранированной копией кода) строим один раз на загрузку
+            wrapped = self._wrap_js(ext.name, js_code)
             
-            # Загружаем во все открытые вкладки
-            for view in self.editor.get_all_views():
-                self._inject_js_to_view(view, ext.name, js_code)
+            # Скрипт профиля: Chromium сам внедряет его в каждую загружаемую страницу
+            self._install_profile_script(ext.name, wrapped)
             
-            self.loaded_extensions[ext.name] = ext
+            # Уже загруженные страницы скрипт профиля не затронет — внедряем один раз
+            self._run_in_views(wrapped)
+            
+            # Сохраняем код расширения
+            self._ext_state[ext.name] = ExtState(ext, js_code=js_code)
+            self._mark_extensions_changed()
             self.extension_loaded.emit(ext.name)
             
             self.editor.log(f"✅ JS extension loaded: {ext.name}")
@@ -455,10 +1018,61 @@ class ExtensionManager(QObject):
             self.editor.log(f"❌ Error loading JS extension: {e}")
             return False
     
-    def _inject_js_to_view(self, view, ext_name: str, js_code: str):
-        """Инжектим JS код в WebView"""
-        # Создаем безопасную обертку для кода
-        wrapped_code = f"""
+    def _install_profile_script(self, ext_name: str, wrapped: str):
+        """Регистрируем обёрнутое JS расширение в профиле WebEngine по умолчанию"""
+        QWebEngineScript = _webengine('QWebEngineScript')
+        QWebEngineProfile = _webengine('QWebEngineProfile')
+        
+        script = QWebEngineScript()
+        script.setName(f"ludvig-extension:{ext_name}")
+        script.setSourceCode(wrapped)
+        script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentReady)
+        script.setWorldId(QWebEngineScript.ScriptWorldId.MainWorld)
+        script.setRunsOnSubFrames(False)
+        
+        QWebEngineProfile.defaultProfile().scripts().insert(script)
+        self.js_scripts[ext_name] = script
+    
+    def _remove_profile_script(self, ext_name: str):
+        """Удаляем JS расширение из профиля WebEngine"""
+        script = self.js_scripts.pop(ext_name, None)
+        if script is not None:
+            _webengine('QWebEngineProfile').defaultProfile().scripts().remove(script)
+    
+    def _inject_js_to_view(self, view, wrapped: str):
+        """Инжектим обёрнутый (см. _wrap_js) JS код в WebView"""
+        view.page().runJavaScript(wrapped)
+    
+    def _run_in_views(self, js: str):
+        """Выполняем JS во всех открытых страницах (или копим до _flush_view_js_batch)"""
+        if self._view_js_batch is not None:
+            self._view_js_batch.append(js)
+            return
+        for view in self.editor.get_all_views():
+            self._inject_js_to_view(view, js)
+    
+    def _begin_view_js_batch(self):
+        """Начинаем копить JS для открытых страниц"""
+        if self._view_js_batch is None:
+            self._view_js_batch = []
+    
+    def _flush_view_js_batch(self):
+        """Отдаём накопленный JS каждой странице одним вызовом"""
+        batch, self._view_js_batch = self._view_js_batch, None
+        if batch:
+            # Части передаём строками и разбираем по отдельности через eval:
+            # синтаксическая ошибка в одном расширении не мешает остальным
+            self._run_in_views(
+                f"{_json_dumps(batch)}.forEach(src => {{\n"
+                "    try { (0, eval)(src); }\n"
+                "    catch (e) { console.error('❌ Extension script error:', e); }\n"
+                "});"
+            )
+    
+    @staticmethod
+    def _wrap_js(ext_name: str, js_code: str) -> str:
+        """Оборачиваем код расширения в безопасную обёртку"""
+        return f"""
         (function() {{
             try {{
                 // Регистрируем расширение
@@ -467,7 +1081,7 @@ class ExtensionManager(QObject):
                 }}
                 
                 // Сохраняем оригинальный код
-                window.__ludvigExtensions['{ext_name}'] = {json.dumps(js_code)};
+                window.__ludvigExtensions['{ext_name}'] = {_json_dumps(js_code)};
                 
                 // Выполняем код
                 {js_code}
@@ -478,18 +1092,13 @@ class ExtensionManager(QObject):
             }}
         }})();
         """
-        
-        # Запускаем код в WebView
-        view.page().runJavaScript(wrapped_code)
     
     def _load_python_extension(self, ext: ExtensionManifest) -> bool:
         """Загружаем Python расширение"""
         main_path = ext.get_main_path()
-        if not os.path.exists(main_path):
-            self.editor.log(f"❌ Main file not found: {main_path}")
-            return False
-        
         try:
+            import importlib.util
+            
             # Загружаем Python модуль
             module_name = f"ludvig_extension_{ext.name.replace('-', '_')}"
             spec = importlib.util.spec_from_file_location(module_name, main_path)
@@ -516,13 +1125,21 @@ class ExtensionManager(QObject):
                 module.activate(self.editor.api)
             
             # Сохраняем модуль
-            self.python_extensions[ext.name] = module
-            self.loaded_extensions[ext.name] = ext
+            self._ext_state[ext.name] = ExtState(ext, py_module=module)
+            self._mark_extensions_changed()
             
             self.extension_loaded.emit(ext.name)
             self.editor.log(f"✅ Python extension loaded: {ext.name}")
             return True
             
+        except FileNotFoundError as e:
+            # Файл открывает сам загрузчик при exec_module
+            if e.filename == main_path:
+                self.editor.log(f"❌ Main file not found: {main_path}")
+            else:
+                self.editor.log(f"❌ Error loading Python extension: {e}")
+                traceback.print_exc()
+            return False
         except Exception as e:
             self.editor.log(f"❌ Error loading Python extension: {e}")
             traceback.print_exc()
@@ -530,36 +1147,34 @@ class ExtensionManager(QObject):
     
     def unload_extension(self, name: str) -> bool:
         """Выгружаем расширение"""
-        if name not in self.loaded_extensions:
+        state = self._ext_state.get(name)
+        if state is None:
             return False
         
-        ext = self.loaded_extensions[name]
+        ext = state.manifest
         
         try:
             if ext.type == 'js':
-                # Удаляем из всех вкладок
-                for view in self.editor.get_all_views():
-                    view.page().runJavaScript(f"""
-                        if (window.__ludvigExtensions && window.__ludvigExtensions['{name}']) {{
-                            delete window.__ludvigExtensions['{name}'];
-                            console.log('Extension unloaded: {name}');
-                        }}
-                    """)
+                # Новые страницы больше не получат скрипт
+                self._remove_profile_script(name)
                 
-                # Удаляем из кэша
-                if name in self.js_extensions:
-                    del self.js_extensions[name]
+                # Удаляем из всех вкладок
+                self._run_in_views(f"""
+                    if (window.__ludvigExtensions && window.__ludvigExtensions['{name}']) {{
+                        delete window.__ludvigExtensions['{name}'];
+                        console.log('Extension unloaded: {name}');
+                    }}
+                """)
                     
             elif ext.type == 'python':
                 # Вызываем deactivate если есть
-                if name in self.python_extensions:
-                    module = self.python_extensions[name]
-                    if hasattr(module, 'deactivate'):
-                        module.deactivate()
-                    del self.python_extensions[name]
-            
-            # Удаляем из загруженных
-            del self.loaded_extensions[name]
+                module = state.py_module
+                if module is not None and hasattr(module, 'deactivate'):
+                    module.deactivate()
+            
+            # Удаляем из загруженных (вместе с кодом и модулем)
+            del self._ext_state[name]
+            self._mark_extensions_changed()
             self.extension_unloaded.emit(name)
             
             self.editor.log(f"✅ Extension unloaded: {name}")
@@ -577,6 +1192,7 @@ class ExtensionManager(QObject):
         ext = self.extensions[name]
         ext.enabled = not ext.enabled
         ext.save()
+        self._mark_extensions_changed()
         
         if ext.enabled:
             success = self.load_extension(name)
@@ -597,7 +1213,7 @@ class ExtensionManager(QObject):
         ext = self.extensions[name]
         
         # Выгружаем если загружено
-        if name in self.loaded_extensions:
+        if name in self._ext_state:
             self.unload_extension(name)
         
         # Удаляем папку расширения
@@ -607,13 +1223,8 @@ class ExtensionManager(QObject):
                 shutil.rmtree(ext_dir, ignore_errors=True)
             
             # Удаляем из списков
-            del self.extensions[name]
-            if name in self.loaded_extensions:
-                del self.loaded_extensions[name]
-            if name in self.js_extensions:
-                del self.js_extensions[name]
-            if name in self.python_extensions:
-                del self.python_extensions[name]
+            self._unregister_extension(name)
+            self._ext_state.pop(name, None)
             
             # Сохраняем манифест
             self.save_manifest()
@@ -626,35 +1237,63 @@ class ExtensionManager(QObject):
             self.editor.log(f"❌ Error uninstalling extension: {e}")
             return False
     
+    def _register_extension(self, ext: ExtensionManifest):
+        """Добавляем расширение в реестр, сохраняя порядок по имени"""
+        if ext.name not in self.extensions:
+            bisect.insort(self._sorted_names, (str(ext.name).lower(), ext.name))
+        self.extensions[ext.name] = ext
+        self._mark_extensions_changed()
+    
+    def _unregister_extension(self, name: str):
+        """Убираем расширение из реестра"""
+        if self.extensions.pop(name, None) is None:
+            return
+        self._mark_extensions_changed()
+        key = (str(name).lower(), name)
+        index = bisect.bisect_left(self._sorted_names, key)
+        if index < len(self._sorted_names) and self._sorted_names[index] == key:
+            del self._sorted_names[index]
+    
+    def _mark_extensions_changed(self):
+        """Сбрасываем кэш списка и откладываем сигнал extensions_changed"""
+        self._ext_list_cache = None
+        self._changed_timer.start()
+    
     def get_extension_list(self) -> List[dict]:
-        """Получаем список всех расширений"""
-        result = []
-        for name, ext in self.extensions.items():
-            ext_dict = ext.to_dict()
-            ext_dict['loaded'] = name in self.loaded_extensions
-            ext_dict['has_errors'] = False  # Можно добавить проверку ошибок
-            result.append(ext_dict)
-        
-        # Сортируем по имени
-        result.sort(key=lambda x: x['name'].lower())
-        return result
+        """Получаем список всех расширений (уже отсортирован по имени)
+        
+        Словари общие с кэшем - не изменяйте их.
+        """
+        if self._ext_list_cache is None:
+            result = []
+            for _, name in self._sorted_names:
+                ext_dict = self.extensions[name].to_dict()
+                ext_dict['loaded'] = name in self._ext_state
+                ext_dict['has_errors'] = False  # Можно добавить проверку ошибок
+                result.append(ext_dict)
+            self._ext_list_cache = result
+        return list(self._ext_list_cache)
     
     def reload_all_extensions(self):
         """Перезагружаем все расширения"""
-        loaded = list(self.loaded_extensions.keys())
-        for name in loaded:
-            self.unload_extension(name)
-        
-        for name, ext in self.extensions.items():
-            if ext.enabled:
-                self.load_extension(name)
+        self._begin_view_js_batch()
+        try:
+            loaded = list(self._ext_state)
+            for name in loaded:
+                self.unload_extension(name)
+            
+            for name, ext in self.extensions.items():
+                if ext.enabled:
+                    self.load_extension(name)
+        finally:
+            self._flush_view_js_batch()
     
     def reload_extension(self, name: str) -> bool:
         """Перезагружаем конкретное расширение"""
         if name not in self.extensions:
             return False
         
-        was_loaded = name in self.loaded_extensions
+        was_loaded = name in self._ext_state
         
         if was_loaded:
             self.unload_extension(name)
@@ -665,6 +1304,107 @@ class ExtensionManager(QObject):
         return True
     
 # ===== GIT Менеджер (без зависимостей) =====
+# Код статуса git (байты вывода porcelain) -> тип изменения (остальные - изменение)
+_CHANGE_TYPES = {b'M': 'modified', b'A': 'added', b'D': 'deleted', b'R': 'renamed'}
+
+# Число полей перед путём в записях porcelain v2: у "2" ещё оценка
+# переименования, у "u" (конфликт) - три режима и три хэша
+_STATUS_FIELDS = {b'1': 8, b'2': 9, b'u': 10}
+
+class GitResult(dict):
+    """Результат Git команды: stdout/stderr декодируются при первом обращении"""
+    
+    def __missing__(self, key):
+        if key in ('stdout', 'stderr'):
+            raw = dict.get(self, f'{key}_bytes') or b''
+            value = raw.decode('utf-8', errors='ignore').strip()
+            self[key] = value
+            return value
+        if key == 'error' and not dict.get(self, 'success', True):
+            # Git сообщает об ошибке в stderr
+            value = self['stderr'] or f"Git завершился с кодом {dict.get(self, 'returncode')}"
+            self[key] = value
+            return value
+        raise KeyError(key)
+    
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+# Поля и коммиты разделены NUL - в тексте коммита его быть не может.
+# Файлы коммитов приходят в том же выводе: один процесс на всю историю
+_GIT_LOG_ARGS = ('log', '--pretty=format:%H%x00%an%x00%ad%x00%s', '--date=short', '--name-only', '-z')
+
+class _GitLogParser:
+    """Разбор вывода git log (_GIT_LOG_ARGS); данные можно подавать кусками"""
+    
+    # Тема коммита однострочная: файлы идут после неё через "\n", каждый
+    # заканчивается NUL, пустое поле закрывает список. Без файлов за темой
+    # сразу следует хэш следующего коммита
+    __slots__ = ('_tail', '_fields', '_commit')
+    
+    def __init__(self):
+        self._tail = b''      # Незаконченное поле из прошлого куска
+        self._fields = []     # Хэш, автор, дата текущего коммита
+        self._commit = None   # Коммит, список файлов которого ещё читается
+    
+    @classmethod
+    def parse(cls, output: bytes) -> List[dict]:
+        """Весь вывод сразу"""
+        parser = cls()
+        return parser.feed(output) + parser.close()
+    
+    def feed(self, data: bytes) -> List[dict]:
+        """Очередной кусок вывода -> коммиты, которые в нём закончились"""
+        fields = (self._tail + data).split(b'\0')
+        self._tail = fields.pop()
+        done = []
+        for field in fields:
+            self._add_field(field.decode('utf-8', errors='replace'), done)
+        return done
+    
+    def close(self) -> List[dict]:
+        """Конец вывода -> оставшиеся коммиты"""
+        done = []
+        if self._tail:
+            self._add_field(self._tail.decode('utf-8', errors='replace'), done)
+            self._tail = b''
+        if self._commit is not None:
+            done.append(self._commit)
+            self._commit = None
+        return done
+    
+    def _add_field(self, field: str, done: List[dict]):
+        if self._commit is not None:
+            if field:
+                self._commit['files'].append(field)
+            else:
+                done.append(self._commit)
+                self._commit = None
+            return
+        if not field and not self._fields:
+            return
+        self._fields.append(field)
+        if len(self._fields) < 4:
+            return
+        
+        commit_hash, author, date, subject = self._fields
+        self._fields = []
+        message, newline, first_file = subject.partition('\n')
+        commit = {
+            'hash': commit_hash[:7],
+            'message': message.strip(),
+            'author': author.strip(),
+            'date': date.strip(),
+            'files': [first_file] if newline else []
+        }
+        if newline:
+            self._commit = commit
+        else:
+            done.append(commit)
+
 class GitManager(QObject):
     """Менеджер Git интеграции с graceful degradation"""
     
@@ -674,32 +1414,128 @@ class GitManager(QObject):
     git_commit_made = pyqtSignal(str, str)
     git_error = pyqtSignal(str, str)
     git_not_installed = pyqtSignal()  # Новый сигнал
+    git_ready = pyqtSignal(bool)      # Поиск Git завершён (установлен ли)
+    git_info_ready = pyqtSignal(str, dict, list, list)  # Путь, статус, ветки, история
     
     def __init__(self, editor):
         super().__init__()
         self.editor = editor
-        self.git_installed = False
+        self._git_installed = False
+        self.git_probed = False
         self.git_path = None
         self.user_declined_git = False  # Флаг, что пользователь отказался
-        self._init_git()
+        # repo_root -> (ключ файлов .git, время, статус)
+        self._status_cache: Dict[str, tuple] = {}
+        # repo_root -> (хэш HEAD, limit, история): история меняется только вместе с HEAD
+        self._history_cache: Dict[str, tuple] = {}
+        # repo_root -> хэш последнего отправленного статуса
+        self._last_status_hash: Dict[str, int] = {}
+        # repo_root -> постоянный "git cat-file --batch-check" для разрешения ревизий
+        self._batch_procs: Dict[str, subprocess.Popen] = {}
+        self._batch_lock = threading.Lock()
+        # путь -> корень репозитория (только найденные корни)
+        self._root_cache: Dict[str, str] = {}
+        self._root_lock = threading.Lock()  # Кэш корней читают и потоки refresh_all
+        # корень репозитория -> папка git (у worktree и подмодулей .git - файл)
+        self._git_dirs: Dict[str, str] = {}
+        # Для параллельного чтения статуса, веток и истории (см. refresh_all)
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='git')
+        # Папки git прочитанных репозиториев под наблюдением: index и HEAD git
+        # заменяет через переименование *.lock, это видно как изменение папки.
+        # папка git -> (repo_root, путь последнего запроса статуса)
+        self._git_watcher = QFileSystemWatcher(self)
+        self._git_watcher.directoryChanged.connect(self._on_git_dir_changed)
+        self._watched_git_dirs: Dict[str, tuple] = {}
+        self._dirty_git_dirs = set()
+        # Серия записей одной git команды - одно перечитывание статуса
+        self._status_refresh_timer = QTimer(self)
+        self._status_refresh_timer.setSingleShot(True)
+        self._status_refresh_timer.setInterval(50)
+        self._status_refresh_timer.timeout.connect(self._refresh_dirty_status)
+        # Сигнал может прийти из фонового потока — QSettings трогаем уже в GUI потоке
+        self.git_not_installed.connect(self._forget_git_executable)
+        self._init_git_async()
+    
+    @property
+    def git_installed(self) -> bool:
+        """Установлен ли Git (если фоновый поиск не завершён — ищем сразу)"""
+        if not self.git_probed:
+            self._init_git()
+        return self._git_installed
     
     def _init_git(self):
-        """Инициализация Git (без ошибок)"""
+        """Инициализация Git (без ошибок, синхронно)"""
         try:
-            self.git_path = self._find_git_executable()
-            self.git_installed = self.git_path is not None
-        except:
-            self.git_installed = False
+            git_path = self._find_git_executable()
+        except Exception:
+            git_path = None
+        self._set_git_path(git_path)
+    
+    def _init_git_async(self):
+        """Ищем Git в фоновом потоке, чтобы не блокировать показ окна"""
+        found, git_path = self._cached_git_executable()
+        if found:
+            self._set_git_path(git_path)
+            # Сигнал отправляем из цикла событий, когда подписчики уже подключены
+            QTimer.singleShot(0, lambda: self.git_ready.emit(self._git_installed))
+            return
+        
+        run_in_background(self._probe_git_executable,
+                          on_done=self._on_git_probe_finished,
+                          on_error=lambda e: self._on_git_probe_finished(None))
+    
+    def _on_git_probe_finished(self, git_path):
+        """Результат фонового поиска Git"""
+        if not self.git_probed:  # Синхронный поиск мог успеть раньше
+            self._store_git_executable(git_path)
+            self._set_git_path(git_path)
+        self.git_ready.emit(self._git_installed)
+    
+    def _set_git_path(self, git_path):
+        self.git_path = git_path
+        self._git_installed = git_path is not None
+        self.git_probed = True
     
     def _find_git_executable(self):
-        """Находим путь к git.exe"""
-        possible_paths = [
-            'git',  # Если в PATH
-            'C:\\Program Files\\Git\\bin\\git.exe',
-            'C:\\Program Files (x86)\\Git\\bin\\git.exe',
-            'C:\\Program Files\\Git\\cmd\\git.exe',
-            'C:\\Users\\' + os.getlogin() + '\\AppData\\Local\\Programs\\Git\\bin\\git.exe',
-        ]
+        """Находим путь к git.exe (результат кэшируется в настройках по хэшу PATH)"""
+        found, git_path = self._cached_git_executable()
+        if found:
+            return git_path
+        
+        git_path = self._probe_git_executable()
+        self._store_git_executable(git_path)
+        return git_path
+    
+    def _git_cache_key(self) -> str:
+        path_hash = hashlib.md5(os.environ.get('PATH', '').encode('utf-8')).hexdigest()
+        return f"git/exe/{path_hash}"
+    
+    def _cached_git_executable(self):
+        """Читаем путь к Git из настроек: (найден ли в кэше, путь)"""
+        cache_key = self._git_cache_key()
+        cached_path = SETTINGS.value(f"{cache_key}/path")
+        checked_at = SETTINGS.value(f"{cache_key}/checked_at", 0, type=float)
+        if cached_path is not None:
+            ttl = GIT_PATH_CACHE_TTL if cached_path else GIT_MISSING_CACHE_TTL
+            if time.time() - checked_at < ttl:
+                if not cached_path:
+                    return True, None
+                if cached_path == 'git' or os.path.exists(cached_path):
+                    return True, cached_path
+        return False, None
+    
+    def _store_git_executable(self, git_path):
+        """Запоминаем результат поиска Git (только из GUI потока — QSettings)"""
+        cache_key = self._git_cache_key()
+        SETTINGS.setValue(f"{cache_key}/path", git_path or '')
+        SETTINGS.setValue(f"{cache_key}/checked_at", time.time())
+    
+    def _probe_git_executable(self):
+        """Перебираем возможные пути и запускаем git --version"""
+        # Сначала PATH, остальные пути - только если файл существует
+        in_path = shutil.which('git')
+        possible_paths = [in_path] if in_path else []
+        possible_paths += [p for p in _GIT_CANDIDATES if os.path.isfile(p)]
         
         for path in possible_paths:
             try:
@@ -707,7 +1543,7 @@ class GitManager(QObject):
                     [path, '--version'],
                     capture_output=True,
                     text=True,
-                    creationflags=subprocess.CREATE_NO_WINDOW,
+                    creationflags=_NO_WINDOW,
                     timeout=2
                 )
                 if result.returncode == 0 and 'git version' in result.stdout:
@@ -717,37 +1553,179 @@ class GitManager(QObject):
         
         return None
     
-    def _run_git_command(self, cwd: str, *args) -> dict:
-        """Выполняет Git команду с обработкой отсутствия Git"""
+    def _run_git_command(self, cwd: str, *args, input_bytes: Optional[bytes] = None) -> GitResult:
+        """Выполняет Git команду с обработкой отсутствия Git (input_bytes - данные для stdin)"""
         if not self.git_installed:
             # Если пользователь еще не отказывался, предлагаем установить
             if not self.user_declined_git:
                 self._offer_git_installation()
-            return {'success': False, 'error': 'Git не установлен'}
+            return GitResult(success=False, error='Git не установлен')
         
         try:
             cmd = [self.git_path] + list(args)
+            # Вывод оставляем байтами: декодируется только то, что прочитают
+            stdin_kwargs = {'input': input_bytes} if input_bytes is not None else {'stdin': subprocess.DEVNULL}
             result = subprocess.run(
                 cmd,
                 cwd=cwd,
                 capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='ignore',
-                creationflags=subprocess.CREATE_NO_WINDOW,
+                check=False,
+                **stdin_kwargs,
+                env=_GIT_ENV,
+                creationflags=_NO_WINDOW,
                 timeout=30
             )
             
-            return {
-                'success': result.returncode == 0,
-                'stdout': result.stdout.strip(),
-                'stderr': result.stderr.strip(),
-                'returncode': result.returncode
-            }
+            return GitResult(
+                success=result.returncode == 0,
+                stdout_bytes=result.stdout,
+                stderr_bytes=result.stderr,
+                returncode=result.returncode
+            )
         except subprocess.TimeoutExpired:
-            return {'success': False, 'error': 'Таймаут выполнения команды'}
+            return GitResult(success=False, error='Таймаут выполнения команды')
+        except FileNotFoundError as e:
+            if self.git_path and not os.path.isfile(self.git_path):
+                # Git удалили во время работы — кэшированный результат больше не верен
+                self._git_installed = False
+                self.git_path = None
+                self.git_not_installed.emit()
+                return GitResult(success=False, error='Git не установлен')
+            return GitResult(success=False, error=str(e))
         except Exception as e:
-            return {'success': False, 'error': str(e)}
+            return GitResult(success=False, error=str(e))
+    
+    def _forget_git_executable(self):
+        """Сбрасываем сохранённый путь к Git (GUI поток, сигнал git_not_installed)"""
+        self._store_git_executable(None)
+    
+    def _batch_process(self, repo_root: str) -> subprocess.Popen:
+        """Постоянный процесс cat-file для репозитория (запускается один раз)"""
+        proc = self._batch_procs.get(repo_root)
+        if proc is None or proc.poll() is not None:
+            proc = subprocess.Popen(
+                [self.git_path, 'cat-file', '--batch-check'],
+                cwd=repo_root,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                env=_GIT_ENV,
+                creationflags=_NO_WINDOW
+            )
+            self._batch_procs[repo_root] = proc
+        return proc
+    
+    def _close_batch_process(self, repo_root: str):
+        """Завершаем процесс cat-file репозитория"""
+        proc = self._batch_procs.pop(repo_root, None)
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=1)
+        except Exception:
+            proc.kill()
+    
+    # Сколько (сек) ждём ответа cat-file, прежде чем считать процесс зависшим
+    _BATCH_TIMEOUT = 5
+    
+    def _read_batch_line(self, proc: subprocess.Popen) -> tuple:
+        """Строка ответа cat-file: (строка, истёк ли таймаут)
+        
+        Зависший процесс убиваем по таймеру - readline тогда вернёт b''.
+        """
+        expired = threading.Event()
+        
+        def kill():
+            expired.set()
+            proc.kill()
+        
+        watchdog = threading.Timer(self._BATCH_TIMEOUT, kill)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            line = proc.stdout.readline()
+        finally:
+            watchdog.cancel()
+        return line, expired.is_set()
+    
+    def resolve_object(self, repo_root: str, rev: str) -> Optional[str]:
+        """Полный хэш объекта (HEAD, ветка, тег...) без запуска нового процесса git"""
+        if not self.git_installed or '\n' in rev:
+            return None
+        
+        timed_out = False
+        with self._batch_lock:
+            line = b''
+            # Вторая попытка - если процесс умер (например, .git пересоздан)
+            for _ in range(2):
+                try:
+                    proc = self._batch_process(repo_root)
+                    proc.stdin.write(rev.encode('utf-8') + b'\n')
+                    proc.stdin.flush()
+                    line, timed_out = self._read_batch_line(proc)
+                except OSError:
+                    line = b''
+                if line:
+                    break
+                self._close_batch_process(repo_root)
+                if timed_out:
+                    break  # Повтор завис бы так же
+        
+        if timed_out:
+            # Разовый rev-parse с обычным таймаутом _run_git_command
+            result = self._run_git_command(repo_root, 'rev-parse', '--verify', '--quiet',
+                                           f'{rev}^{{object}}')
+            if not result['success']:
+                return None
+            return result['stdout'] or None
+        
+        # Ответ: "<хэш> <тип> <размер>" или "<rev> missing"
+        parts = line.split()
+        if len(parts) < 3:
+            return None
+        return parts[0].decode('ascii')
+    
+    def refresh_all(self, path: str, history_limit: int = 20):
+        """Читаем статус, ветки и историю параллельно
+        
+        Результат приходит в GUI поток сигналами git_status_changed и git_info_ready.
+        """
+        if not self.git_installed:
+            return
+        # Корень ищем здесь, чтобы потоки взяли его из кэша
+        if not self.get_repo_root(path):
+            status = {'is_git': False}
+            self.git_info_ready.emit(path, status, [], [])
+            return
+        
+        def collect():
+            futures = [
+                self._pool.submit(self._read_status, path),
+                self._pool.submit(self.get_branches, path),
+                self._pool.submit(self.get_history, path, history_limit),
+            ]
+            return tuple(future.result() for future in futures)
+        
+        run_in_background(
+            collect,
+            on_done=lambda results: self._on_refresh_finished(path, *results),
+            on_error=lambda e: self.git_error.emit(path, str(e))
+        )
+    
+    def _on_refresh_finished(self, path: str, status: dict, branches: list, history: list):
+        """Отдаём результаты refresh_all (уже в GUI потоке)"""
+        self._watch_repo(path, status)
+        if self._status_changed(status):
+            self.git_status_changed.emit(path, status)
+        self.git_info_ready.emit(path, status, branches, history)
+    
+    def shutdown(self):
+        """Завершаем фоновые процессы git"""
+        self._pool.shutdown(wait=False)
+        with self._batch_lock:
+            for repo_root in list(self._batch_procs):
+                self._close_batch_process(repo_root)
     
     def _offer_git_installation(self):
         """Предлагаем пользователю установить Git"""
@@ -763,6 +1741,8 @@ class GitManager(QObject):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
+            import webbrowser
+            
             # Открываем страницу скачивания Git
             webbrowser.open("https://git-scm.com/download/win")
             
@@ -787,6 +1767,28 @@ class GitManager(QObject):
     
     def get_repo_root(self, path: str) -> Optional[str]:
         """Находим корень Git репозитория (работает даже без Git)"""
+        with self._root_lock:
+            repo_root = self._root_cache.get(path)
+        if repo_root is not None:
+            return repo_root
+        
+        # Поиск по диску - без блокировки, держим её только на правку словарей
+        repo_root, git_dir = self._discover_repo(path)
+        if repo_root is not None:
+            with self._root_lock:
+                # Отрицательный результат не кэшируем: репозиторий могут создать в любой момент
+                if len(self._root_cache) >= 512:
+                    self._root_cache.pop(next(iter(self._root_cache), None), None)
+                self._root_cache[path] = repo_root
+                self._git_dirs[repo_root] = git_dir
+        return repo_root
+    
+    @staticmethod
+    def _discover_repo(path: str) -> tuple:
+        """Поднимаемся по папкам до той, в которой есть .git: (корень, папка git)
+        
+        Один проход по диску вместо нескольких запусков git rev-parse.
+        """
         try:
             current = Path(path)
             
@@ -795,14 +1797,50 @@ class GitManager(QObject):
                 current = current.parent
             
             while current != current.parent:
-                git_dir = current / '.git'
-                if git_dir.exists():
-                    return str(current)
+                git_entry = current / '.git'
+                if git_entry.is_dir():
+                    return str(current), str(git_entry)
+                if git_entry.is_file():
+                    # worktree/подмодуль: "gitdir: <путь>", путь может быть относительным
+                    content = git_entry.read_text(encoding='utf-8', errors='ignore').strip()
+                    if content.startswith('gitdir:'):
+                        git_dir = os.path.join(str(current), content[len('gitdir:'):].strip())
+                        return str(current), os.path.normpath(git_dir)
+                    return str(current), str(git_entry)
                 current = current.parent
         except:
             pass
         
-        return None
+        return None, None
+    
+    def _status_cache_key(self, repo_root: str) -> tuple:
+        """Время изменения index и HEAD в папке git"""
+        git_dir = self._git_dirs.get(repo_root) or os.path.join(repo_root, '.git')
+        key = []
+        for name in ('index', 'HEAD'):
+            try:
+                key.append(os.stat(os.path.join(git_dir, name)).st_mtime_ns)
+            except OSError:
+                key.append(None)
+        return tuple(key)
+    
+    @staticmethod
+    def _relative_to_repo(file_path: str, repo_root: str) -> str:
+        """Путь файла относительно корня репозитория"""
+        # Обычно файл лежит внутри репозитория - хватает среза строки.
+        # Qt отдаёт пути с "/", Path на Windows - с "\\": normcase сравнивает
+        # их без обращения к диску
+        prefix_len = len(repo_root.rstrip('\\/'))
+        if (len(file_path) > prefix_len + 1 and file_path[prefix_len] in '\\/'
+                and os.path.normcase(file_path[:prefix_len]) == os.path.normcase(repo_root[:prefix_len])):
+            return file_path[prefix_len + 1:]
+        return os.path.relpath(file_path, repo_root) if os.path.isabs(file_path) else file_path
+    
+    def invalidate_status(self, path: str):
+        """Сбрасываем кэш статуса репозитория, в котором лежит path"""
+        repo_root = self.get_repo_root(path)
+        if repo_root:
+            self._status_cache.pop(repo_root, None)
     
     # Все методы ниже проверяют доступность Git перед выполнением
     
@@ -813,6 +1851,9 @@ class GitManager(QObject):
         
         result = self._run_git_command(path, 'init')
         if result['success']:
+            # Папки внутри нового репозитория могли относиться к внешнему
+            with self._root_lock:
+                self._root_cache.clear()
             self.editor.log(f"✅ Git репозиторий создан: {path}", "info")
         else:
             self.git_error.emit(path, result['error'])
@@ -820,6 +1861,81 @@ class GitManager(QObject):
     
     def get_status(self, path: str) -> dict:
         """Получаем статус Git"""
+        status = self._read_status(path)
+        self._watch_repo(path, status)
+        if self._status_changed(status):
+            # Отправляем сигнал только если статус изменился
+            self.git_status_changed.emit(path, status)
+        return status
+    
+    def _watch_repo(self, path: str, status: dict):
+        """Следим за папкой git прочитанного репозитория (только GUI поток)"""
+        repo_root = status.get('repo_root')
+        if not repo_root:
+            return
+        git_dir = self._git_dirs.get(repo_root) or os.path.join(repo_root, '.git')
+        if git_dir not in self._watched_git_dirs and os.path.isdir(git_dir):
+            self._git_watcher.addPath(git_dir)
+        self._watched_git_dirs[git_dir] = (repo_root, path)
+    
+    def _on_git_dir_changed(self, git_dir: str):
+        """index/HEAD изменились (наш git или внешний) - кэш статуса больше не верен"""
+        watched = self._watched_git_dirs.get(git_dir)
+        if watched is None:
+            return
+        if not os.path.isdir(git_dir):
+            # Репозиторий удалили - наблюдение снято самим watcher
+            del self._watched_git_dirs[git_dir]
+            self._status_cache.pop(watched[0], None)
+            return
+        self._status_cache.pop(watched[0], None)
+        self._dirty_git_dirs.add(git_dir)
+        self._status_refresh_timer.start()
+    
+    def _refresh_dirty_status(self):
+        """Перечитываем статус изменившихся репозиториев в фоне"""
+        dirty, self._dirty_git_dirs = self._dirty_git_dirs, set()
+        for git_dir in dirty:
+            watched = self._watched_git_dirs.get(git_dir)
+            if watched is None:
+                continue
+            path = watched[1]
+            run_in_background(
+                self._read_status, path,
+                on_done=lambda status, path=path: self._on_status_reread(path, status)
+            )
+    
+    def _on_status_reread(self, path: str, status: dict):
+        """Статус после изменения в папке git (GUI поток)"""
+        if self._status_changed(status):
+            self.git_status_changed.emit(path, status)
+    
+    @staticmethod
+    def split_status(status: dict) -> tuple:
+        """Файлы статуса за один проход: (в stage, не в stage, неотслеживаемые)"""
+        staged, unstaged = [], []
+        for file in status.get('changed_files', ()):
+            (staged if file['staged'] else unstaged).append(file)
+        return staged, unstaged, status.get('untracked_files', [])
+    
+    def _status_changed(self, status: dict) -> bool:
+        """Запоминаем хэш статуса; True, если он отличается от отправленного ранее"""
+        repo_root = status.get('repo_root')
+        if not repo_root:
+            return False
+        
+        status_hash = hash((
+            status['branch'],
+            tuple((f['path'], f['change_type'], f['staged']) for f in status['changed_files']),
+            tuple(status['untracked_files'])
+        ))
+        if self._last_status_hash.get(repo_root) == status_hash:
+            return False
+        self._last_status_hash[repo_root] = status_hash
+        return True
+    
+    def _read_status(self, path: str) -> dict:
+        """Читаем статус Git без сигналов (можно вызывать из фонового потока)"""
         repo_root = self.get_repo_root(path)
         if not repo_root:
             return {'is_git': False}
@@ -827,60 +1943,78 @@ class GitManager(QObject):
         if not self.check_git_available():
             return {'is_git': True, 'git_available': False}
         
-        status_result = self._run_git_command(repo_root, 'status', '--porcelain')
-        branch_result = self._run_git_command(repo_root, 'branch', '--show-current')
+        # Репозиторий не менялся — не запускаем git
+        cache_key = self._status_cache_key(repo_root)
+        cached = self._status_cache.get(repo_root)
+        if (cached is not None and cached[0] == cache_key
+                and time.monotonic() - cached[1] < GIT_STATUS_CACHE_TTL):
+            return dict(cached[2])
+        
+        # Ветка и файлы одним вызовом: заголовки "# branch.*" + записи через NUL
+        status_result = self._run_git_command(
+            repo_root, 'status', '--porcelain=v2', '--branch', '-z'
+        )
         
-        if not status_result['success'] or not branch_result['success']:
+        if not status_result['success']:
             return {'is_git': True, 'git_available': False}
         
-        status = {
-            'is_git': True,
-            'git_available': True,
-            'repo_root': repo_root,
-            'branch': branch_result['stdout'] if branch_result['stdout'] else 'unknown',
-            'has_changes': bool(status_result['stdout']),
-        }
-        
         # Парсим статус файлов
+        branch = 'unknown'
         changed_files = []
         untracked_files = []
         
-        for line in status_result['stdout'].split('\n'):
-            if not line.strip():
-                continue
-            
-            status_code = line[:2].strip()
-            file_path = line[3:]
-            
-            if status_code == '??':
-                untracked_files.append(file_path)
-            else:
-                change_type = 'modified'
-                staged = status_code[0] != ' '
-                if status_code[1] == 'M':
-                    change_type = 'modified'
-                elif status_code[1] == 'A':
-                    change_type = 'added'
-                elif status_code[1] == 'D':
-                    change_type = 'deleted'
-                elif status_code[1] == 'R':
-                    change_type = 'renamed'
+        # Разбираем байты: коды статуса ASCII, декодируются только пути и ветка.
+        # stdout не используем: он обрезан strip(), а имена файлов могут кончаться пробелом
+        records = iter(status_result['stdout_bytes'].split(b'\0'))
+        for record in records:
+            kind = record[:1]
+            if kind == b'#':
+                if record.startswith(b'# branch.head '):
+                    head = record[len(b'# branch.head '):]
+                    if head != b'(detached)':
+                        branch = head.decode('utf-8', errors='replace')
+            elif kind == b'?':
+                untracked_files.append(record[2:].decode('utf-8', errors='replace'))
+            elif kind in _STATUS_FIELDS:
+                # "1 XY sub mH mI mW hH hI path"
+                file_path = record.split(b' ', _STATUS_FIELDS[kind])[-1]
+                if kind == b'2':
+                    # Следующая запись - старое имя файла
+                    next(records, None)
+                
+                # X - индекс, Y - рабочая папка; "." значит без изменений
+                index_code, worktree_code = record[2:3], record[3:4]
+                staged = index_code != b'.'
+                status_code = worktree_code if worktree_code != b'.' else index_code
+                change_type = _CHANGE_TYPES.get(status_code, 'modified')
                 
                 changed_files.append({
-                    'path': file_path,
+                    'path': file_path.decode('utf-8', errors='replace'),
                     'change_type': change_type,
                     'staged': staged
                 })
         
+        status = {
+            'is_git': True,
+            'git_available': True,
+            'repo_root': repo_root,
+            'branch': branch,
+            'has_changes': bool(changed_files or untracked_files),
+        }
+        
         status['changed_files'] = changed_files
         status['untracked_files'] = untracked_files
-        
-        # Отправляем сигнал
-        self.git_status_changed.emit(path, status)
-        return status
+        self._status_cache[repo_root] = (cache_key, time.monotonic(), status)
+        return dict(status)
     
     def stage_file(self, path: str, file_path: str) -> bool:
         """Добавляем файл в stage"""
+        return self.stage_files(path, [file_path])
+    
+    def stage_files(self, path: str, file_paths: List[str]) -> bool:
+        """Добавляем файлы в stage одним вызовом git add"""
+        if not file_paths:
+            return True
         if not self.check_git_available(show_message=True):
             return False
         
@@ -888,12 +2022,20 @@ class GitManager(QObject):
         if not repo_root:
             return False
         
-        # Делаем путь относительным
-        rel_path = os.path.relpath(file_path, repo_root) if os.path.isabs(file_path) else file_path
-        result = self._run_git_command(repo_root, 'add', rel_path)
+        # Делаем пути относительными
+        rel_paths = [self._relative_to_repo(file_path, repo_root) for file_path in file_paths]
+        # Пути всегда через stdin с разделителем NUL (git 2.25+): длина командной строки
+        # не ограничивает число файлов. :(literal) - "*" и "[" в именах не шаблоны
+        result = self._run_git_command(
+            repo_root, 'add', '--pathspec-from-file=-', '--pathspec-file-nul',
+            input_bytes=b'\0'.join(os.fsencode(':(literal)' + rel_path) for rel_path in rel_paths))
         
         if result['success']:
-            self.editor.log(f"📦 Staged: {rel_path}", "info")
+            self._status_cache.pop(repo_root, None)
+            if len(rel_paths) == 1:
+                self.editor.log(f"📦 Staged: {rel_paths[0]}", "info")
+            else:
+                self.editor.log(f"📦 Staged: {len(rel_paths)} файлов", "info")
         else:
             self.git_error.emit(path, result['error'])
         
@@ -911,9 +2053,12 @@ class GitManager(QObject):
         result = self._run_git_command(repo_root, 'commit', '-m', message)
         
         if result['success']:
-            # Получаем хэш последнего коммита
-            hash_result = self._run_git_command(repo_root, 'rev-parse', '--short', 'HEAD')
-            commit_hash = hash_result['stdout'] if hash_result['success'] else 'unknown'
+            self._status_cache.pop(repo_root, None)
+            # Хэш уже есть в выводе коммита; HEAD разрешаем, только если разобрать не вышло
+            commit_hash = self._parse_commit_hash(result['stdout'])
+            if not commit_hash:
+                full_hash = self.resolve_object(repo_root, 'HEAD')
+                commit_hash = full_hash[:7] if full_hash else 'unknown'
             self.git_commit_made.emit(path, commit_hash)
             self.editor.log(f"💾 Коммит создан: {message}", "success")
         else:
@@ -921,6 +2066,18 @@ class GitManager(QObject):
         
         return result['success']
     
+    @staticmethod
+    def _parse_commit_hash(output: str) -> Optional[str]:
+        """Короткий хэш из первой строки git commit: [main (root-commit) 1a2b3c4] сообщение"""
+        first_line = output.split('\n', 1)[0]
+        end = first_line.find(']')
+        if not first_line.startswith('[') or end == -1:
+            return None
+        candidate = first_line[1:end].rsplit(' ', 1)[-1]
+        if len(candidate) >= 7 and all(c in '0123456789abcdef' for c in candidate):
+            return candidate
+        return None
+    
     def create_branch(self, path: str, branch_name: str) -> bool:
         """Создаём новую ветку"""
         if not self.check_git_available(show_message=True):
@@ -951,6 +2108,7 @@ class GitManager(QObject):
         result = self._run_git_command(repo_root, 'checkout', branch_name)
         
         if result['success']:
+            self._status_cache.pop(repo_root, None)
             self.git_branch_changed.emit(path, branch_name)
             self.editor.log(f"🔄 Переключился на ветку: {branch_name}", "info")
         else:
@@ -970,6 +2128,7 @@ class GitManager(QObject):
         result = self._run_git_command(repo_root, 'pull')
         
         if result['success']:
+            self._status_cache.pop(repo_root, None)
             self.editor.log(f"⬇️ Pull выполнен", "info")
         else:
             self.editor.log(f"❌ Pull ошибка: {result['error']}", "error")
@@ -988,6 +2147,7 @@ class GitManager(QObject):
         result = self._run_git_command(repo_root, 'push')
         
         if result['success']:
+            self._status_cache.pop(repo_root, None)
             self.editor.log(f"⬆️ Push выполнен", "info")
         else:
             self.editor.log(f"❌ Push ошибка: {result['error']}", "error")
@@ -1003,18 +2163,12 @@ class GitManager(QObject):
         if not repo_root:
             return []
         
-        result = self._run_git_command(repo_root, 'branch', '--list')
+        # Имена без отступов и маркеров "* "/"+ " - строки не нужно чистить
+        result = self._run_git_command(repo_root, 'branch', '--list', '--format=%(refname:short)')
         if not result['success']:
             return []
         
-        branches = []
-        for line in result['stdout'].split('\n'):
-            if line.strip():
-                branch = line.strip().lstrip('* ')
-                if branch:
-                    branches.append(branch)
-        
-        return branches
+        return [branch for branch in result['stdout'].splitlines() if branch]
     
     def get_history(self, path: str, limit: int = 20) -> List[dict]:
         """Получаем историю коммитов"""
@@ -1025,54 +2179,140 @@ class GitManager(QObject):
         if not repo_root:
             return []
         
-        result = self._run_git_command(
-            repo_root, 
-            'log', 
-            f'--max-count={limit}',
-            '--pretty=format:%H|%an|%ad|%s',
-            '--date=short'
-        )
+        # HEAD разрешается через постоянный cat-file - дешевле, чем git log
+        head = self.resolve_object(repo_root, 'HEAD')
+        cached = self._history_cache.get(repo_root)
+        if head is not None and cached is not None and cached[0] == head and cached[1] >= limit:
+            return [dict(commit) for commit in cached[2][:limit]]
+        
+        result = self._run_git_command(repo_root, *_GIT_LOG_ARGS, f'--max-count={limit}')
         
         if not result['success']:
             return []
         
-        history = []
-        for line in result['stdout'].split('\n'):
-            if not line.strip():
-                continue
-            
-            try:
-                commit_hash, author, date, message = line.split('|', 3)
-                history.append({
-                    'hash': commit_hash[:7],
-                    'message': message.strip(),
-                    'author': author.strip(),
-                    'date': date.strip(),
-                    'files': []
-                })
-            except:
-                continue
+        history = _GitLogParser.parse(result['stdout_bytes'])
         
-        return history
+        if head is not None:
+            self._history_cache[repo_root] = (head, limit, history)
+        return [dict(commit) for commit in history]
+    
+    def start_history_process(self, process: QProcess, repo_root: str, limit: int):
+        """Запускаем git log в QProcess: вывод читается по мере поступления (_GitLogParser)"""
+        env = QProcessEnvironment()
+        for key, value in _GIT_ENV.items():
+            env.insert(key, value)
+        process.setProcessEnvironment(env)
+        process.setWorkingDirectory(repo_root)
+        process.start(self.git_path, [*_GIT_LOG_ARGS, f'--max-count={limit}'])
 
 # ===== Менеджер обновлений =====
+# packaging необязателен: без него версии сравниваются как кортежи чисел
+try:
+    from packaging.version import Version, InvalidVersion
+except ImportError:
+    Version = None
+
+# Релизы редактора нумеруются строго x.y.z; pre-release и прочие формы PEP 440 не принимаем
+_VERSION_RE = re.compile(r'\d+\.\d+\.\d+')
+
+def _parse_version(version: str):
+    """Версия в сравнимом виде или None, если строка не в формате x.y.z"""
+    if not _VERSION_RE.fullmatch(version):
+        return None
+    if Version is not None:
+        try:
+            return Version(version)
+        except InvalidVersion:
+            return None
+    return tuple(map(int, version.split('.')))
+
 class UpdateManager(QObject):
     """Менеджер проверки обновлений"""
     
     update_available = pyqtSignal(str, str)  # Новая версия, описание
     update_error = pyqtSignal(str)  # Ошибка
     update_downloaded = pyqtSignal(str)  # Файл обновления скачан
+    download_progress = pyqtSignal(int, str)  # Процент, версия (из фонового потока)
     
     def __init__(self, editor):
         super().__init__()
         self.editor = editor
-        self.last_check = None
+        self.last_check = self._load_last_check()
         self.check_on_startup = True
         self.auto_check_interval = 24 * 60 * 60 * 1000  # 24 часа в миллисекундах
+        
+        # HTTPS соединения по хостам: проверка и скачивание переиспользуют TLS сессию
+        self._connections: Dict[str, Any] = {}
+        self._connections_lock = threading.Lock()
+        self.download_progress.connect(self._update_progress)
+    
+    def _load_last_check(self):
+        """Время последней проверки из прошлых запусков"""
+        value = SETTINGS.value("update/last_check", "", type=str)
+        try:
+            return datetime.fromisoformat(value) if value else None
+        except ValueError:
+            return None
+    
+    def _is_version_ignored(self, version: str) -> bool:
+        """Пользователь нажал "Игнорировать" для этой версии"""
+        return SETTINGS.value(f"ignored_version_{version}", False, type=bool)
+    
+    def _https_get(self, url: str, timeout: float):
+        """GET запрос через keep-alive соединение с переходом по редиректам
+        
+        Вызывать под self._connections_lock; ответ нужно дочитать до конца.
+        """
+        import http.client
+        import urllib.error
+        import urllib.parse
+        
+        headers = {'User-Agent': 'LudvigEditor Update Checker'}
+        for _ in range(5):
+            parts = urllib.parse.urlsplit(url)
+            path = parts.path + ('?' + parts.query if parts.query else '')
+            
+            conn = self._connections.get(parts.netloc)
+            for attempt in range(2):
+                if conn is None:
+                    conn = http.client.HTTPSConnection(parts.netloc, timeout=timeout)
+                    self._connections[parts.netloc] = conn
+                try:
+                    conn.timeout = timeout
+                    conn.request('GET', path, headers=headers)
+                    response = conn.getresponse()
+                    break
+                except (http.client.HTTPException, OSError):
+                    # Сервер мог закрыть простаивающее соединение — открываем новое
+                    conn.close()
+                    self._connections.pop(parts.netloc, None)
+                    conn = None
+                    if attempt:
+                        raise
+            
+            if response.status in (301, 302, 303, 307, 308):
+                location = response.getheader('Location')
+                response.read()  # Дочитываем, чтобы соединение можно было использовать снова
+                if not location:
+                    break
+                url = urllib.parse.urljoin(url, location)
+                continue
+            
+            if response.status != 200:
+                response.read()
+                raise urllib.error.HTTPError(url, response.status, response.reason,
+                                             response.headers, None)
+            return response
+        
+        raise urllib.error.URLError(f"Слишком много перенаправлений: {url}")
     
     def check_for_updates(self, auto_check=False):
         """Проверяем наличие обновлений"""
-        if not check_internet():
+        check_internet_async(lambda online: self._on_internet_checked(online, auto_check))
+    
+    def _on_internet_checked(self, online: bool, auto_check=False):
+        """Продолжаем проверку обновлений, когда стало известно про интернет"""
+        if not online:
             if not auto_check:
                 QMessageBox.warning(self.editor, "Нет интернета", 
                                   "Проверка обновлений требует подключения к интернету.")
@@ -1082,95 +2322,68 @@ class UpdateManager(QObject):
         if not auto_check:
             self.editor.statusBar().showMessage("🔍 Проверка обновлений...")
         
-        # Запускаем в отдельном потоке
-        thread = threading.Thread(target=self._check_update_thread, args=(auto_check,))
-        thread.daemon = True
-        thread.start()
-    
-    def _check_update_thread(self, auto_check=False):
-        """Поток для проверки обновлений"""
-        try:
-            # Проверяем наличие urllib
-            try:
-                import urllib.request
-                import urllib.error
-            except ImportError:
-                if not auto_check:
-                    QTimer.singleShot(0, lambda: self._show_check_error(
-                        "Библиотека urllib недоступна. Установите Python с полным набором библиотек."
-                    ))
-                return
-            
-            # Загружаем файл обновлений
-            req = urllib.request.Request(UPDATE_URL)
-            req.add_header('User-Agent', 'LudvigEditor Update Checker')
-            
-            with urllib.request.urlopen(req, timeout=10) as response:
-                content = response.read().decode('utf-8').strip()
-            
-            # Парсим файл обновлений
-            lines = content.split('\n')
-            latest_version = None
-            description = ""
-            
-            for line in lines:
-                if '-' in line:
-                    version_part, desc_part = line.split('-', 1)
-                    version = version_part.strip()
-                    desc = desc_part.strip()
-                    
-                    # Проверяем формат версии
-                    if self._is_valid_version(version):
-                        latest_version = version
-                        description = desc
-                        break
-            
-            if latest_version and self._is_newer_version(latest_version, APP_VERSION):
-                # Обновление доступно
-                QTimer.singleShot(0, lambda: self._show_update_available(
-                    latest_version, description, auto_check
-                ))
-            elif not auto_check:
-                QTimer.singleShot(0, lambda: self._show_no_updates())
-            
-            # Сохраняем время последней проверки
-            self.last_check = datetime.now()
-            
-        except urllib.error.URLError as e:
-            if not auto_check:
-                QTimer.singleShot(0, lambda: self._show_network_error(e))
-        except Exception as e:
-            if not auto_check:
-                QTimer.singleShot(0, lambda: self._show_check_error(e))
-        finally:
-            QTimer.singleShot(0, lambda: self.editor.statusBar().clearMessage())
+        # Запускаем в пуле потоков, результат вернётся в GUI поток
+        run_in_background(
+            self._fetch_latest_version,
+            on_done=lambda result: self._on_check_finished(result, auto_check),
+            on_error=lambda e: self._on_check_failed(e, auto_check)
+        )
     
-    def _is_valid_version(self, version: str) -> bool:
-        """Проверяем корректность формата версии"""
-        try:
-            parts = version.split('.')
-            if len(parts) != 3:
-                return False
-            for part in parts:
-                int(part)  # Проверяем что это числа
-            return True
-        except:
-            return False
+    def _fetch_latest_version(self):
+        """Скачиваем и разбираем файл обновлений (фоновый поток)"""
+        # Загружаем файл обновлений
+        with self._connections_lock:
+            response = self._https_get(UPDATE_URL, timeout=10)
+            content = response.read().decode('utf-8').strip()
+        
+        # Парсим файл обновлений
+        lines = content.split('\n')
+        
+        for line in lines:
+            if '-' in line:
+                version_part, desc_part = line.split('-', 1)
+                version = version_part.strip()
+                desc = desc_part.strip()
+                
+                # Проверяем формат версии
+                if _parse_version(version) is not None:
+                    return version, desc
+        
+        return None, ""
+    
+    def _on_check_finished(self, result, auto_check=False):
+        """Показываем результат проверки обновлений"""
+        self.editor.statusBar().clearMessage()
+        latest_version, description = result
+        
+        if latest_version and self._is_newer_version(latest_version, APP_VERSION):
+            # Обновление доступно (проигнорированные версии при авто-проверке не показываем)
+            if not (auto_check and self._is_version_ignored(latest_version)):
+                self._show_update_available(latest_version, description, auto_check)
+        elif not auto_check:
+            self._show_no_updates()
+        
+        # Сохраняем время последней проверки (и между запусками)
+        self.last_check = datetime.now()
+        SETTINGS.setValue("update/last_check", self.last_check.isoformat())
+    
+    def _on_check_failed(self, error, auto_check=False):
+        """Показываем ошибку проверки обновлений"""
+        self.editor.statusBar().clearMessage()
+        if auto_check:
+            return
+        if isinstance(error, OSError):
+            self._show_network_error(error)
+        else:
+            self._show_check_error(error)
     
     def _is_newer_version(self, new_version: str, current_version: str) -> bool:
         """Сравниваем версии"""
-        try:
-            new_parts = list(map(int, new_version.split('.')))
-            current_parts = list(map(int, current_version.split('.')))
-            
-            for i in range(3):
-                if new_parts[i] > current_parts[i]:
-                    return True
-                elif new_parts[i] < current_parts[i]:
-                    return False
-            return False  # Версии равны
-        except:
+        new_parsed = _parse_version(new_version)
+        current_parsed = _parse_version(current_version)
+        if new_parsed is None or current_parsed is None:
             return False
+        return new_parsed > current_parsed
     
     def _show_update_available(self, new_version: str, description: str, auto_check: bool):
         """Показываем уведомление об обновлении"""
@@ -1254,44 +2467,40 @@ class UpdateManager(QObject):
         if not save_path:
             return
         
-        # Проверяем наличие urllib
-        try:
-            import urllib.request
-            # Запускаем скачивание в отдельном потоке
-            self.editor.statusBar().showMessage(f"⬇️ Скачивание обновления {version}...")
-            
-            thread = threading.Thread(target=self._download_thread, args=(download_url, save_path, version))
-            thread.daemon = True
-            thread.start()
-        except ImportError:
-            # Если urllib недоступен, предлагаем открыть ссылку в браузере
-            reply = QMessageBox.question(
-                self.editor, "Библиотека не найдена",
-                f"Библиотека urllib недоступна.\n\n"
-                f"Хотите открыть ссылку в браузере для скачивания?\n\n"
-                f"{download_url}",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-            )
-            
-            if reply == QMessageBox.StandardButton.Yes:
-                webbrowser.open(download_url)
+        # Запускаем скачивание в пуле потоков
+        self.editor.statusBar().showMessage(f"⬇️ Скачивание обновления {version}...")
+        
+        run_in_background(
+            self._download_thread, download_url, save_path, version,
+            on_done=lambda _: self._download_complete(save_path, version),
+            on_error=lambda error: self._download_error(error, download_url)
+        )
     
     def _download_thread(self, url: str, save_path: str, version: str):
-        """Поток для скачивания"""
-        try:
-            import urllib.request
-            
-            def progress_hook(count, block_size, total_size):
-                if total_size > 0:
-                    percent = min(100, int(count * block_size * 100 / total_size))
-                    QTimer.singleShot(0, lambda: self._update_progress(percent, version))
-            
-            urllib.request.urlretrieve(url, save_path, progress_hook)
-            
-            QTimer.singleShot(0, lambda: self._download_complete(save_path, version))
-            
-        except Exception as e:
-            QTimer.singleShot(0, lambda: self._download_error(e))
+        """Скачиваем файл потоком (фоновый поток)"""
+        with self._connections_lock:
+            response = self._https_get(url, timeout=30)
+            total_size = int(response.getheader('Content-Length') or 0)
+            downloaded = 0
+            last_percent = -1
+            
+            # Один буфер на всё скачивание: readinto не создаёт bytes на каждый блок
+            buffer = bytearray(256 * 1024)
+            view = memoryview(buffer)
+            
+            with open(save_path, 'wb') as f:
+                while True:
+                    size = response.readinto(buffer)
+                    if not size:
+                        break
+                    f.write(view[:size])
+                    downloaded += size
+                    if total_size > 0:
+                        # Сигнал только при смене процента, а не на каждый блок
+                        percent = min(100, downloaded * 100 // total_size)
+                        if percent != last_percent:
+                            last_percent = percent
+                            self.download_progress.emit(percent, version)
     
     def _update_progress(self, percent: int, version: str):
         """Обновляем прогресс в статус баре"""
@@ -1328,9 +2537,25 @@ class UpdateManager(QObject):
             # Просто сохраняем файл, ничего не делаем
             pass
     
-    def _download_error(self, error):
+    def _download_error(self, error, download_url: str):
         """Ошибка скачивания"""
         self.editor.statusBar().showMessage("❌ Ошибка скачивания", 5000)
+        
+        # В урезанных сборках Python может не быть http.client - предлагаем браузер
+        if isinstance(error, ImportError):
+            reply = QMessageBox.question(
+                self.editor, "Библиотека не найдена",
+                f"Библиотека http.client недоступна.\n\n"
+                f"Хотите открыть ссылку в браузере для скачивания?\n\n"
+                f"{download_url}",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            
+            if reply == QMessageBox.StandardButton.Yes:
+                import webbrowser
+                webbrowser.open(download_url)
+            return
+        
         QMessageBox.critical(
             self.editor, "Ошибка скачивания",
             f"Не удалось скачать обновление:\n\n{error}"
@@ -1338,8 +2563,12 @@ class UpdateManager(QObject):
     
     def setup_auto_check(self):
         """Настраиваем автоматическую проверку обновлений"""
-        # Проверяем настройки
-        if self.check_on_startup:
+        # Проверяем настройки; недавняя проверка (в прошлом запуске) не повторяется
+        recently_checked = (
+            self.last_check is not None and
+            (datetime.now() - self.last_check).total_seconds() * 1000 < self.auto_check_interval
+        )
+        if self.check_on_startup and not recently_checked:
             # Проверяем при запуске (с задержкой 3 секунды)
             QTimer.singleShot(3000, lambda: self.check_for_updates(auto_check=True))
         
@@ -1364,6 +2593,9 @@ class EditorAPI(QObject):
         super().__init__()
         self.editor = editor
         self.extensions = editor.ext_manager
+        # cwd -> постоянная оболочка для execute_command(persistent=True)
+        self._shells: Dict[str, subprocess.Popen] = {}
+        self._shells_lock = threading.Lock()
     
     def log(self, message: str, level: str = "info"):
         """Логирование в терминал редактора"""
@@ -1386,9 +2618,13 @@ class EditorAPI(QObject):
         return self.editor.get_current_file()
     
     def get_current_code(self) -> str:
-        """Получить код из текущего редактора"""
+        """Получить код из текущего редактора (без правок после последней синхронизации)"""
         return self.editor.get_current_code()
     
+    def request_current_code(self, callback: Callable[[str], None]):
+        """Получить актуальный код из текущего редактора - асинхронно, в callback"""
+        self.editor.request_current_code(callback)
+    
     def set_current_code(self, code: str):
         """Установить код в текущем редакторе"""
         self.editor.set_current_code(code)
@@ -1408,21 +2644,40 @@ class EditorAPI(QObject):
     def create_file(self, path: str, content: str = ""):
         """Создать новый файл"""
         try:
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            data = content.encode('utf-8')
+            flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+            try:
+                fd = os.open(path, flags, 0o644)
+            except FileNotFoundError:
+                # Папки ещё нет - создаём только в этом случае
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd = os.open(path, flags, 0o644)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
             self.editor.open_tab(path)
             return True
         except Exception as e:
             self.log(f"❌ Error creating file: {e}", "error")
             return False
     
-    def execute_command(self, command: str, cwd: str = None) -> dict:
-        """Выполнить команду в терминале"""
+    def execute_command(self, command: str, cwd: str = None, persistent: bool = False) -> dict:
+        """Выполнить команду в терминале
+        
+        persistent=True - команда идёт в уже запущенную оболочку для этой папки
+        (без нового процесса на каждый вызов). Состояние оболочки (cd, переменные)
+        сохраняется между командами. На Windows всегда отдельный процесс.
+        """
         try:
             if cwd is None:
                 cwd = os.getcwd()
             
+            if persistent and os.name != 'nt':
+                return self._execute_in_shell(command, cwd)
+            
             result = subprocess.run(
                 command,
                 shell=True,
@@ -1446,6 +2701,115 @@ class EditorAPI(QObject):
                 'returncode': -1
             }
     
+    # Сколько ждём маркер: зависшую команду убиваем вместе с оболочкой
+    _SHELL_TIMEOUT = 300
+    
+    def _execute_in_shell(self, command: str, cwd: str) -> dict:
+        """Выполняем команду в постоянной оболочке; конец вывода - строка-маркер"""
+        marker = f"__LUDVIG_DONE_{os.urandom(8).hex()}__"
+        # Команда идёт одним словом в eval: незакрытая кавычка или if без fi
+        # дают ненулевой $?, а не ожидание продолжения. "command" не даёт
+        # оболочке выйти на синтаксической ошибке внутри eval.
+        # stdin команды - /dev/null, иначе она прочитает следующие команды оболочки.
+        # Маркер с новой строки: вывод команды может не заканчиваться переводом строки
+        quoted = command.replace("'", "'\\''")
+        script = (
+            f"command eval '{quoted}' </dev/null\n"
+            f"printf '\\n{marker} %d\\n' $?\n"
+            f"printf '\\n{marker}\\n' >&2\n"
+        ).encode('utf-8')
+        
+        with self._shells_lock:
+            shell = self._shells.get(cwd)
+            if shell is None or shell.poll() is not None:
+                # Своя группа процессов: по таймауту убиваем и запущенные командой процессы,
+                # иначе они держат канал вывода открытым
+                shell = subprocess.Popen(
+                    ['/bin/sh'], cwd=cwd, start_new_session=True,
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+                )
+                self._shells[cwd] = shell
+            
+            # stderr читаем параллельно, чтобы большой вывод в него не заблокировал оболочку
+            stderr_lines = []
+            stderr_reader = threading.Thread(
+                target=self._read_until_marker,
+                args=(shell.stderr, marker, stderr_lines),
+                daemon=True
+            )
+            stderr_reader.start()
+            
+            # По таймауту убиваем оболочку - чтение получит EOF
+            expired = threading.Event()
+            
+            def kill():
+                expired.set()
+                try:
+                    os.killpg(shell.pid, signal.SIGKILL)
+                except OSError:
+                    pass
+            
+            watchdog = threading.Timer(self._SHELL_TIMEOUT, kill)
+            watchdog.daemon = True
+            watchdog.start()
+            
+            stdout_lines = []
+            try:
+                try:
+                    shell.stdin.write(script)
+                    shell.stdin.flush()
+                except OSError:
+                    pass
+                marker_line = self._read_until_marker(shell.stdout, marker, stdout_lines)
+                stderr_reader.join()
+            finally:
+                watchdog.cancel()
+            
+            if marker_line is None:
+                # Команда завершила оболочку (exit) или её убили по таймауту -
+                # в следующий раз запустим новую
+                self._shells.pop(cwd, None)
+                returncode = shell.wait()
+            else:
+                returncode = int(marker_line.split()[1])
+        
+        stdout = b''.join(stdout_lines).decode('utf-8', errors='replace')
+        stderr = b''.join(stderr_lines).decode('utf-8', errors='replace')
+        if marker_line is not None:
+            # Убираем перевод строки, добавленный перед маркером
+            stdout = stdout[:-1]
+            stderr = stderr[:-1]
+        elif expired.is_set():
+            stderr += f"Command timed out after {self._SHELL_TIMEOUT} s"
+        
+        return {
+            'success': returncode == 0,
+            'stdout': stdout,
+            'stderr': stderr,
+            'returncode': returncode
+        }
+    
+    @staticmethod
+    def _read_until_marker(stream, marker: str, lines: list):
+        """Читаем строки до маркера; возвращаем строку маркера или None при EOF"""
+        marker_bytes = marker.encode('ascii')
+        for line in iter(stream.readline, b''):
+            if line.startswith(marker_bytes):
+                return line.decode('ascii')
+            lines.append(line)
+        return None
+    
+    def shutdown(self):
+        """Закрываем постоянные оболочки execute_command"""
+        with self._shells_lock:
+            for shell in self._shells.values():
+                try:
+                    shell.stdin.close()
+                    shell.wait(timeout=1)
+                except (OSError, subprocess.TimeoutExpired):
+                    shell.kill()
+            self._shells.clear()
+    
     def register_command(self, command_id: str, title: str, 
                          callback: Callable, icon: str = ""):
         """Зарегистрировать команду в редакторе"""
@@ -1479,43 +2843,66 @@ class EditorAPI(QObject):
         """Показать сообщение в статус баре"""
         self.editor.statusBar().showMessage(message, timeout)
     
-    def create_webview(self, html: str = "") -> QWebEngineView:
+    def create_webview(self, html: str = "") -> "QWebEngineView":
         """Создать новый WebView (для расширений с UI)"""
-        view = QWebEngineView()
+        view = _webengine('QWebEngineView')()
         if html:
             view.setHtml(html)
         return view
 
 # ===== Welcome Screen =====
+# Один лист стилей на весь экран вместо отдельных листов у заголовков и рамки
+_WELCOME_QSS = """
+    QWidget { 
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:1, 
+            stop:0 #4b2fbf, stop:0.5 #2b1a55, stop:1 #14142e); 
+        color: white; 
+    }
+    QPushButton { 
+        background: rgba(255, 255, 255, 0.12); 
+        border: 1px solid rgba(255, 255, 255, 0.2);
+        border-radius: 12px; 
+        padding: 16px 24px; 
+        font-size: 15px; 
+        font-weight: 500;
+        min-width: 200px;
+    }
+    QPushButton:hover { 
+        background: rgba(255, 255, 255, 0.22); 
+        border-color: rgba(255, 255, 255, 0.3);
+    }
+    QLabel { 
+        color: white; 
+    }
+    QLabel#welcomeTitle {
+        font-size: 48px; 
+        font-weight: 700; 
+        margin-bottom: 8px;
+    }
+    QLabel#welcomeSubtitle {
+        font-size: 16px;
+        margin-bottom: 32px;
+    }
+    #welcomeStats, #welcomeStats QFrame {
+        background: rgba(255, 255, 255, 0.05);
+        border-radius: 12px;
+        padding: 16px;
+        margin-top: 24px;
+    }
+    QLabel#welcomeStatsTitle {
+        font-size: 14px;
+        font-weight: 600;
+        margin-bottom: 12px;
+    }
+"""
+
 class WelcomeScreen(QWidget):
     def __init__(self, open_file_cb, open_folder_cb, open_extensions_cb):
         super().__init__()
         self.setup_ui(open_file_cb, open_folder_cb, open_extensions_cb)
     
     def setup_ui(self, open_file_cb, open_folder_cb, open_extensions_cb):
-        self.setStyleSheet("""
-            QWidget { 
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:1, 
-                    stop:0 #4b2fbf, stop:0.5 #2b1a55, stop:1 #14142e); 
-                color: white; 
-            }
-            QPushButton { 
-                background: rgba(255, 255, 255, 0.12); 
-                border: 1px solid rgba(255, 255, 255, 0.2);
-                border-radius: 12px; 
-                padding: 16px 24px; 
-                font-size: 15px; 
-                font-weight: 500;
-                min-width: 200px;
-            }
-            QPushButton:hover { 
-                background: rgba(255, 255, 255, 0.22); 
-                border-color: rgba(255, 255, 255, 0.3);
-            }
-            QLabel { 
-                color: white; 
-            }
-        """)
+        self.setStyleSheet(_WELCOME_QSS)
         
         layout = QVBoxLayout(self)
         layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -1523,17 +2910,10 @@ class WelcomeScreen(QWidget):
         
         # Заголовок
         title = QLabel("⚡ LudvigEditor")
-        title.setStyleSheet("""
-            font-size: 48px; 
-            font-weight: 700; 
-            margin-bottom: 8px;
-            background: linear-gradient(90deg, #9b5de5, #f15bb5, #00bbf9);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        """)
+        title.setObjectName("welcomeTitle")
         
         subtitle = QLabel("VS Code style • Web + PyQt6 • Full Extensions Support")
-        subtitle.setStyleSheet("font-size: 16px; opacity: 0.8; margin-bottom: 32px;")
+        subtitle.setObjectName("welcomeSubtitle")
         
         # Кнопки
         btn_open = QPushButton("📂 Open File")
@@ -1546,17 +2926,10 @@ class WelcomeScreen(QWidget):
         
         # Статистика
         stats_frame = QFrame()
-        stats_frame.setStyleSheet("""
-            QFrame {
-                background: rgba(255, 255, 255, 0.05);
-                border-radius: 12px;
-                padding: 16px;
-                margin-top: 24px;
-            }
-        """)
+        stats_frame.setObjectName("welcomeStats")
         stats_layout = QVBoxLayout(stats_frame)
         stats_title = QLabel("Editor Stats")
-        stats_title.setStyleSheet("font-size: 14px; font-weight: 600; margin-bottom: 12px;")
+        stats_title.setObjectName("welcomeStatsTitle")
         stats_layout.addWidget(stats_title)
         
         # TODO: Добавить статистику
@@ -1571,82 +2944,345 @@ class WelcomeScreen(QWidget):
         layout.addStretch()
 
 # ===== Расширенный виджет расширений =====
+_EXT_WIDGET_QSS = """
+    QWidget { 
+        background: #1c1c3c; 
+        color: white; 
+    }
+    QListView { 
+        background: #16172e; 
+        border: 1px solid rgba(255, 255, 255, 0.1);
+        border-radius: 8px;
+        padding: 4px;
+    }
+    QListView::item {
+        padding: 12px;
+        border-bottom: 1px solid rgba(255, 255, 255, 0.05);
+    }
+    QListView::item:selected {
+        background: rgba(91, 60, 196, 0.3);
+        border-radius: 6px;
+    }
+    QPushButton { 
+        background: #3f2b96; 
+        border: none; 
+        border-radius: 8px; 
+        padding: 10px 16px; 
+        color: white; 
+        font-weight: 500;
+    }
+    QPushButton:hover { 
+        background: #5b3cc4; 
+    }
+    QPushButton:disabled {
+        background: #2a1d66;
+        color: rgba(255, 255, 255, 0.5);
+    }
+    QLineEdit, QComboBox {
+        background: rgba(255, 255, 255, 0.1);
+        border: 1px solid rgba(255, 255, 255, 0.2);
+        border-radius: 8px;
+        padding: 8px 12px;
+        color: white;
+        font-size: 14px;
+    }
+    QLineEdit:focus, QComboBox:focus {
+        border-color: #9b5de5;
+        outline: none;
+    }
+    QLabel {
+        color: #dcd7ff;
+    }
+    QTabWidget::pane {
+        border: none;
+        background: transparent;
+    }
+    QTabBar::tab {
+        background: rgba(255, 255, 255, 0.1);
+        color: white;
+        padding: 10px 20px;
+        border-top-left-radius: 8px;
+        border-top-right-radius: 8px;
+        margin-right: 2px;
+    }
+    QTabBar::tab:selected {
+        background: rgba(91, 60, 196, 0.8);
+        font-weight: bold;
+    }
+    QTabBar::tab:hover {
+        background: rgba(91, 60, 196, 0.5);
+    }
+"""
+
+class ExtensionListModel(QAbstractListModel):
+    """Список расширений для QListView: строки без QListWidgetItem на каждую"""
+    
+    search_index_changed = pyqtSignal()
+    
+    # Значки статуса и типа отдаются отдельно от текста - их рисует ExtensionItemDelegate
+    StatusIconRole = Qt.ItemDataRole.UserRole + 1
+    TypeIconRole = Qt.ItemDataRole.UserRole + 2
+    _TYPE_ICONS = {'js': "🧩", 'python': "🐍"}
+    
+    # Общие цвета строк: не создаём QColor на каждую строку
+    _DISABLED_COLOR = QColor(100, 100, 100)
+    _ERROR_COLOR = QColor(255, 165, 0)  # Оранжевый для ошибок
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._extensions: List[dict] = []
+        self._texts: List[str] = []
+        # Имя -> поля поиска в нижнем регистре; триграмма -> имена, где она встречается
+        self._search_blobs: Dict[str, str] = {}
+        self._trigram_index: Dict[str, set] = {}
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._extensions)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        
+        row = index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._texts[row]
+        if role == Qt.ItemDataRole.ForegroundRole:
+            ext = self._extensions[row]
+            if not ext['enabled']:
+                return self._DISABLED_COLOR
+            if not ext['loaded']:
+                return self._ERROR_COLOR
+            return None
+        if role == self.StatusIconRole:
+            return self._status_icon(self._extensions[row])
+        if role == self.TypeIconRole:
+            return self._type_icon(self._extensions[row])
+        if role == Qt.ItemDataRole.UserRole:
+            return self._extensions[row]
+        return None
+    
+    def extension(self, row: int) -> dict:
+        """Словарь расширения без конвертации через QVariant"""
+        return self._extensions[row]
+    
+    def search_blob(self, name: str) -> str:
+        return self._search_blobs.get(name, '')
+    
+    def set_extensions(self, extensions: List[dict]):
+        """Применяем новый список (отсортирован по имени), меняя только отличающиеся строки
+        
+        Выделение и прокрутка в представлении при этом сохраняются.
+        """
+        # Индекс поиска строим заранее: фильтр проверяет строки по мере вставки
+        self._search_blobs = {
+            ext['name']: f"{ext['name']}\0{ext['description']}\0{ext['author']}".lower()
+            for ext in extensions
+        }
+        self._trigram_index = {}
+        for name, search_blob in self._search_blobs.items():
+            for i in range(len(search_blob) - 2):
+                self._trigram_index.setdefault(search_blob[i:i + 3], set()).add(name)
+        self.search_index_changed.emit()
+        
+        # Удалённые расширения - с конца, чтобы номера строк не сдвигались
+        for row in range(len(self._extensions) - 1, -1, -1):
+            if self._extensions[row]['name'] not in self._search_blobs:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._extensions[row]
+                del self._texts[row]
+                self.endRemoveRows()
+        
+        # Оставшиеся строки идут в том же порядке, что и новый список
+        for row, ext in enumerate(extensions):
+            if row < len(self._extensions) and self._extensions[row]['name'] == ext['name']:
+                if self._extensions[row] != ext:
+                    self._extensions[row] = ext
+                    self._texts[row] = self._display_text(ext)
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index)
+            else:
+                self.beginInsertRows(QModelIndex(), row, row)
+                self._extensions.insert(row, ext)
+                self._texts.insert(row, self._display_text(ext))
+                self.endInsertRows()
+    
+    def search_candidates(self, search_text: str) -> Optional[set]:
+        """Имена, содержащие все триграммы запроса (None - запрос короче трёх символов)"""
+        if len(search_text) < 3:
+            return None
+        
+        candidates = None
+        for i in range(len(search_text) - 2):
+            names = self._trigram_index.get(search_text[i:i + 3])
+            if not names:
+                return set()
+            candidates = names if candidates is None else candidates & names
+            if not candidates:
+                break
+        return candidates
+    
+    @staticmethod
+    def _display_text(ext: dict) -> str:
+        """Текст строки расширения"""
+        return f"{ext['name']} v{ext['version']}"
+    
+    @staticmethod
+    def _status_icon(ext: dict) -> str:
+        if ext['loaded']:
+            return "✅"
+        return "⚠️" if ext['enabled'] else "❌"
+    
+    @classmethod
+    def _type_icon(cls, ext: dict) -> str:
+        return cls._TYPE_ICONS.get(ext['type'], "❓")
+
+class ExtensionItemDelegate(QStyledItemDelegate):
+    """Рисует строку расширения за один проход: значки из кэша и текст"""
+    
+    _ROW_HEIGHT = 44  # Отступы по 12px (как у QListView::item) и строка текста
+    _ICON_SIZE = 16
+    _ICON_GAP = 6
+    _PADDING = 12
+    
+    # (статус, тип, масштаб экрана) -> готовая пара значков одной картинкой;
+    # цветные эмодзи раскладываются шрифтом один раз на комбинацию (их всего 6)
+    _icon_cache: Dict[tuple, QPixmap] = {}
+    
+    @classmethod
+    def _icons(cls, status_icon: str, type_icon: str, ratio: float) -> QPixmap:
+        key = (status_icon, type_icon, ratio)
+        pixmap = cls._icon_cache.get(key)
+        if pixmap is None:
+            # Рисуем в пикселях экрана, чтобы на HiDPI значки не были размытыми
+            width = cls._ICON_SIZE * 2 + cls._ICON_GAP
+            pixmap = QPixmap(round(width * ratio), round(cls._ICON_SIZE * ratio))
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            font = QFont()
+            font.setPixelSize(cls._ICON_SIZE - 2)
+            painter.setFont(font)
+            for i, emoji in enumerate((status_icon, type_icon)):
+                left = i * (cls._ICON_SIZE + cls._ICON_GAP)
+                painter.drawText(left, 0, cls._ICON_SIZE, cls._ICON_SIZE,
+                                 Qt.AlignmentFlag.AlignCenter, emoji)
+            painter.end()
+            cls._icon_cache[key] = pixmap
+        return pixmap
+    
+    def paint(self, painter, option, index):
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        text = opt.text
+        # Фон, выделение и рамку строки рисует стиль (с учётом QSS ::item), текст - мы
+        opt.text = ""
+        widget = opt.widget
+        style = widget.style() if widget is not None else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, opt, painter, widget)
+        
+        rect = opt.rect.adjusted(self._PADDING, 0, -self._PADDING, 0)
+        icons = self._icons(
+            index.data(ExtensionListModel.StatusIconRole),
+            index.data(ExtensionListModel.TypeIconRole),
+            painter.device().devicePixelRatioF()
+        )
+        painter.drawPixmap(rect.left(), rect.top() + (rect.height() - self._ICON_SIZE) // 2, icons)
+        rect.setLeft(rect.left() + self._ICON_SIZE * 2 + self._ICON_GAP * 2)
+        
+        color = index.data(Qt.ItemDataRole.ForegroundRole)
+        painter.save()
+        painter.setPen(color if color is not None else opt.palette.color(QPalette.ColorRole.Text))
+        painter.drawText(
+            rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+            opt.fontMetrics.elidedText(text, Qt.TextElideMode.ElideRight, rect.width())
+        )
+        painter.restore()
+    
+    def sizeHint(self, option, index):
+        # Высота постоянная - без измерения текста каждой строки
+        return QSize(option.rect.width(), self._ROW_HEIGHT)
+
+class ExtensionFilterProxy(QSortFilterProxyModel):
+    """Фильтр списка расширений по строке поиска и типу"""
+    
+    def __init__(self, model: ExtensionListModel, parent=None):
+        super().__init__(parent)
+        self.setSourceModel(model)
+        self._search_text = ''
+        self._filter_type = "All"
+        self._candidates: Optional[set] = None
+        model.search_index_changed.connect(self._update_candidates)
+    
+    def set_filter(self, search_text: str, filter_type: str):
+        """Новые условия фильтра (search_text - в нижнем регистре)"""
+        # Повторные сигналы с теми же условиями не пересчитывают строки
+        if (search_text, filter_type) == (self._search_text, self._filter_type):
+            return
+        self._search_text = search_text
+        self._filter_type = filter_type
+        self._update_candidates()
+        self.invalidateFilter()
+    
+    def _update_candidates(self):
+        self._candidates = self.sourceModel().search_candidates(self._search_text)
+    
+    def filterAcceptsRow(self, source_row, source_parent):
+        # Фильтр не задан - показываем всё без разбора строки
+        if not self._search_text and self._filter_type == "All":
+            return True
+        
+        model = self.sourceModel()
+        ext = model.extension(source_row)
+        
+        # Фильтр по поиску
+        if self._candidates is not None and ext['name'] not in self._candidates:
+            return False
+        if self._search_text and self._search_text not in model.search_blob(ext['name']):
+            return False
+        
+        # Фильтр по типу
+        filter_type = self._filter_type
+        if filter_type == "Enabled":
+            return ext['loaded']
+        if filter_type == "Disabled":
+            return not ext['loaded']
+        if filter_type == "JavaScript":
+            return ext['type'] == 'js'
+        if filter_type == "Python":
+            return ext['type'] == 'python'
+        return True
+
 class ExtensionsWidget(QWidget):
+    # Шаблоны панели информации о выбранном расширении
+    _INFO_TEMPLATE = (
+        "<b>{name}</b> v{version}<br>"
+        "<i>{description}</i><br>"
+        "Author: {author} • Type: {type}<br>"
+        "Status: {status}"
+    )
+    _DETAILS_TEMPLATE = (
+        "Path: {path}\n"
+        "Main file: {main}\n"
+        "Type: {type}\n"
+        "Enabled: {enabled}\n"
+        "Loaded: {loaded}\n"
+        "\n"
+        "Dependencies: {dependencies}\n"
+    )
+    
     def __init__(self, ext_manager):
         super().__init__()
         self.ext_manager = ext_manager
+        self._model = ExtensionListModel(self)
+        self._proxy = ExtensionFilterProxy(self._model, self)
+        self._context_menu: Optional[QMenu] = None  # Создаётся при первом вызове
+        self._details_cache: Dict[str, tuple] = {}  # Имя -> (словарь, тексты панели)
+        self._list_dirty = False  # Список изменился, пока панель была скрыта
+        self._shown_extension: Optional[dict] = None  # Словарь, показанный в панели информации
         self.setup_ui()
         
     def setup_ui(self):
-        self.setStyleSheet("""
-            QWidget { 
-                background: #1c1c3c; 
-                color: white; 
-            }
-            QListWidget { 
-                background: #16172e; 
-                border: 1px solid rgba(255, 255, 255, 0.1);
-                border-radius: 8px;
-                padding: 4px;
-            }
-            QListWidget::item {
-                padding: 12px;
-                border-bottom: 1px solid rgba(255, 255, 255, 0.05);
-            }
-            QListWidget::item:selected {
-                background: rgba(91, 60, 196, 0.3);
-                border-radius: 6px;
-            }
-            QPushButton { 
-                background: #3f2b96; 
-                border: none; 
-                border-radius: 8px; 
-                padding: 10px 16px; 
-                color: white; 
-                font-weight: 500;
-            }
-            QPushButton:hover { 
-                background: #5b3cc4; 
-            }
-            QPushButton:disabled {
-                background: #2a1d66;
-                color: rgba(255, 255, 255, 0.5);
-            }
-            QLineEdit, QComboBox {
-                background: rgba(255, 255, 255, 0.1);
-                border: 1px solid rgba(255, 255, 255, 0.2);
-                border-radius: 8px;
-                padding: 8px 12px;
-                color: white;
-                font-size: 14px;
-            }
-            QLineEdit:focus, QComboBox:focus {
-                border-color: #9b5de5;
-                outline: none;
-            }
-            QLabel {
-                color: #dcd7ff;
-            }
-            QTabWidget::pane {
-                border: none;
-                background: transparent;
-            }
-            QTabBar::tab {
-                background: rgba(255, 255, 255, 0.1);
-                color: white;
-                padding: 10px 20px;
-                border-top-left-radius: 8px;
-                border-top-right-radius: 8px;
-                margin-right: 2px;
-            }
-            QTabBar::tab:selected {
-                background: rgba(91, 60, 196, 0.8);
-                font-weight: bold;
-            }
-            QTabBar::tab:hover {
-                background: rgba(91, 60, 196, 0.5);
-            }
-        """)
+        self.setStyleSheet(_EXT_WIDGET_QSS)
         
         layout = QVBoxLayout(self)
         layout.setContentsMargins(12, 12, 12, 12)
@@ -1657,7 +3293,12 @@ class ExtensionsWidget(QWidget):
         
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search extensions...")
-        self.search_input.textChanged.connect(self.filter_extensions)
+        # Фильтруем после паузы в наборе, а не на каждую букву
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(150)
+        self._filter_timer.timeout.connect(self.filter_extensions)
+        self.search_input.textChanged.connect(lambda _text: self._filter_timer.start())
         
         self.filter_combo = QComboBox()
         self.filter_combo.addItems(["All", "Enabled", "Disabled", "JavaScript", "Python"])
@@ -1683,10 +3324,16 @@ class ExtensionsWidget(QWidget):
         layout.addLayout(toolbar)
         
         # Список расширений
-        self.ext_list = QListWidget()
-        self.ext_list.itemClicked.connect(self.on_extension_selected)
+        # Строки одной высоты - представление не меряет каждую
+        self.ext_list = QListView()
+        self.ext_list.setModel(self._proxy)
+        self.ext_list.setUniformItemSizes(True)
+        self.ext_list.setItemDelegate(ExtensionItemDelegate(self.ext_list))
+        self.ext_list.clicked.connect(self.on_extension_selected)
         self.ext_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.ext_list.customContextMenuRequested.connect(self.show_context_menu)
+        self.ext_manager.extensions_scanned.connect(self.refresh_list)
+        self.ext_manager.extensions_changed.connect(self.refresh_list)
         
         layout.addWidget(self.ext_list)
         
@@ -1728,144 +3375,126 @@ class ExtensionsWidget(QWidget):
         self.refresh_list()
     
     def refresh_list(self):
-        """Обновляем список расширений"""
-        self.ext_list.clear()
-        extensions = self.ext_manager.get_extension_list()
-        
-        for ext in extensions:
-            item = QListWidgetItem()
-            
-            # Иконка статуса
-            if ext['loaded']:
-                status_icon = "✅"
-                status_text = "Enabled"
-            else:
-                if ext['enabled']:
-                    status_icon = "⚠️"
-                    status_text = "Error"
-                else:
-                    status_icon = "❌"
-                    status_text = "Disabled"
-            
-            # Иконка типа
-            if ext['type'] == 'js':
-                type_icon = "🧩"
-                type_text = "JS"
-            elif ext['type'] == 'python':
-                type_icon = "🐍"
-                type_text = "Python"
-            else:
-                type_icon = "❓"
-                type_text = "Unknown"
-            
-            item.setText(f"{status_icon} {type_icon} {ext['name']} v{ext['version']}")
-            item.setData(Qt.ItemDataRole.UserRole, ext)
-            
-            # Цвет в зависимости от статуса
-            if not ext['enabled']:
-                item.setForeground(QColor(100, 100, 100))
-            elif not ext['loaded'] and ext['enabled']:
-                item.setForeground(QColor(255, 165, 0))  # Оранжевый для ошибок
-            
-            self.ext_list.addItem(item)
+        """Обновляем список расширений: меняем только изменившиеся строки"""
+        if not self.isVisible():
+            # Скрытую панель обновим при показе (см. showEvent)
+            self._list_dirty = True
+            return
+        self._list_dirty = False
+        self._model.set_extensions(self.ext_manager.get_extension_list())
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._list_dirty:
+            self.refresh_list()
     
     def filter_extensions(self):
         """Фильтруем расширения по поиску и типу"""
-        search_text = self.search_input.text().lower()
-        filter_type = self.filter_combo.currentText()
-        
-        for i in range(self.ext_list.count()):
-            item = self.ext_list.item(i)
-            ext = item.data(Qt.ItemDataRole.UserRole)
-            
-            show = True
-            
-            # Фильтр по поиску
-            if search_text:
-                if search_text not in ext['name'].lower() and \
-                   search_text not in ext['description'].lower() and \
-                   search_text not in ext['author'].lower():
-                    show = False
-            
-            # Фильтр по типу
-            if filter_type == "Enabled" and not ext['loaded']:
-                show = False
-            elif filter_type == "Disabled" and ext['loaded']:
-                show = False
-            elif filter_type == "JavaScript" and ext['type'] != 'js':
-                show = False
-            elif filter_type == "Python" and ext['type'] != 'python':
-                show = False
-            
-            item.setHidden(not show)
-    
-    def on_extension_selected(self, item):
+        self._proxy.set_filter(self.search_input.text().lower(), self.filter_combo.currentText())
+    
+    def _extension_at(self, index) -> dict:
+        """Расширение по индексу представления"""
+        return self._model.extension(self._proxy.mapToSource(index).row())
+    
+    def on_extension_selected(self, index):
         """Обработка выбора расширения"""
-        ext = item.data(Qt.ItemDataRole.UserRole)
+        ext = self._extension_at(index)
+        # Повторный клик по тому же (неизменённому) расширению - панель уже заполнена
+        if ext is self._shown_extension:
+            return
+        self._shown_extension = ext
+        info, details = self._extension_details(ext)
         
         # Обновляем информацию
-        self.info_label.setText(f"""
-        <b>{ext['name']}</b> v{ext['version']}<br>
-        <i>{ext['description']}</i><br>
-        Author: {ext['author']} • Type: {ext['type']}<br>
-        Status: {'✅ Enabled' if ext['loaded'] else '❌ Disabled'}
-        """)
+        self.info_label.setText(info)
         
-        # Показываем детали
-        details = f"""Path: {ext['path']}
-Main file: {ext['main']}
-Type: {ext['type']}
-Enabled: {ext['enabled']}
-Loaded: {ext['loaded']}
-
-Dependencies: {json.dumps(ext.get('dependencies', {}), indent=2)}
-"""
-        self.details_text.setText(details)
+        # Показываем детали (обычный текст - без разбора HTML)
+        self.details_text.setPlainText(details)
+    
+    def _extension_details(self, ext: dict) -> tuple:
+        """Готовые тексты панели информации (html, детали) для расширения
+        
+        Словари из get_extension_list() не меняются, пока список не пересобран,
+        поэтому запомненный текст годен, пока словарь тот же самый объект.
+        """
+        cached = self._details_cache.get(ext['name'])
+        if cached is not None and cached[0] is ext:
+            return cached[1]
+        
+        texts = (
+            self._INFO_TEMPLATE.format_map({
+                **ext, 'status': '✅ Enabled' if ext['loaded'] else '❌ Disabled'
+            }),
+            self._DETAILS_TEMPLATE.format_map({
+                **ext, 'dependencies': json.dumps(ext.get('dependencies', {}), indent=2)
+            })
+        )
+        self._details_cache[ext['name']] = (ext, texts)
+        return texts
     
     def show_context_menu(self, position):
         """Показываем контекстное меню для расширения"""
-        item = self.ext_list.itemAt(position)
-        if not item:
+        index = self.ext_list.indexAt(position)
+        if not index.isValid():
             return
         
-        ext = item.data(Qt.ItemDataRole.UserRole)
-        menu = QMenu()
+        ext = self._extension_at(index)
+        if self._context_menu is None:
+            self._build_context_menu()
+        
+        # Меню создано один раз - подставляем расширение в данные действий
+        self._toggle_action.setText("🚫 Disable" if ext['loaded'] else "✅ Enable")
+        for action in (self._toggle_action, self._reload_action, self._uninstall_action):
+            action.setData(ext['name'])
+        self._open_folder_action.setData(ext['path'])
+        
+        self._context_menu.exec(self.ext_list.mapToGlobal(position))
+    
+    def _build_context_menu(self):
+        """Контекстное меню расширения (одно на виджет)"""
+        menu = QMenu(self)
         
         # Основные действия
-        if ext['loaded']:
-            disable_action = menu.addAction("🚫 Disable")
-            disable_action.triggered.connect(lambda: self.toggle_extension(ext['name']))
-        else:
-            enable_action = menu.addAction("✅ Enable")
-            enable_action.triggered.connect(lambda: self.toggle_extension(ext['name']))
+        self._toggle_action = menu.addAction("✅ Enable")
+        self._toggle_action.triggered.connect(self._on_toggle_action)
         
-        reload_action = menu.addAction("🔄 Reload")
-        reload_action.triggered.connect(lambda: self.reload_extension(ext['name']))
+        self._reload_action = menu.addAction("🔄 Reload")
+        self._reload_action.triggered.connect(self._on_reload_action)
         
         menu.addSeparator()
         
         # Дополнительные действия
-        open_folder_action = menu.addAction("📁 Open Folder")
-        open_folder_action.triggered.connect(lambda: self.open_extension_folder(ext['path']))
+        self._open_folder_action = menu.addAction("📁 Open Folder")
+        self._open_folder_action.triggered.connect(self._on_open_folder_action)
         
         menu.addSeparator()
         
         # Опасные действия
-        uninstall_action = menu.addAction("🗑 Uninstall")
-        uninstall_action.triggered.connect(lambda: self.uninstall_extension(ext['name']))
+        self._uninstall_action = menu.addAction("🗑 Uninstall")
+        self._uninstall_action.triggered.connect(self._on_uninstall_action)
         
-        menu.exec(self.ext_list.mapToGlobal(position))
+        self._context_menu = menu
+    
+    def _on_toggle_action(self):
+        self.toggle_extension(self._toggle_action.data())
+    
+    def _on_reload_action(self):
+        self.reload_extension(self._reload_action.data())
+    
+    def _on_open_folder_action(self):
+        self.open_extension_folder(self._open_folder_action.data())
+    
+    def _on_uninstall_action(self):
+        self.uninstall_extension(self._uninstall_action.data())
     
     def toggle_extension(self, name: str):
         """Включаем/выключаем расширение"""
         self.ext_manager.toggle_extension(name)
-        self.refresh_list()
         self.clear_selection()
     
     def reload_extension(self, name: str):
         """Перезагружаем расширение"""
         self.ext_manager.reload_extension(name)
-        self.refresh_list()
         self.clear_selection()
     
     def uninstall_extension(self, name: str):
@@ -1880,18 +3509,13 @@ Dependencies: {json.dumps(ext.get('dependencies', {}), indent=2)}
         if reply == QMessageBox.StandardButton.Yes:
             success = self.ext_manager.uninstall_extension(name)
             if success:
-                self.refresh_list()
                 self.clear_selection()
     
     def open_extension_folder(self, path: str):
         """Открываем папку расширения"""
-        try:
-            if os.name == 'nt':  # Windows
-                os.startfile(path)
-            elif os.name == 'posix':  # Linux/Mac
-                subprocess.run(['xdg-open', path])
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Cannot open folder: {e}")
+        # Qt сам выбирает файловый менеджер системы и не ждёт его запуска
+        if not QDesktopServices.openUrl(QUrl.fromLocalFile(path)):
+            QMessageBox.warning(self, "Error", f"Cannot open folder: {path}")
     
     def install_extension(self):
         """Устанавливаем новое расширение"""
@@ -1906,16 +3530,21 @@ Dependencies: {json.dumps(ext.get('dependencies', {}), indent=2)}
         )
         
         if dialog.exec():
-            for file_path in dialog.selectedFiles():
-                success = self.ext_manager.install_extension(file_path)
-                if success:
-                    QMessageBox.information(self, "Success", 
-                                          f"Extension installed successfully!")
-                else:
-                    QMessageBox.warning(self, "Error", 
-                                      f"Failed to install extension from:\n{file_path}")
-            
-            self.refresh_list()
+            # Файлы ставятся в фоне; итог - одним сообщением
+            self.ext_manager.install_extensions_async(
+                dialog.selectedFiles(), self._on_extensions_installed
+            )
+    
+    def _on_extensions_installed(self, installed: List[str], failed: List[str]):
+        """Итог установки выбранных файлов"""
+        if not failed:
+            QMessageBox.information(self, "Success", 
+                                  f"Extension installed successfully!" if len(installed) == 1 else
+                                  f"{len(installed)} extensions installed successfully!")
+        else:
+            QMessageBox.warning(self, "Error", 
+                              f"Installed: {len(installed)}, failed: {len(failed)}\n\n"
+                              f"Failed to install extension from:\n" + "\n".join(failed))
     
     def reload_all(self):
         """Перезагружаем все расширения"""
@@ -1927,7 +3556,6 @@ Dependencies: {json.dumps(ext.get('dependencies', {}), indent=2)}
         
         if reply == QMessageBox.StandardButton.Yes:
             self.ext_manager.reload_all_extensions()
-            self.refresh_list()
     
     def open_marketplace(self):
         """Открываем маркетплейс расширений"""
@@ -1939,10 +3567,61 @@ Dependencies: {json.dumps(ext.get('dependencies', {}), indent=2)}
     def clear_selection(self):
         """Очищаем выделение и информацию"""
         self.ext_list.clearSelection()
+        self._shown_extension = None
         self.info_label.setText("Select an extension to view details")
         self.details_text.clear()
 
 # ===== GIT Widget =====
+_GIT_WIDGET_QSS = """
+    QWidget {
+        background: #1c1c3c;
+        color: white;
+    }
+    QPushButton {
+        background: #2d2b55;
+        border: 1px solid #4b2fbf;
+        border-radius: 6px;
+        padding: 8px 12px;
+        color: white;
+        font-size: 12px;
+        margin: 2px;
+    }
+    QPushButton:hover {
+        background: #3f2b96;
+    }
+    QPushButton:disabled {
+        background: #444;
+        color: #888;
+        border-color: #666;
+    }
+    QListWidget {
+        background: #16172e;
+        border: 1px solid rgba(255, 255, 255, 0.1);
+        border-radius: 6px;
+        font-size: 12px;
+    }
+    QTextEdit {
+        background: #0f1224;
+        border: 1px solid rgba(255, 255, 255, 0.1);
+        border-radius: 6px;
+        color: #dcd7ff;
+        font-family: 'Consolas', monospace;
+        font-size: 11px;
+    }
+    QLabel {
+        color: #9b5de5;
+        font-weight: 600;
+    }
+    #warning_label {
+        color: #ff6b6b;
+        font-weight: bold;
+        padding: 10px;
+        background: rgba(255, 107, 107, 0.1);
+        border-radius: 6px;
+        border: 1px solid #ff6b6b;
+    }
+"""
+
 class GitWidget(QWidget):
     """Виджет для работы с Git с поддержкой graceful degradation"""
     
@@ -1951,6 +3630,10 @@ class GitWidget(QWidget):
         self.git_manager = git_manager
         self.editor = editor
         self.current_path = None
+        self._last_status_key = None  # Ключ статуса, показанного в apply_git_status
+        # Статус и история, пришедшие, пока панель была скрыта (показываем в showEvent)
+        self._pending_status: Optional[dict] = None
+        self._pending_history: Optional[List[dict]] = None
         self.setup_ui()
         
         # Отображаем статус Git при создании
@@ -1958,55 +3641,7 @@ class GitWidget(QWidget):
     
     def setup_ui(self):
         """Настраиваем интерфейс"""
-        self.setStyleSheet("""
-            QWidget {
-                background: #1c1c3c;
-                color: white;
-            }
-            QPushButton {
-                background: #2d2b55;
-                border: 1px solid #4b2fbf;
-                border-radius: 6px;
-                padding: 8px 12px;
-                color: white;
-                font-size: 12px;
-                margin: 2px;
-            }
-            QPushButton:hover {
-                background: #3f2b96;
-            }
-            QPushButton:disabled {
-                background: #444;
-                color: #888;
-                border-color: #666;
-            }
-            QListWidget {
-                background: #16172e;
-                border: 1px solid rgba(255, 255, 255, 0.1);
-                border-radius: 6px;
-                font-size: 12px;
-            }
-            QTextEdit {
-                background: #0f1224;
-                border: 1px solid rgba(255, 255, 255, 0.1);
-                border-radius: 6px;
-                color: #dcd7ff;
-                font-family: 'Consolas', monospace;
-                font-size: 11px;
-            }
-            QLabel {
-                color: #9b5de5;
-                font-weight: 600;
-            }
-            #warning_label {
-                color: #ff6b6b;
-                font-weight: bold;
-                padding: 10px;
-                background: rgba(255, 107, 107, 0.1);
-                border-radius: 6px;
-                border: 1px solid #ff6b6b;
-            }
-        """)
+        self.setStyleSheet(_GIT_WIDGET_QSS)
         
         layout = QVBoxLayout(self)
         layout.setContentsMargins(8, 8, 8, 8)
@@ -2069,6 +3704,12 @@ class GitWidget(QWidget):
         self.commit_message.setEnabled(False)
         layout.addWidget(self.commit_message)
         
+        # Элементы, доступные только при установленном Git
+        self._git_controls = [
+            self.btn_init, self.btn_status, self.btn_stage, self.btn_commit,
+            self.btn_pull, self.btn_push, self.commit_message
+        ]
+        
         # Список изменённых файлов
         self.changes_list = QListWidget()
         self.changes_list.itemClicked.connect(self.on_file_selected)
@@ -2087,39 +3728,30 @@ class GitWidget(QWidget):
         self.git_manager.git_commit_made.connect(self.on_commit_made)
         self.git_manager.git_error.connect(self.on_git_error)
         self.git_manager.git_not_installed.connect(self.on_git_not_installed)
+        self.git_manager.git_ready.connect(lambda installed: self.update_git_status_display())
+        self.git_manager.git_info_ready.connect(self.on_git_info_ready)
     
     def update_git_status_display(self):
         """Обновляем отображение статуса Git"""
-        if self.git_manager.git_installed:
+        # Надпись и списки ниже перезаписываются - следующий статус нужно показать заново
+        self._last_status_key = None
+        
+        if not self.git_manager.git_probed:
+            # Поиск Git ещё идёт в фоне — обновимся по сигналу git_ready
+            self.status_label.setText("Проверка Git...")
+            return
+        
+        installed = self.git_manager.git_installed
+        self._set_git_controls_enabled(installed)
+        
+        if installed:
             self.status_label.setText("✅ Git: Установлен")
-            self.warning_label.setVisible(False)
-            self.btn_install_git.setVisible(False)
-            
-            # Включаем все кнопки
-            self.btn_init.setEnabled(True)
-            self.btn_status.setEnabled(True)
-            self.btn_stage.setEnabled(True)
-            self.btn_commit.setEnabled(True)
-            self.btn_pull.setEnabled(True)
-            self.btn_push.setEnabled(True)
-            self.commit_message.setEnabled(True)
             
             # Обновляем информацию если есть путь
             if self.current_path:
                 self.refresh_git_info()
         else:
             self.status_label.setText("❌ Git: Не установлен")
-            self.warning_label.setVisible(True)
-            self.btn_install_git.setVisible(True)
-            
-            # Отключаем все кнопки кроме установки
-            self.btn_init.setEnabled(False)
-            self.btn_status.setEnabled(False)
-            self.btn_stage.setEnabled(False)
-            self.btn_commit.setEnabled(False)
-            self.btn_pull.setEnabled(False)
-            self.btn_push.setEnabled(False)
-            self.commit_message.setEnabled(False)
             
             # Очищаем списки
             self.changes_list.clear()
@@ -2127,6 +3759,20 @@ class GitWidget(QWidget):
             self.changes_list.addItem("Установите Git для отображения изменений")
             self.history_list.addItem("Установите Git для отображения истории")
     
+    def _set_git_controls_enabled(self, installed: bool):
+        """Включаем кнопки Git (или только кнопку установки) одной перерисовкой"""
+        # setEnabled/setVisible пересчитывают стиль виджета - трогаем только изменившиеся
+        self.setUpdatesEnabled(False)
+        try:
+            for control in self._git_controls:
+                if control.isEnabledTo(self) != installed:
+                    control.setEnabled(installed)
+            for widget in (self.warning_label, self.btn_install_git):
+                if widget.isVisibleTo(self) == installed:
+                    widget.setVisible(not installed)
+        finally:
+            self.setUpdatesEnabled(True)
+    
     def install_git(self):
         """Предлагаем установить Git"""
         self.git_manager._offer_git_installation()
@@ -2136,37 +3782,67 @@ class GitWidget(QWidget):
     def update_path(self, path: str):
         """Обновляем текущий путь"""
         self.current_path = path
+        self._pending_status = self._pending_history = None
         self.update_git_status_display()
     
     def refresh_git_info(self):
-        """Обновляем Git информацию"""
+        """Обновляем Git информацию (git запускается в фоне, см. on_git_info_ready)"""
         if not self.current_path or not self.git_manager.git_installed:
             return
         
-        status = self.git_manager.get_status(self.current_path)
+        self.git_manager.refresh_all(self.current_path, 10)
+    
+    def on_git_info_ready(self, path: str, status: dict, branches: list, history: list):
+        """Показываем результаты фонового обновления"""
+        if path != self.current_path:
+            return
+        
+        if not self.isVisible():
+            self._pending_status, self._pending_history = status, history
+            return
+        
+        self.apply_git_status(status)
+        if status.get('is_git') and status.get('git_available', True):
+            self.update_history_list(history)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        status, history = self._pending_status, self._pending_history
+        self._pending_status = self._pending_history = None
+        if status is not None:
+            self.apply_git_status(status)
+            if history is not None and status.get('is_git') and status.get('git_available', True):
+                self.update_history_list(history)
+    
+    def apply_git_status(self, status: dict):
+        """Показываем статус и список изменений"""
+        changed_files = status.get('changed_files', [])
+        untracked_files = status.get('untracked_files', [])
+        
+        # Тот же статус, что уже на экране - не трогаем надпись и списки
+        key = (
+            status.get('is_git'), status.get('git_available', True), status.get('branch'),
+            tuple((f['path'], f['change_type'], f['staged']) for f in changed_files),
+            tuple(untracked_files)
+        )
+        if key == self._last_status_key:
+            return
+        self._last_status_key = key
+        
         if status.get('is_git'):
-            branch = status.get('branch', 'unknown')
-            has_changes = status.get('has_changes', False)
-            untracked = status.get('untracked', False)
-            git_available = status.get('git_available', True)
-            
-            if not git_available:
+            if not status.get('git_available', True):
                 self.status_label.setText("Git: ⚠️ Ошибка доступа")
                 return
             
-            status_text = f"Git: 🌿 {branch}"
-            if has_changes:
-                status_text += " ⚠️ Изменения"
-            if untracked:
-                status_text += " ❓ Новые файлы"
-            
-            self.status_label.setText(status_text)
+            parts = [f"Git: 🌿 {status.get('branch', 'unknown')}"]
+            if status.get('has_changes'):
+                parts.append("⚠️ Изменения")
+            if untracked_files:
+                parts.append("❓ Новые файлы")
+            self.status_label.setText(" ".join(parts))
             
             # Обновляем список изменений
             self.update_changes_list(status)
-            
-            # Обновляем историю
-            self.update_history_list()
         else:
             self.status_label.setText("Git: Не инициализирован")
             self.changes_list.clear()
@@ -2175,41 +3851,44 @@ class GitWidget(QWidget):
     
     def update_changes_list(self, status: dict):
         """Обновляем список изменений"""
-        self.changes_list.clear()
-        
         changed_files = status.get('changed_files', [])
         untracked_files = status.get('untracked_files', [])
         
-        if not changed_files and not untracked_files:
-            self.changes_list.addItem("Нет изменений")
-            return
-        
-        for file in changed_files:
-            item = QListWidgetItem()
-            icon = "📦" if file['staged'] else "✏️"
-            item.setText(f"{icon} {file['path']} ({file['change_type']})")
-            self.changes_list.addItem(item)
+        # Собираем строки заранее и добавляем одним addItems без промежуточных перерисовок
+        lines = [
+            f"{'📦' if file['staged'] else '✏️'} {file['path']} ({file['change_type']})"
+            for file in changed_files
+        ]
+        lines.extend(f"❓ {file} (untracked)" for file in untracked_files)
+        if not lines:
+            lines.append("Нет изменений")
         
-        for file in untracked_files:
-            item = QListWidgetItem(f"❓ {file} (untracked)")
-            self.changes_list.addItem(item)
+        self.changes_list.setUpdatesEnabled(False)
+        try:
+            self.changes_list.clear()
+            self.changes_list.addItems(lines)
+        finally:
+            self.changes_list.setUpdatesEnabled(True)
     
-    def update_history_list(self):
+    def update_history_list(self, history: Optional[List[dict]] = None):
         """Обновляем историю коммитов"""
         if not self.current_path or not self.git_manager.git_installed:
             return
         
-        history = self.git_manager.get_history(self.current_path, 10)
-        self.history_list.clear()
+        if history is None:
+            history = self.git_manager.get_history(self.current_path, 10)
         
-        if not history:
-            self.history_list.addItem("Нет истории коммитов")
-            return
+        lines = [
+            f"🔹 {commit['hash']}: {commit['message']}\n   👤 {commit['author']} | 📅 {commit['date']}"
+            for commit in history
+        ] or ["Нет истории коммитов"]
         
-        for commit in history:
-            item_text = f"🔹 {commit['hash']}: {commit['message']}\n   👤 {commit['author']} | 📅 {commit['date']}"
-            item = QListWidgetItem(item_text)
-            self.history_list.addItem(item)
+        self.history_list.setUpdatesEnabled(False)
+        try:
+            self.history_list.clear()
+            self.history_list.addItems(lines)
+        finally:
+            self.history_list.setUpdatesEnabled(True)
     
     def on_git_not_installed(self):
         """Обработка отсутствия Git"""
@@ -2328,8 +4007,12 @@ class GitWidget(QWidget):
     
     def on_git_status_changed(self, path: str, status: dict):
         """Обработка изменения статуса Git"""
+        # Статус уже прочитан - только показываем (без повторного запроса к git)
         if path == self.current_path:
-            self.refresh_git_info()
+            if not self.isVisible():
+                self._pending_status = status
+                return
+            self.apply_git_status(status)
     
     def on_branch_changed(self, path: str, branch: str):
         """Обработка смены ветки"""
@@ -2350,82 +4033,701 @@ class GitWidget(QWidget):
         # TODO: Показать diff файла
         pass
 
-# ===== Главный редактор =====
-class LudvigEditor(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle(f"{APP_NAME} v{APP_VERSION}")
-        self.resize(1400, 900)
+# ===== Git диалоги =====
+class GitCommitDialog(QDialog):
+    """Окно коммита строится один раз; при показе меняются только сообщение и список файлов"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Git Commit")
+        self.setMinimumSize(400, 300)
         
-        # Сначала создаем GitManager но не логируем
-        self.git_manager = GitManager(self)
+        layout = QVBoxLayout(self)
         
-        # Пока не создаем ext_manager здесь!
-        # self.ext_manager = ExtensionManager(self)  # ← КОММЕНТИРУЕМ ЭТО
+        # Поле для сообщения
+        layout.addWidget(QLabel("Сообщение коммита:"))
         
-        # А ЭТУ СТРОЧКУ ТОЖЕ КОММЕНТИРУЕМ
-        # self.api = EditorAPI(self)
+        self.message_edit = QTextEdit()
+        self.message_edit.setPlaceholderText("Введите сообщение коммита...")
+        self.message_edit.setMinimumHeight(100)
         
-        # Список вкладок
-        self.tabs_data = []  # [(path, view, language), ...]
+        # Staged файлы (видны, только когда они есть)
+        self.files_label = QLabel("Файлы в stage:")
+        layout.addWidget(self.files_label)
         
-        # Настройка UI (ЭТО СОЗДАЕТ TERMINAL!)
-        self.setup_ui()
-        self.setup_shortcuts()
+        self.files_text = QTextEdit()
+        self.files_text.setReadOnly(True)
+        self.files_text.setMaximumHeight(80)
+        layout.addWidget(self.files_text)
         
-        # ТЕПЕРЬ создаем менеджеры
-        self.ext_manager = ExtensionManager(self)  # ← ПЕРЕНЕСЛИ СЮДА!
-        self.api = EditorAPI(self)  # ← И ЭТО ТОЖЕ!
+        layout.addWidget(self.message_edit)
+        
+        # Кнопки с быстрыми сообщениями: одно соединение на группу, текст кнопки = сообщение
+        quick_messages = QButtonGroup(self)
+        for msg in ("Update", "Fix bug", "Add feature", "Refactor code", "Initial commit"):
+            btn = QPushButton(msg)
+            quick_messages.addButton(btn)
+            layout.addWidget(btn)
+        quick_messages.buttonClicked.connect(lambda btn: self.message_edit.setText(btn.text()))
+        
+        # Кнопки
+        button_box = QDialogButtonBox()
+        button_box.addButton("💾 Commit", QDialogButtonBox.ButtonRole.AcceptRole)
+        button_box.addButton("Cancel", QDialogButtonBox.ButtonRole.RejectRole)
+        
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        
+        layout.addWidget(button_box)
+    
+    def prepare(self, staged: List[dict]):
+        """Очищаем сообщение и показываем файлы в stage (первые 10)"""
+        self.message_edit.clear()
+        
+        self.files_label.setVisible(bool(staged))
+        self.files_text.setVisible(bool(staged))
+        if staged:
+            self.files_text.setText("\n".join(
+                f"• {file['path']} ({file['change_type']})" for file in staged[:10]))
+            if len(staged) > 10:
+                self.files_text.append(f"\n... и ещё {len(staged) - 10} файлов")
+        
+        self.message_edit.setFocus()
+    
+    def message(self) -> str:
+        return self.message_edit.toPlainText().strip()
 
-        # Менеджер обновлений
-        self.update_manager = UpdateManager(self)
 
-        # Настраиваем автоматическую проверку
-        self.update_manager.setup_auto_check()
-        
-        # ТЕПЕРЬ настраиваем сигналы (ext_manager уже создан!)
-        self.setup_signals()
+class GitBranchDialog(QDialog):
+    """Окно новой ветки строится один раз; при показе меняются подпись и поле ввода"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Create Git Branch")
+        self.setMinimumSize(400, 200)
         
-        # Загружаем настройки
-        self.restore_settings()
+        layout = QVBoxLayout(self)
         
-        # Загружаем локальный редактор если нужно
-        self.setup_editor_url()
+        self.current_label = QLabel()
+        layout.addWidget(self.current_label)
+        layout.addWidget(QLabel("Имя новой ветки:"))
         
-        # ТЕПЕРЬ создаем виджеты (после setup_ui)
-        self.ext_widget = ExtensionsWidget(self.ext_manager)
-        self.ext_widget.setVisible(False)
+        self.branch_edit = QLineEdit()
+        self.branch_edit.setPlaceholderText("feature/new-feature")
+        layout.addWidget(self.branch_edit)
         
-        self.git_widget = GitWidget(self.git_manager, self)
-        self.git_widget.setVisible(False)
+        # Подсказки для имён веток
+        tips_label = QLabel("Подсказки:\n"
+                        "• feature/имя-фичи\n"
+                        "• bugfix/описание-бага\n"
+                        "• hotfix/срочное-исправление\n"
+                        "• release/версия")
+        tips_label.setStyleSheet("color: #888; font-size: 11px;")
+        layout.addWidget(tips_label)
         
-        # Добавляем виджеты в splitter
-        self.main_splitter.addWidget(self.ext_widget)
-        self.main_splitter.addWidget(self.git_widget)
+        button_box = QDialogButtonBox()
+        button_box.addButton("🌿 Create Branch", QDialogButtonBox.ButtonRole.AcceptRole)
+        button_box.addButton("Cancel", QDialogButtonBox.ButtonRole.RejectRole)
         
-        # Обновляем размеры splitter
-        self.main_splitter.setSizes([200, 800, 300, 300])
-        self.main_splitter.setStretchFactor(0, 0)
-        self.main_splitter.setStretchFactor(1, 1)
-        self.main_splitter.setStretchFactor(2, 0)
-        self.main_splitter.setStretchFactor(3, 0)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
         
-        # ТЕПЕРЬ можно логировать (terminal уже создан!)
-        if self.git_manager.git_installed:
-            self.log("✅ Git обнаружен и готов к работе", "success")
+        layout.addWidget(button_box)
+    
+    def prepare(self, current_branch: str):
+        """Показываем текущую ветку и очищаем поле ввода"""
+        self.current_label.setText(f"Текущая ветка: {current_branch}")
+        self.branch_edit.clear()
+        self.branch_edit.setFocus()
+    
+    def branch_name(self) -> str:
+        return self.branch_edit.text().strip()
+
+# ===== Языки редактора =====
+# Расширение файла -> язык Monaco (словарь строится один раз при импорте)
+_EXT_LANGUAGES = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.html': 'html',
+    '.htm': 'html',
+    '.css': 'css',
+    '.json': 'json',
+    '.xml': 'xml',
+    '.md': 'markdown',
+    '.txt': 'plaintext',
+    '.c': 'c',
+    '.cpp': 'cpp',
+    '.h': 'c',
+    '.hpp': 'cpp',
+    '.java': 'java',
+    '.php': 'php',
+    '.rb': 'ruby',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.swift': 'swift',
+    '.kt': 'kotlin',
+    '.ts': 'typescript',
+    '.sql': 'sql',
+    '.sh': 'shell',
+    '.bat': 'bat',
+    '.ps1': 'powershell',
+    '.yml': 'yaml',
+    '.yaml': 'yaml',
+    '.toml': 'toml',
+    '.ini': 'ini',
+    '.cfg': 'ini',
+}
+
+def _language_for_path(path: str) -> str:
+    """Язык Monaco по расширению файла"""
+    return _EXT_LANGUAGES.get(os.path.splitext(path)[1].lower(), 'plaintext')
+
+# ===== Вкладки редактора =====
+class EditorTabBar(QTabBar):
+    """Панель вкладок: размеры вкладок кэшируются по подписи, а не считаются на каждой раскладке"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # (подпись, выбрана ли) -> размер: выбранная вкладка в стилях жирная и шире
+        self._size_cache: Dict[tuple, QSize] = {}
+    
+    def tabSizeHint(self, index):
+        key = (self.tabText(index), index == self.currentIndex())
+        size = self._size_cache.get(key)
+        if size is None:
+            size = self._size_cache[key] = super().tabSizeHint(index)
+        return QSize(size)
+    
+    def changeEvent(self, event):
+        # Другой шрифт или стиль - другие размеры
+        if event.type() in (QEvent.Type.FontChange, QEvent.Type.StyleChange):
+            self._size_cache.clear()
+        super().changeEvent(event)
+
+# ===== Проводник =====
+# pathspec необязателен: с ним .gitignore разбирается точно, без него - приближённо через fnmatch
+try:
+    import pathspec
+except ImportError:
+    pathspec = None
+
+# Скрываем в любой папке, даже без .gitignore
+_DEFAULT_IGNORES = ('node_modules/', '__pycache__/', '*.pyc')
+
+class _IgnoreSpec:
+    """Шаблоны игнора проекта, собранные в один матчер (pathspec или одно регулярное выражение)"""
+    __slots__ = ('root', '_spec', '_regex')
+    
+    def __init__(self, root: Optional[str], patterns: List[str]):
+        self.root = root
+        self._spec = None
+        self._regex = None
+        if pathspec is not None:
+            self._spec = pathspec.PathSpec.from_lines('gitwildmatch', patterns)
         else:
-            self.log("⚠️ Git не установлен. Функции Git будут доступны после установки.", "warning")
+            parts = [self._translate(p) for p in patterns]
+            parts = [p for p in parts if p]
+            if parts:
+                self._regex = re.compile('|'.join(f'(?:{p})' for p in parts))
+    
+    @classmethod
+    def for_project(cls, root: Optional[str]) -> '_IgnoreSpec':
+        """Шаблоны по умолчанию плюс .gitignore из корня проекта"""
+        patterns = list(_DEFAULT_IGNORES)
+        if root:
+            try:
+                with open(os.path.join(root, '.gitignore'), 'r', encoding='utf-8') as f:
+                    patterns.extend(f.read().splitlines())
+            except (OSError, UnicodeDecodeError):
+                pass
+        return cls(root, patterns)
+    
+    @staticmethod
+    def _translate(pattern: str) -> Optional[str]:
+        """Шаблон .gitignore -> регулярное выражение (без отрицаний и '**')"""
+        pattern = pattern.strip()
+        if not pattern or pattern.startswith(('#', '!')):
+            return None
+        dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        # Шаблон с '/' привязан к корню, без него - совпадает на любой глубине
+        anchored = '/' in pattern
+        pattern = pattern.lstrip('/')
+        regex = fnmatch.translate(pattern)
+        if regex.endswith('\\Z'):
+            regex = regex[:-2]
+        return ('' if anchored else '(?:.*/)?') + regex + ('/' if dir_only else '(?:/|\\Z)')
+    
+    def match(self, path: str, is_dir: bool) -> bool:
+        """Путь игнорируется (у папок проверяется с завершающим '/')"""
+        if self._spec is None and self._regex is None:
+            return False
+        if self.root:
+            rel = os.path.relpath(path, self.root).replace(os.sep, '/')
+            if rel.startswith('..'):
+                rel = os.path.basename(path)  # Вне проекта - только по имени
+        else:
+            rel = os.path.basename(path)
+        if is_dir:
+            rel += '/'
+        if self._spec is not None:
+            return self._spec.match_file(rel)
+        return self._regex.match(rel) is not None
+
+_FILE_ATTRIBUTE_HIDDEN = 0x2  # stat.FILE_ATTRIBUTE_HIDDEN на Windows
+
+def _is_hidden_entry(entry) -> bool:
+    """Скрытые записи, как в QFileSystemModel без QDir.Filter.Hidden"""
+    if entry.name.startswith('.'):
+        return True
+    if os.name == 'nt':
+        # На Windows атрибуты приходят вместе с записью каталога - stat() бесплатный
+        try:
+            return bool(entry.stat().st_file_attributes & _FILE_ATTRIBUTE_HIDDEN)
+        except OSError:
+            return False
+    return False
+
+class _FsNode:
+    # Узлов столько же, сколько показанных записей — обходимся без __dict__
+    __slots__ = ('path', 'name', 'is_dir', 'parent', 'row', 'children', 'loading')
+    
+    def __init__(self, path: str, name: str, is_dir: bool,
+                 parent: Optional['_FsNode'] = None, row: int = 0):
+        self.path = path
+        self.name = name
+        self.is_dir = is_dir
+        self.parent = parent
+        self.row = row
+        self.children: Optional[List['_FsNode']] = None  # None - папка ещё не прочитана
+        self.loading = False
+
+class LazyFileSystemModel(QAbstractItemModel):
+    """Дерево файлов для проводника: папка читается в фоне только при раскрытии
+    
+    За диском следим только в прочитанных папках; свёрнутые не наблюдаются.
+    """
+    
+    # Сколько прочитанных папок держим в кэше: свёрнутая и снова раскрытая папка не читается заново
+    _CACHE_SIZE = 4096
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._root_path = ""
+        self._cache: Dict[str, tuple] = {}  # Путь -> (mtime_ns, [(имя, папка?), ...])
+        self._ignore = _IgnoreSpec.for_project(None)
+        self._icon_provider = None
+        self._icons: Dict[bool, QIcon] = {}
+        
+        # Наблюдаем только прочитанные папки; пачку событий обрабатываем через 250 мс
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._watched: set = set()
+        self._changed_dirs: set = set()
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(250)
+        self._refresh_timer.timeout.connect(self._refresh_changed)
+        
+        # Верхний уровень - корни дисков (на POSIX это просто "/")
+        self._root = _FsNode("", "", True)
+        self._root.children = []
+        for row, info in enumerate(QDir.drives()):
+            path = os.path.normpath(info.absoluteFilePath())
+            self._root.children.append(_FsNode(path, path, True, self._root, row))
+    
+    # ===== QAbstractItemModel =====
+    def index(self, row, column=0, parent=QModelIndex()):
+        node = self._node(parent)
+        if column != 0 or node.children is None or not 0 <= row < len(node.children):
+            return QModelIndex()
+        return self.createIndex(row, 0, node.children[row])
+    
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        return self._index_of(index.internalPointer().parent)
     
-    def setup_editor_url(self):
-        """Настраиваем URL редактора"""
-        global EDITOR_URL
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self._node(parent).children or ())
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+    
+    def hasChildren(self, parent=QModelIndex()):
+        # Непрочитанную папку считаем непустой: стрелку рисуем без обращения к диску
+        node = self._node(parent)
+        return node.is_dir and (node.children is None or bool(node.children))
+    
+    def canFetchMore(self, parent):
+        node = self._node(parent)
+        return node.is_dir and node.children is None and not node.loading
+    
+    def fetchMore(self, parent):
+        node = self._node(parent)
+        if node.children is None and not node.loading:
+            self._load(node)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
         
-        # Создаем локальный редактор если нет интернета
-        LOCAL_EDITOR_PATH = os.path.join(os.path.dirname(__file__), "editor.html")
+        node = index.internalPointer()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return node.name
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self._icon(node.is_dir)
+        return None
+    
+    # ===== Совместимость с QFileSystemModel =====
+    def filePath(self, index) -> str:
+        return self._node(index).path
+    
+    def rootPath(self) -> str:
+        return self._root_path
+    
+    def setRootPath(self, path: str) -> QModelIndex:
+        """Запоминаем папку проекта и возвращаем её индекс для setRootIndex"""
+        self._root_path = os.path.normpath(path)
+        
+        # Другой проект - другие шаблоны игнора: прочитанное со старыми больше не годится
+        self._ignore = _IgnoreSpec.for_project(self._root_path)
+        self._cache.clear()
+        
+        node = self._find_node(self._root_path, load=True)
+        if node is None:
+            return QModelIndex()
+        if node.children is not None:
+            self._load(node, replace=True)
+        return self._index_of(node)
+    
+    # ===== Загрузка =====
+    def refresh(self, path: str, force: bool = True):
+        """Перечитываем уже показанную папку
         
-        if not check_internet() and not os.path.exists(LOCAL_EDITOR_PATH):
-            # Используем упрощенную версию из кода выше
-            html_content = """<!DOCTYPE html>
+        force=True - изменения из самого редактора: кэш не проверяем. Наблюдатель
+        вызывает с force=False - папку с прежним mtime не трогаем.
+        """
+        node = self._find_node(os.path.normpath(path), load=False)
+        if node is not None and node.children is not None:
+            if force:
+                self._cache.pop(node.path, None)
+            self._load(node, replace=True)
+    
+    def release(self, index):
+        """Свёрнутая папка отпускает дочерние узлы - при раскрытии они вернутся из кэша"""
+        node = self._node(index)
+        if node is self._root or not node.children:
+            return
+        self._unwatch(node)
+        self.beginRemoveRows(index, 0, len(node.children) - 1)
+        node.children = None
+        self.endRemoveRows()
+    
+    def _load(self, node: _FsNode, replace: bool = False):
+        node.loading = True
+        cached = self._cache.get(node.path)
+        run_in_background(
+            self._scan_dir, node.path, cached, self._ignore,
+            on_done=lambda result, node=node: self._on_scanned(node, result, replace, cached),
+            on_error=lambda error, node=node: self._on_scanned(node, None, replace)
+        )
+    
+    @staticmethod
+    def _scan_dir(path: str, cached: Optional[tuple], ignore: _IgnoreSpec) -> tuple:
+        """Читаем папку (в пуле потоков): папки первыми, без stat() на каждую запись"""
+        mtime = os.stat(path).st_mtime_ns
+        if cached is not None and cached[0] == mtime:
+            return cached
+        
+        entries = []
+        with os.scandir(path) as it:
+            for entry in it:
+                if _is_hidden_entry(entry):
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                # node_modules и т.п. не попадают в дерево вовсе
+                if ignore.match(entry.path, is_dir):
+                    continue
+                entries.append((entry.name, is_dir))
+        # Имя последним ключом: порядок однозначный, на нём держится сравнение в _set_children
+        entries.sort(key=lambda e: (not e[1], e[0].casefold(), e[0]))
+        return mtime, entries
+    
+    def _on_scanned(self, node: _FsNode, result: Optional[tuple], replace: bool,
+                    cached: Optional[tuple] = None):
+        node.loading = False
+        # Пока читали, папку могли свернуть или уже прочитать синхронно из setRootPath
+        if not self._is_attached(node) or (node.children is not None and not replace):
+            return
+        # mtime не изменился - показанные строки уже такие же
+        if result is not None and result is cached and node.children is not None:
+            return
+        
+        if result is None:
+            entries = []  # Нет доступа - показываем папку пустой
+        else:
+            self._remember(node.path, result)
+            entries = result[1]
+        self._set_children(node, entries)
+    
+    def _set_children(self, node: _FsNode, entries: list):
+        parent_index = self._index_of(node)
+        if node is not self._root and node.path not in self._watched:
+            self._watched.add(node.path)
+            self._watcher.addPath(node.path)
+        if node.children is None:
+            node.children = []
+        
+        # Сравниваем со старым списком: оставшиеся узлы (с раскрытыми папками
+        # внутри и наблюдением) не пересоздаём, меняем только строки, которых
+        # больше нет или ещё не было. Оба списка отсортированы одинаково.
+        wanted = set(entries)
+        children = node.children
+        row = len(children) - 1
+        while row >= 0:
+            if (children[row].name, children[row].is_dir) in wanted:
+                row -= 1
+                continue
+            # Подряд идущие исчезнувшие строки убираем одним сигналом
+            last = row
+            while row >= 0 and (children[row].name, children[row].is_dir) not in wanted:
+                self._unwatch(children[row])
+                row -= 1
+            self.beginRemoveRows(parent_index, row + 1, last)
+            del children[row + 1:last + 1]
+            self._renumber(children, row + 1)
+            self.endRemoveRows()
+        
+        kept = {(child.name, child.is_dir) for child in children}
+        row = 0
+        while row < len(entries):
+            if entries[row] in kept:
+                row += 1
+                continue
+            end = row
+            while end < len(entries) and entries[end] not in kept:
+                end += 1
+            self.beginInsertRows(parent_index, row, end - 1)
+            children[row:row] = [_FsNode(os.path.join(node.path, name), name, is_dir, node)
+                                 for name, is_dir in entries[row:end]]
+            self._renumber(children, row)
+            self.endInsertRows()
+            row = end
+        
+        if not children and parent_index.isValid():
+            # Пустая папка - убираем стрелку раскрытия
+            self.dataChanged.emit(parent_index, parent_index)
+    
+    @staticmethod
+    def _renumber(children: List[_FsNode], start: int):
+        for row in range(start, len(children)):
+            children[row].row = row
+    
+    def _unwatch(self, node: _FsNode):
+        """Перестаём следить за папкой и всеми прочитанными папками внутри"""
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.path in self._watched:
+                self._watched.discard(node.path)
+                self._watcher.removePath(node.path)
+            if node.children:
+                stack.extend(child for child in node.children if child.children is not None)
+    
+    def _on_directory_changed(self, path: str):
+        self._changed_dirs.add(path)
+        if not self._refresh_timer.isActive():
+            self._refresh_timer.start()
+    
+    def _refresh_changed(self):
+        """Перечитываем папки, изменившиеся за последние 250 мс"""
+        changed, self._changed_dirs = self._changed_dirs, set()
+        for path in changed:
+            self.refresh(path, force=False)
+    
+    def _remember(self, path: str, result: tuple):
+        """Кэш прочитанных папок с вытеснением самых старых"""
+        self._cache.pop(path, None)
+        self._cache[path] = result
+        if len(self._cache) > self._CACHE_SIZE:
+            del self._cache[next(iter(self._cache))]
+    
+    # ===== Узлы =====
+    def _node(self, index) -> _FsNode:
+        return index.internalPointer() if index.isValid() else self._root
+    
+    def _index_of(self, node: Optional[_FsNode]) -> QModelIndex:
+        if node is None or node is self._root:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node)
+    
+    def _is_attached(self, node: _FsNode) -> bool:
+        """Узел всё ещё в дереве (его предков не свернули)"""
+        while node.parent is not None:
+            siblings = node.parent.children
+            if siblings is None or node.row >= len(siblings) or siblings[node.row] is not node:
+                return False
+            node = node.parent
+        return node is self._root
+    
+    def _find_node(self, path: str, load: bool) -> Optional[_FsNode]:
+        """Ищем узел по пути; с load=True недочитанные папки по дороге читаем сразу"""
+        parts = Path(path).parts
+        if not parts:
+            return None
+        
+        node = self._root
+        for part in parts:
+            if node.children is None:
+                if not load or not self._scan_now(node):
+                    return None
+            
+            key = os.path.normcase(os.path.normpath(part))
+            child = self._child_named(node, key)
+            # Папку могли создать уже после чтения родителя - перечитываем его
+            if child is None and load and node is not self._root:
+                self._cache.pop(node.path, None)
+                if self._scan_now(node):
+                    child = self._child_named(node, key)
+            if child is None:
+                return None
+            node = child
+        return node
+    
+    @staticmethod
+    def _child_named(node: _FsNode, key: str) -> Optional[_FsNode]:
+        """Дочерний узел по имени (key уже в normcase)"""
+        return next((child for child in node.children
+                     if os.path.normcase(child.name) == key), None)
+    
+    def _scan_now(self, node: _FsNode) -> bool:
+        """Синхронно читаем папку узла; False - прочитать не удалось"""
+        try:
+            result = self._scan_dir(node.path, self._cache.get(node.path), self._ignore)
+        except OSError:
+            return False
+        self._remember(node.path, result)
+        self._set_children(node, result[1])
+        return True
+    
+    def _icon(self, is_dir: bool) -> QIcon:
+        """Значки берём только для видимых строк и только два: папка и файл"""
+        icon = self._icons.get(is_dir)
+        if icon is None:
+            if self._icon_provider is None:
+                self._icon_provider = QFileIconProvider()
+            kind = QFileIconProvider.IconType.Folder if is_dir else QFileIconProvider.IconType.File
+            icon = self._icons[is_dir] = self._icon_provider.icon(kind)
+        return icon
+
+# Обход папки для "Свойств" ограничен: корень диска или домашняя папка
+# не должны минутами занимать поток общего пула
+_PROPERTIES_MAX_DEPTH = 32
+_PROPERTIES_MAX_ENTRIES = 200_000
+
+def _path_properties(path: str, cancelled: Optional[threading.Event] = None) -> Optional[dict]:
+    """Свойства файла/папки для диалога (в пуле потоков): у папки - суммарный размер файлов
+    
+    При достижении лимитов обхода truncated=True - размер тогда "не меньше".
+    None - запрос отменён (cancelled), пока шёл обход.
+    """
+    stat = os.stat(path)
+    info = {'is_dir': os.path.isdir(path), 'size': stat.st_size,
+            'mtime': datetime.fromtimestamp(stat.st_mtime), 'files': 0, 'truncated': False}
+    if not info['is_dir']:
+        return info
+    
+    # Обход без рекурсии; scandir отдаёт stat записи без отдельного вызова на файл (Windows)
+    size = files = entries = 0
+    pending = [(path, 0)]
+    while pending:
+        if cancelled is not None and cancelled.is_set():
+            return None
+        folder, depth = pending.pop()
+        try:
+            it = os.scandir(folder)
+        except OSError:
+            continue  # Нет доступа к подпапке - считаем остальное
+        with it:
+            for entry in it:
+                entries += 1
+                if entries > _PROPERTIES_MAX_ENTRIES:
+                    info['truncated'] = True
+                    pending.clear()
+                    break
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if depth < _PROPERTIES_MAX_DEPTH:
+                            pending.append((entry.path, depth + 1))
+                        else:
+                            info['truncated'] = True
+                    elif entry.is_file(follow_symlinks=False):
+                        size += entry.stat(follow_symlinks=False).st_size
+                        files += 1
+                except OSError:
+                    continue
+    info['size'] = size
+    info['files'] = files
+    return info
+
+# ===== Локальный редактор =====
+# Используется без интернета; файл переписывается, только когда меняется шаблон
+LOCAL_EDITOR_PATH = os.path.join(_SCRIPT_DIR, "editor.html")
+
+# Модель Monaco на вкладку: у каждой своя история undo/redo и положение курсора.
+# Один общий редактор переключается между ними через setModel. Скрипт есть в
+# локальном editor.html и внедряется в онлайн-страницу после её загрузки.
+_TAB_MODELS_JS = """
+if (!window.__ludvigShowModel) {
+    const models = new Map(), viewStates = new Map();
+    let currentKey = null;
+    window.__ludvigShowModel = (key, code, lang) => {
+        const editor = window.editor;
+        if (key === null) {
+            monaco.editor.setModelLanguage(editor.getModel(), lang);
+            editor.setValue(code);
+            return;
+        }
+        if (currentKey !== null && currentKey !== key && models.has(currentKey)) {
+            viewStates.set(currentKey, editor.saveViewState());
+        }
+        let model = models.get(key);
+        if (!model || model.isDisposed()) {
+            model = monaco.editor.createModel(code, lang);
+            models.set(key, model);
+        } else {
+            if (model.getValue() !== code) {
+                // Правкой, а не setValue: история undo остаётся
+                model.pushEditOperations([], [{ range: model.getFullModelRange(), text: code }], () => null);
+            }
+            monaco.editor.setModelLanguage(model, lang);
+        }
+        if (editor.getModel() !== model) {
+            editor.setModel(model);
+            const state = viewStates.get(key);
+            if (state) editor.restoreViewState(state);
+        }
+        currentKey = key;
+    };
+    window.__ludvigDropModels = keys => {
+        for (const key of keys) {
+            const model = models.get(key);
+            models.delete(key);
+            viewStates.delete(key);
+            if (key === currentKey) currentKey = null;
+            if (model && !model.isDisposed()) model.dispose();
+        }
+    };
+}
+"""
+
+_LOCAL_EDITOR_HTML = """<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8">
@@ -2534,7 +4836,16 @@ html, body {
 <script>
 require.config({ paths: { vs: "https://cdnjs.cloudflare.com/ajax/libs/monaco-editor/0.45.0/min/vs" } });
 
-require(["vs/editor/editor.main"], function () {
+// Monaco (несколько МБ JS) грузим при первом setCode, а не при открытии страницы
+let monacoPromise = null;
+let pendingCode = "";
+// Окно редактора свёрнуто (сообщает PyQt через __setEditorVisible)
+let hostVisible = true;
+window.__setEditorVisible = visible => {
+    hostVisible = visible;
+    if (window.__applyEditorVisibility) window.__applyEditorVisibility();
+};
+window.__ensureMonaco = () => monacoPromise ||= new Promise(resolve => require(["vs/editor/editor.main"], function () {
 
     // ===== THEME =====
     monaco.editor.defineTheme("ludvig-gradient", {
@@ -2558,10 +4869,11 @@ require(["vs/editor/editor.main"], function () {
 
     // ===== EDITOR =====
     window.editor = monaco.editor.create(document.getElementById("editor"), {
-        value: "# LudvigEditor\nprint('Gradient future 🚀')",
-        language: "python",
+        value: "",
+        language: "plaintext",
         theme: "ludvig-gradient",
-        automaticLayout: true,
+        // Размеры отслеживаем сами через ResizeObserver (ниже)
+        automaticLayout: false,
         fontFamily: "JetBrains Mono, Consolas, monospace",
         fontSize: 14,
         fontLigatures: true,
@@ -2572,6 +4884,44 @@ require(["vs/editor/editor.main"], function () {
         dragAndDrop: true
     });
 
+    // ===== LAYOUT =====
+    // layout() только при реальном изменении размеров контейнера; геометрию кэшируем
+    const editorElement = document.getElementById("editor");
+    let lastW = 0, lastH = 0;
+    window.editorLayoutInfo = editor.getLayoutInfo();
+    new ResizeObserver(entries => {
+        const rect = entries[entries.length - 1].contentRect;
+        const w = Math.round(rect.width), h = Math.round(rect.height);
+        if (w === lastW && h === lastH) return;
+        lastW = w;
+        lastH = h;
+        editor.layout({ width: w, height: h });
+        window.editorLayoutInfo = editor.getLayoutInfo();
+    }).observe(editorElement);
+    editor.onDidChangeConfiguration(e => {
+        if (e.hasChanged(monaco.editor.EditorOption.fontInfo)) {
+            window.editorLayoutInfo = editor.getLayoutInfo();
+        }
+    });
+
+    // ===== VISIBILITY =====
+    // Миникарту и подсветку строки рисуем, только пока редактор реально виден
+    let onScreen = true, shownState = true;
+    window.__applyEditorVisibility = () => {
+        const visible = onScreen && hostVisible;
+        if (visible === shownState) return;
+        shownState = visible;
+        editor.updateOptions({
+            minimap: { enabled: visible },
+            renderLineHighlight: visible ? "line" : "none"
+        });
+    };
+    new IntersectionObserver(([entry]) => {
+        onScreen = entry.isIntersecting;
+        window.__applyEditorVisibility();
+    }, { threshold: 0.01 }).observe(editorElement);
+    window.__applyEditorVisibility();
+
     // ===== LANGUAGE SWITCH =====
     const langSelect = document.getElementById("langSelect");
     langSelect.addEventListener("change", () => {
@@ -2579,49 +4929,463 @@ require(["vs/editor/editor.main"], function () {
     });
 
     // ===== SEARCH =====
+    // Ввод копим 60 мс; виджет поиска открываем один раз, дальше меняем только строку
     const searchInput = document.getElementById("searchInput");
-    searchInput.addEventListener("input", () => {
+    let searchTimer = null;
+    const applySearch = () => {
+        searchTimer = null;
         const term = searchInput.value;
-        const findController = editor.getContribution('editor.contrib.findController');
-        if(term) {
+        const findState = editor.getContribution('editor.contrib.findController').getState();
+        if(term && !findState.isRevealed) {
             editor.getAction('actions.find').run().then(() => {
-                findController.getState().change({ searchString: term }, false);
+                findState.change({ searchString: searchInput.value }, false);
             });
         } else {
-            findController.getState().change({ searchString: '' }, false);
+            findState.change({ searchString: term }, false);
         }
+    };
+    searchInput.addEventListener("input", () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(applySearch, 60);
     });
 
-    // ===== API FOR PYQT =====
-    window.setCode = (code, lang = "python") => {
-        monaco.editor.setModelLanguage(editor.getModel(), lang);
-        editor.setValue(code);
-    };
+    resolve();
+}));
 
-    window.getCode = () => editor.getValue();
-    window.pySave = null; // Для PyQt6
-});
+// ===== API FOR PYQT =====
+""" + _TAB_MODELS_JS + """
+// key - вкладка PyQt (у каждой своя модель); без key код просто заменяется
+window.setCode = async (code, lang = "python", key = null) => {
+    pendingCode = code;
+    await window.__ensureMonaco();
+    window.__ludvigShowModel(key, code, lang);
+};
+
+// До загрузки Monaco отдаём код, который в него ещё только ставится
+window.getCode = () => window.editor ? editor.getValue() : pendingCode;
+window.pySave = null; // Для PyQt6
 </script>
 </body>
 </html>"""
-            
-            try:
-                with open(LOCAL_EDITOR_PATH, 'w', encoding='utf-8') as f:
-                    f.write(html_content)
-                # Используем обычный print вместо log
-                print("ℹ️ Создан локальный редактор (интернет отсутствует)")
-            except Exception as e:
-                print(f"❌ Ошибка создания локального редактора: {e}")
+_LOCAL_EDITOR_DIGEST = hashlib.blake2b(_LOCAL_EDITOR_HTML.encode('utf-8'), digest_size=16).hexdigest()
+
+def _write_local_editor():
+    """Пишем локальный editor.html, если его нет или шаблон изменился с прошлой записи"""
+    if (SETTINGS.value("editor/local_digest", "", type=str) == _LOCAL_EDITOR_DIGEST
+            and os.path.exists(LOCAL_EDITOR_PATH)):
+        return
+    try:
+        with open(LOCAL_EDITOR_PATH, 'w', encoding='utf-8') as f:
+            f.write(_LOCAL_EDITOR_HTML)
+        SETTINGS.setValue("editor/local_digest", _LOCAL_EDITOR_DIGEST)
+        # Используем обычный print вместо log
+        print("ℹ️ Создан локальный редактор (интернет отсутствует)")
+    except Exception as e:
+        print(f"❌ Ошибка создания локального редактора: {e}")
+
+# ===== Стили главного окна =====
+# Стили панелей окна разбираются один раз: общий лист на окне, панели выбираются по objectName
+_SIDEBAR_QSS = """
+    QFrame#sidebar {
+        background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+            stop:0 #3f2b96, stop:1 #1a1b3a);
+        border-right: 1px solid rgba(255, 255, 255, 0.1);
+    }
+    QFrame#sidebar QPushButton {
+        background: transparent;
+        border: none;
+        color: white;
+        padding: 12px;
+        font-size: 20px;
+        border-radius: 6px;
+        margin: 4px;
+    }
+    QFrame#sidebar QPushButton:hover {
+        background: rgba(255, 255, 255, 0.15);
+    }
+    QFrame#sidebar QPushButton:checked {
+        background: rgba(255, 255, 255, 0.25);
+    }
+"""
+
+_EXPLORER_QSS = """
+    QTreeView#explorer {
+        background: #16172e;
+        color: #e0e0ff;
+        border: none;
+        font-size: 13px;
+        outline: none;
+    }
+    QTreeView#explorer::item {
+        padding: 4px;
+        border-radius: 4px;
+    }
+    QTreeView#explorer::item:selected {
+        background: #5b3cc4;
+        color: white;
+    }
+    QTreeView#explorer::item:hover {
+        background: rgba(255, 255, 255, 0.1);
+    }
+    QTreeView#explorer QHeaderView::section {
+        background: #1a1b3a;
+        color: #a0a0ff;
+        padding: 4px;
+        border: none;
+    }
+"""
+
+_TABS_QSS = """
+    QTabWidget#editorTabs::pane {
+        border: none;
+        background: #1a1b3a;
+    }
+    QTabWidget#editorTabs QTabBar::tab {
+        background: rgba(255, 255, 255, 0.1);
+        color: rgba(255, 255, 255, 0.7);
+        padding: 8px 16px;
+        border-top-left-radius: 6px;
+        border-top-right-radius: 6px;
+        margin-right: 2px;
+        min-width: 100px;
+        font-size: 12px;
+    }
+    QTabWidget#editorTabs QTabBar::tab:selected {
+        background: rgba(91, 60, 196, 0.8);
+        color: white;
+        font-weight: bold;
+    }
+    QTabWidget#editorTabs QTabBar::tab:hover {
+        background: rgba(91, 60, 196, 0.5);
+    }
+    QTabWidget#editorTabs QTabBar::close-button {
+        image: url(none);
+        subcontrol-position: right;
+        padding: 2px;
+    }
+    QTabWidget#editorTabs QTabBar::close-button:hover {
+        background: rgba(255, 255, 255, 0.2);
+        border-radius: 4px;
+    }
+"""
+
+_TERMINAL_QSS = """
+    QPlainTextEdit#terminal {
+        background: #0f1224;
+        color: #dcd7ff;
+        border: none;
+        border-top: 1px solid rgba(255, 255, 255, 0.1);
+        font-family: 'Consolas', 'Monaco', monospace;
+        font-size: 12px;
+        padding: 10px;
+    }
+    QPlainTextEdit#terminal QScrollBar:vertical {
+        background: rgba(255, 255, 255, 0.05);
+        width: 12px;
+        border-radius: 6px;
+    }
+    QPlainTextEdit#terminal QScrollBar::handle:vertical {
+        background: rgba(130, 130, 220, 0.4);
+        border-radius: 6px;
+        min-height: 20px;
+    }
+    QPlainTextEdit#terminal QScrollBar::handle:vertical:hover {
+        background: rgba(130, 130, 220, 0.6);
+    }
+"""
+
+_STATUSBAR_QSS = """
+    QStatusBar#statusBar {
+        background: rgba(26, 27, 58, 0.9);
+        color: #a0a0ff;
+        border-top: 1px solid rgba(255, 255, 255, 0.1);
+        font-size: 12px;
+    }
+"""
+
+_MENU_QSS = """
+    QMenuBar#menuBar {
+        background: rgba(40, 41, 82, 0.9);
+        color: white;
+        border-bottom: 1px solid rgba(255, 255, 255, 0.1);
+    }
+    QMenuBar#menuBar::item {
+        padding: 5px 10px;
+        background: transparent;
+    }
+    QMenuBar#menuBar::item:selected {
+        background: rgba(255, 255, 255, 0.15);
+        border-radius: 4px;
+    }
+    QMenuBar#menuBar QMenu {
+        background: rgba(40, 41, 82, 0.95);
+        color: white;
+        border: 1px solid rgba(255, 255, 255, 0.2);
+        border-radius: 6px;
+        padding: 5px;
+    }
+    QMenuBar#menuBar QMenu::item {
+        padding: 5px 20px 5px 20px;
+    }
+    QMenuBar#menuBar QMenu::item:selected {
+        background: rgba(91, 60, 196, 0.7);
+        border-radius: 4px;
+    }
+    QMenuBar#menuBar QMenu::separator {
+        height: 1px;
+        background: rgba(255, 255, 255, 0.1);
+        margin: 5px 10px;
+    }
+"""
+
+_MAIN_WINDOW_QSS = (_SIDEBAR_QSS + _EXPLORER_QSS + _TABS_QSS + _TERMINAL_QSS +
+                    _STATUSBAR_QSS + _MENU_QSS)
+
+# ===== Главное меню =====
+# (заголовок меню, пункты); пункт - (текст, горячая клавиша, имя слота[, отмечен]) или None - разделитель
+_MENU_SPEC = (
+    ("&File", (
+        ("&New File", "Ctrl+N", "new_file"),
+        ("&Open File...", "Ctrl+O", "open_file"),
+        ("Open &Folder...", "Ctrl+Shift+O", "open_folder"),
+        None,
+        ("&Save", "Ctrl+S", "save_current"),
+        ("Save &As...", "Ctrl+Shift+S", "save_as"),
+        ("Save A&ll", "Ctrl+Alt+S", "save_all"),
+        None,
+        ("&Close File", "Ctrl+W", "close_current"),
+        ("Close &All", "Ctrl+Shift+W", "close_all"),
+        None,
+        ("E&xit", "Ctrl+Q", "close"),
+    )),
+    ("&Edit", (
+        ("&Undo", "Ctrl+Z", "undo_current"),
+        ("&Redo", "Ctrl+Shift+Z", "redo_current"),
+        None,
+        ("Cu&t", "Ctrl+X", "cut_current"),
+        ("&Copy", "Ctrl+C", "copy_current"),
+        ("&Paste", "Ctrl+V", "paste_current"),
+        None,
+        ("&Find...", "Ctrl+F", "find_in_file"),
+        ("&Replace...", "Ctrl+H", "replace_in_file"),
+    )),
+    ("&View", (
+        ("&Explorer", None, "toggle_explorer", True),
+        ("🐙 &Git", None, "toggle_git", False),
+        ("E&xtensions", None, "toggle_extensions", False),
+        ("&Terminal", None, "toggle_terminal", True),
+        None,
+        ("&Full Screen", "F11", "toggle_fullscreen"),
+    )),
+    ("&Run", (
+        ("&Run File", "F5", "run_code"),
+        ("&Debug File", "F6", "debug_code"),
+    )),
+    ("🐙 &Git", (
+        ("🚀 &Init Repository", "Ctrl+Shift+G", "init_git_repo"),
+        None,
+        ("📊 &Status", "Ctrl+Shift+S", "show_git_status"),
+        ("📦 &Stage File", "Ctrl+Alt+S", "stage_git_file"),
+        ("📦 Stage &All", None, "stage_all_git"),
+        None,
+        ("💾 &Commit", "Ctrl+Shift+C", "commit_git"),
+        None,
+        ("⬇️ &Pull", "Ctrl+Shift+P", "pull_git"),
+        ("⬆️ Pu&sh", "Ctrl+Shift+U", "push_git"),
+        None,
+        ("🌿 &Create Branch...", None, "create_git_branch"),
+        ("🔄 Checkout &Branch...", None, "checkout_git_branch"),
+        None,
+        ("📜 Show &Log", None, "show_git_log"),
+    )),
+    ("E&xtensions", (
+        ("&Install Extension...", None, "install_extension"),
+        ("&Manage Extensions", None, "show_extensions"),
+        None,
+        ("&Reload All Extensions", None, "reload_extensions"),
+    )),
+    ("&Help", (
+        ("&Documentation", None, "show_docs"),
+        ("🔍 Проверить обновления", None, "check_updates"),
+        ("&About", None, "show_about"),
+    )),
+)
+
+# Горячие клавиши без пункта меню: (сочетание, имя слота). Сочетания пунктов меню
+# (Ctrl+S, Ctrl+F, Ctrl+Z, F5, ...) здесь не повторяются - второй QShortcut с тем же
+# сочетанием в окне делает его неоднозначным, и Qt не вызывает ни один
+_SHORTCUT_SPEC = (
+    # Навигация по вкладкам
+    ("Ctrl+Tab", "next_tab"),
+    ("Ctrl+Shift+Tab", "previous_tab"),
+    # Терминал
+    ("Ctrl+`", "toggle_terminal"),
+    # Поиск
+    ("Ctrl+Shift+F", "find_in_files"),
+)
+
+# Пункты меню Git: выключаются, если Git не найден
+_GIT_MENU_SLOTS = tuple(entry[2] for entry in dict(_MENU_SPEC)["🐙 &Git"] if entry is not None)
+
+# Разобранные сочетания клавиш: каждая строка парсится в QKeySequence один раз
+_KEY_SEQUENCES: Dict[str, QKeySequence] = {}
+
+def _key_sequence(text: str) -> QKeySequence:
+    """QKeySequence по строке из общего кэша"""
+    seq = _KEY_SEQUENCES.get(text)
+    if seq is None:
+        seq = _KEY_SEQUENCES[text] = QKeySequence(text)
+    return seq
+
+# ===== Главный редактор =====
+class LudvigEditor(QMainWindow):
+    # Строка лога из фонового потока (git команды в пуле) - доставляется в GUI поток
+    _log_from_thread = pyqtSignal(str, str)
+    
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle(f"{APP_NAME} v{APP_VERSION}")
+        self.resize(1400, 900)
+        
+        # Всё, что создаётся позже, объявляем сразу: проверки - `is not None`, а не hasattr
+        self.terminal: Optional[QPlainTextEdit] = None
+        self.explorer: Optional[QTreeView] = None
+        self.ext_manager: Optional[ExtensionManager] = None
+        self.api: Optional[EditorAPI] = None
+        self.update_manager: Optional[UpdateManager] = None
+        
+        # Сначала создаем GitManager но не логируем
+        self.git_manager = GitManager(self)
+        
+        # Пока не создаем ext_manager здесь!
+        # self.ext_manager = ExtensionManager(self)  # ← КОММЕНТИРУЕМ ЭТО
         
-        # Устанавливаем URL
-        if not check_internet():
-            EDITOR_URL = QUrl.fromLocalFile(LOCAL_EDITOR_PATH)
+        # А ЭТУ СТРОЧКУ ТОЖЕ КОММЕНТИРУЕМ
+        # self.api = EditorAPI(self)
+        
+        # Список вкладок
+        self.tabs_data = []  # [{path, view, language, content}, ...]
+        self._path_to_tab: Dict[str, dict] = {}  # _tab_key(путь) -> данные открытой вкладки
+        
+        # Панели расширений и Git создаются при первом открытии (_ensure_*_widget)
+        self.ext_widget: Optional[ExtensionsWidget] = None
+        self.git_widget: Optional[GitWidget] = None
+        
+        # Один Monaco на все вкладки: вкладки - пустые заглушки, view переносится в активную
+        self.web_view = None
+        self._active_tab = None
+        self._editor_loaded = False
+        self._code_stream = None  # Идущая по частям передача кода в редактор
+        self._next_model_id = 1  # Ключ модели Monaco для следующей открытой вкладки
+        # Закрытие окна: сначала забираем код активной вкладки, потом выходим
+        self._close_pending = False
+        self._close_ready = False
+        self._script_process: Optional[QProcess] = None  # Запущенный из редактора скрипт
+        
+        # Кэш current_path, сбрасывается через _invalidate_current_path
+        self._current_path_cache: Optional[str] = None
+        self._current_path_stale = True
+        
+        # Действия главного меню по имени слота; меню строится один раз
+        self._actions: Dict[str, QAction] = {}
+        self._shortcuts: List[QShortcut] = []  # Горячие клавиши из _SHORTCUT_SPEC
+        self._log_from_thread.connect(self.log)
+        # Найден ли Git - обновляется сигналами git_ready / git_not_installed
+        self._git_ready = True
+        
+        # Несколько git команд подряд (stage + commit + push) - одно обновление Git панели
+        self._git_refresh_timer = QTimer(self)
+        self._git_refresh_timer.setSingleShot(True)
+        self._git_refresh_timer.setInterval(75)
+        self._git_refresh_timer.timeout.connect(self._do_git_refresh)
+        
+        # Окна коммита и новой ветки создаются при первом показе и переиспользуются
+        self._commit_dialog: Optional[GitCommitDialog] = None
+        self._branch_dialog: Optional[GitBranchDialog] = None
+        self._properties_cancel: Optional[threading.Event] = None  # Отмена текущего обхода "Свойств"
+        
+        # Настройка UI (ЭТО СОЗДАЕТ TERMINAL!)
+        self.setup_ui()
+        self.setup_shortcuts()
+        
+        # ТЕПЕРЬ создаем менеджеры
+        self.ext_manager = ExtensionManager(self)  # ← ПЕРЕНЕСЛИ СЮДА!
+        self.api = EditorAPI(self)  # ← И ЭТО ТОЖЕ!
+
+        # Менеджер обновлений
+        self.update_manager = UpdateManager(self)
+
+        # Настраиваем автоматическую проверку
+        self.update_manager.setup_auto_check()
+        
+        # ТЕПЕРЬ настраиваем сигналы (ext_manager уже создан!)
+        self.setup_signals()
+        
+        # Загружаем настройки
+        self.restore_settings()
+        
+        # Загружаем локальный редактор если нужно
+        self.setup_editor_url()
+        
+        # Расширения сканируем в фоне, окно показывается сразу
+        self.ext_manager.start_async_scan()
+        
+        # Chromium и Monaco грузим заранее, пока пользователь смотрит на welcome screen
+        if EDITOR_WARMUP_DELAY is not None:
+            QTimer.singleShot(EDITOR_WARMUP_DELAY, self._warm_up_editor)
+    
+    def setup_editor_url(self):
+        """Настраиваем URL редактора"""
+        # Пока идёт проверка, используем выбор прошлого запуска (по умолчанию - онлайн)
+        self._apply_editor_url(SETTINGS.value("net/online", True, type=bool))
+        
+        # Свежий результат прошлого запуска - сеть не проверяем
+        checked_at = SETTINGS.value("net/checked_at", 0, type=float)
+        if time.time() - checked_at >= EDITOR_PROBE_TTL:
+            check_internet_async(self._on_editor_url_checked)
+    
+    def _on_editor_url_checked(self, online: bool):
+        """Переключаемся на локальный редактор, если интернета нет"""
+        SETTINGS.setValue("net/online", online)
+        SETTINGS.setValue("net/checked_at", time.time())
+        
+        # Страница уже загружена со старого адреса - перезагружаем её
+        if self._apply_editor_url(online) and self.web_view is not None:
+            self._reload_editor_page()
+    
+    def _apply_editor_url(self, online: bool) -> bool:
+        """Выбираем EDITOR_URL; возвращаем True, если адрес изменился"""
+        global EDITOR_URL
+        
+        if online:
+            url = QUrl(REMOTE_EDITOR_URL)
+        else:
+            # Создаем локальный редактор если нет интернета
+            _write_local_editor()
+            url = QUrl.fromLocalFile(LOCAL_EDITOR_PATH)
+        
+        changed = url != globals().get('EDITOR_URL')
+        EDITOR_URL = url
+        return changed
+    
+    def _reload_editor_page(self):
+        """Загружаем общий редактор по новому EDITOR_URL, сохранив код активной вкладки"""
+        def reload(code=None):
+            if data is not None:
+                self._store_tab_code(data, code)
+            self._editor_loaded = False
+            self._code_stream = None
+            self.web_view.setUrl(EDITOR_URL)
+        
+        data = self._active_tab
+        if data is None:
+            reload()
         else:
-            EDITOR_URL = QUrl("https://ludvig2457.github.io/editor.html")
+            self._request_code(data, reload)
 
     def check_updates(self):
         """Проверка обновлений"""
-        if hasattr(self, 'update_manager'):
+        if self.update_manager is not None:
             self.update_manager.check_for_updates(auto_check=False)
 
     def on_update_downloaded(self, file_path: str):
@@ -2630,6 +5394,9 @@ require(["vs/editor/editor.main"], function () {
     
     def setup_ui(self):
         """Настраиваем пользовательский интерфейс"""
+        # Стили всех панелей окна - одним листом
+        self.setStyleSheet(_MAIN_WINDOW_QSS)
+        
         # Центральный виджет
         central = QWidget()
         self.setCentralWidget(central)
@@ -2653,16 +5420,30 @@ require(["vs/editor/editor.main"], function () {
         
         # Вкладки
         self.tabs = QTabWidget()
+        self.tabs.setTabBar(EditorTabBar(self.tabs))
+        self.tabs.tabBar().tabMoved.connect(self._on_tab_moved)
         self.tabs.setTabsClosable(True)
         self.tabs.tabCloseRequested.connect(self.close_tab)
         self.tabs.setMovable(True)
         self.tabs.currentChanged.connect(self.on_tab_changed)
-        self.style_tabs()
+        self.tabs.setObjectName("editorTabs")
         
         # Терминал
-        self.terminal = QTextEdit()
+        # Лог без HTML и с ограниченной длиной: старые строки вытесняются
+        self.terminal = QPlainTextEdit()
         self.terminal.setReadOnly(True)
-        self.style_terminal()
+        self.terminal.setObjectName("terminal")
+        self.terminal.setMaximumBlockCount(5000)
+        self.terminal.setUndoRedoEnabled(False)
+        self.terminal.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        
+        # Строки копим и дописываем пачкой не чаще раза в 50 мс
+        self._terminal_queue = deque(maxlen=512)  # (текст, уровень)
+        self._terminal_formats: Dict[Optional[str], QTextCharFormat] = {}
+        self._terminal_timer = QTimer(self)
+        self._terminal_timer.setSingleShot(True)
+        self._terminal_timer.setInterval(50)
+        self._terminal_timer.timeout.connect(self._flush_terminal)
         
         # Welcome screen
         self.welcome = WelcomeScreen(
@@ -2685,9 +5466,7 @@ require(["vs/editor/editor.main"], function () {
         self.editor_area.addWidget(self.stack)
         self.main_splitter.addWidget(self.editor_area)
         
-        # Виджеты расширений и Git будут добавлены позже в __init__
-        # self.ext_widget = None
-        # self.git_widget = None
+        # Панели расширений и Git добавляются при первом открытии (_add_side_panel)
         
         # Настройка разделителей (пока только для explorer и editor)
         self.main_splitter.setSizes([200, 800])
@@ -2705,67 +5484,40 @@ require(["vs/editor/editor.main"], function () {
 
     def complete_initialization(self):
         """Завершаем инициализацию после создания UI"""
-        # Создаем виджет расширений
-        if hasattr(self, 'ext_manager') and self.ext_manager:
-            self.ext_widget = ExtensionsWidget(self.ext_manager)
-            self.ext_widget.setVisible(False)
-            self.main_splitter.addWidget(self.ext_widget)
-        
-        # Создаем Git widget
-        if hasattr(self, 'git_manager') and self.git_manager:
-            self.git_widget = GitWidget(self.git_manager, self)
-            self.git_widget.setVisible(False)
-            self.main_splitter.addWidget(self.git_widget)
-        
-        # Обновляем размеры splitter
-        if hasattr(self, 'ext_widget') and self.ext_widget and hasattr(self, 'git_widget') and self.git_widget:
-            self.main_splitter.setSizes([200, 800, 300, 300])
-            self.main_splitter.setStretchFactor(0, 0)
-            self.main_splitter.setStretchFactor(1, 1)
-            self.main_splitter.setStretchFactor(2, 0)
-            self.main_splitter.setStretchFactor(3, 0)
+        # Панели расширений и Git создаются при первом открытии (_ensure_*_widget)
 
     @property
     def current_path(self) -> Optional[str]:
         """Получаем текущий путь (папку проекта)"""
+        # Пересчитываем только после смены вкладки, её пути или корня проводника
+        if self._current_path_stale:
+            self._current_path_cache = self._resolve_current_path()
+            self._current_path_stale = False
+        return self._current_path_cache
+    
+    def _resolve_current_path(self) -> Optional[str]:
+        """Папка текущего файла, а без открытого файла - корень проводника"""
         current_file = self.get_current_file()
         if current_file:
             return os.path.dirname(current_file)
         
         # Если файл не открыт, пробуем получить из проводника
-        if hasattr(self, 'explorer') and self.explorer.model():
+        if self.explorer is not None and self.explorer.model():
             root_path = self.explorer.model().rootPath()
             if root_path and os.path.exists(root_path):
                 return root_path
         
         return None
     
+    def _invalidate_current_path(self):
+        """current_path пересчитается при следующем обращении"""
+        self._current_path_stale = True
+    
     def create_sidebar(self) -> QWidget:
         """Создаем боковую панель"""
         sidebar = QFrame()
+        sidebar.setObjectName("sidebar")
         sidebar.setFixedWidth(60)
-        sidebar.setStyleSheet("""
-            QFrame {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                    stop:0 #3f2b96, stop:1 #1a1b3a);
-                border-right: 1px solid rgba(255, 255, 255, 0.1);
-            }
-            QPushButton {
-                background: transparent;
-                border: none;
-                color: white;
-                padding: 12px;
-                font-size: 20px;
-                border-radius: 6px;
-                margin: 4px;
-            }
-            QPushButton:hover {
-                background: rgba(255, 255, 255, 0.15);
-            }
-            QPushButton:checked {
-                background: rgba(255, 255, 255, 0.25);
-            }
-        """)
         
         layout = QVBoxLayout(sidebar)
         layout.setAlignment(Qt.AlignmentFlag.AlignTop)
@@ -2813,61 +5565,55 @@ require(["vs/editor/editor.main"], function () {
         
         return sidebar
     
+    def _add_side_panel(self, widget: QWidget):
+        """Добавляем скрытую панель справа от редактора"""
+        widget.setVisible(False)
+        self.main_splitter.addWidget(widget)
+        index = self.main_splitter.indexOf(widget)
+        self.main_splitter.setStretchFactor(index, 0)
+        sizes = self.main_splitter.sizes()
+        sizes[index] = 300
+        self.main_splitter.setSizes(sizes)
+    
+    def _ensure_git_widget(self) -> GitWidget:
+        """Git панель создаём при первом обращении"""
+        if self.git_widget is None:
+            self.git_widget = GitWidget(self.git_manager, self)
+            self._add_side_panel(self.git_widget)
+        return self.git_widget
+    
+    def _ensure_ext_widget(self) -> ExtensionsWidget:
+        """Панель расширений создаём при первом обращении"""
+        if self.ext_widget is None:
+            self.ext_widget = ExtensionsWidget(self.ext_manager)
+            self._add_side_panel(self.ext_widget)
+        return self.ext_widget
+    
     def toggle_git(self):
         """Показываем/скрываем Git панель"""
-        visible = not self.git_widget.isVisible()
-        self.git_widget.setVisible(visible)
+        git_widget = self._ensure_git_widget()
+        visible = not git_widget.isVisible()
+        git_widget.setVisible(visible)
         self.btn_git.setChecked(visible)
         
         if visible and self.current_path:
-            self.git_widget.update_path(self.current_path)
+            git_widget.update_path(self.current_path)
     
     def create_explorer(self) -> QTreeView:
         """Создаем проводник файлов"""
-        model = QFileSystemModel()
-        model.setRootPath("")
-        model.setFilter(QDir.Filter.AllDirs | QDir.Filter.Files | 
-                       QDir.Filter.NoDotAndDotDot)
-        
         explorer = QTreeView()
+        explorer.setObjectName("explorer")
+        # Папки читаются только при раскрытии и уже отсортированы: папки первыми
+        model = LazyFileSystemModel(explorer)
         explorer.setModel(model)
         explorer.setHeaderHidden(True)
         explorer.setAnimated(True)
         explorer.setIndentation(15)
-        explorer.setSortingEnabled(True)
-        
-        # Настраиваем колонки
-        explorer.hideColumn(1)  # Size
-        explorer.hideColumn(2)  # Type
-        explorer.hideColumn(3)  # Date modified
-        
-        # Стили
-        explorer.setStyleSheet("""
-            QTreeView {
-                background: #16172e;
-                color: #e0e0ff;
-                border: none;
-                font-size: 13px;
-                outline: none;
-            }
-            QTreeView::item {
-                padding: 4px;
-                border-radius: 4px;
-            }
-            QTreeView::item:selected {
-                background: #5b3cc4;
-                color: white;
-            }
-            QTreeView::item:hover {
-                background: rgba(255, 255, 255, 0.1);
-            }
-            QHeaderView::section {
-                background: #1a1b3a;
-                color: #a0a0ff;
-                padding: 4px;
-                border: none;
-            }
-        """)
+        explorer.setUniformRowHeights(True)
+        
+        # Свёрнутая папка отпускает свои узлы
+        explorer.collapsed.connect(model.release)
+        
         
         # Контекстное меню
         explorer.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
@@ -2880,14 +5626,7 @@ require(["vs/editor/editor.main"], function () {
     
     def setup_status_bar(self):
         """Настраиваем статус бар"""
-        self.status_bar.setStyleSheet("""
-            QStatusBar {
-                background: rgba(26, 27, 58, 0.9);
-                color: #a0a0ff;
-                border-top: 1px solid rgba(255, 255, 255, 0.1);
-                font-size: 12px;
-            }
-        """)
+        self.status_bar.setObjectName("statusBar")
         
         # Виджеты статус бара
         self.status_label = QLabel("Ready")
@@ -2904,288 +5643,92 @@ require(["vs/editor/editor.main"], function () {
         
         self.language_label = QLabel("Plain Text")
         self.status_bar.addPermanentWidget(self.language_label)
+        
+        # Частые обновления подписей копим и применяем не чаще раза в кадр
+        self._pending_labels: Dict[str, str] = {}
+        self._status_timer = QTimer(self)
+        self._status_timer.setSingleShot(True)
+        self._status_timer.setInterval(16)
+        self._status_timer.timeout.connect(self._apply_status_labels)
+    
+    def _update_status_labels(self, **texts: str):
+        """Откладываем обновление подписей статус бара (ключи - имена QLabel)"""
+        self._pending_labels.update(texts)
+        self._status_timer.start()
+    
+    def _apply_status_labels(self):
+        """Применяем последние значения подписей"""
+        # Скрытый статус бар не перерисовываем - значения дождутся следующего обновления
+        if self.status_bar.isHidden():
+            return
+        pending, self._pending_labels = self._pending_labels, {}
+        for name, text in pending.items():
+            label = getattr(self, name)
+            if label.text() != text:
+                label.setText(text)
     
     def setup_menu(self):
-        """Настраиваем главное меню"""
+        """Настраиваем главное меню по таблице _MENU_SPEC (один раз за жизнь окна)"""
+        if self._actions:
+            return
         menubar = self.menuBar()
-        menubar.setStyleSheet("""
-            QMenuBar {
-                background: rgba(40, 41, 82, 0.9);
-                color: white;
-                border-bottom: 1px solid rgba(255, 255, 255, 0.1);
-            }
-            QMenuBar::item {
-                padding: 5px 10px;
-                background: transparent;
-            }
-            QMenuBar::item:selected {
-                background: rgba(255, 255, 255, 0.15);
-                border-radius: 4px;
-            }
-            QMenu {
-                background: rgba(40, 41, 82, 0.95);
-                color: white;
-                border: 1px solid rgba(255, 255, 255, 0.2);
-                border-radius: 6px;
-                padding: 5px;
-            }
-            QMenu::item {
-                padding: 5px 20px 5px 20px;
-            }
-            QMenu::item:selected {
-                background: rgba(91, 60, 196, 0.7);
-                border-radius: 4px;
-            }
-            QMenu::separator {
-                height: 1px;
-                background: rgba(255, 255, 255, 0.1);
-                margin: 5px 10px;
-            }
-        """)
-        
-        # Меню File
-        file_menu = menubar.addMenu("&File")
-        
-        new_file = QAction("&New File", self)
-        new_file.setShortcut(QKeySequence("Ctrl+N"))
-        new_file.triggered.connect(self.new_file)
-        file_menu.addAction(new_file)
-        
-        open_file = QAction("&Open File...", self)
-        open_file.setShortcut(QKeySequence("Ctrl+O"))
-        open_file.triggered.connect(self.open_file)
-        file_menu.addAction(open_file)
-        
-        open_folder = QAction("Open &Folder...", self)
-        open_folder.setShortcut(QKeySequence("Ctrl+Shift+O"))
-        open_folder.triggered.connect(self.open_folder)
-        file_menu.addAction(open_folder)
-        
-        file_menu.addSeparator()
-        
-        save = QAction("&Save", self)
-        save.setShortcut(QKeySequence("Ctrl+S"))
-        save.triggered.connect(self.save_current)
-        file_menu.addAction(save)
-        
-        save_as = QAction("Save &As...", self)
-        save_as.setShortcut(QKeySequence("Ctrl+Shift+S"))
-        save_as.triggered.connect(self.save_as)
-        file_menu.addAction(save_as)
-        
-        save_all = QAction("Save A&ll", self)
-        save_all.setShortcut(QKeySequence("Ctrl+Alt+S"))
-        save_all.triggered.connect(self.save_all)
-        file_menu.addAction(save_all)
-        
-        file_menu.addSeparator()
-        
-        close_file = QAction("&Close File", self)
-        close_file.setShortcut(QKeySequence("Ctrl+W"))
-        close_file.triggered.connect(self.close_current)
-        file_menu.addAction(close_file)
-        
-        close_all = QAction("Close &All", self)
-        close_all.setShortcut(QKeySequence("Ctrl+Shift+W"))
-        close_all.triggered.connect(self.close_all)
-        file_menu.addAction(close_all)
-        
-        file_menu.addSeparator()
-        
-        exit_action = QAction("E&xit", self)
-        exit_action.setShortcut(QKeySequence("Ctrl+Q"))
-        exit_action.triggered.connect(self.close)
-        file_menu.addAction(exit_action)
-        
-        # Меню Edit
-        edit_menu = menubar.addMenu("&Edit")
-        
-        undo = QAction("&Undo", self)
-        undo.setShortcut(QKeySequence("Ctrl+Z"))
-        undo.triggered.connect(self.undo_current)
-        edit_menu.addAction(undo)
-        
-        redo = QAction("&Redo", self)
-        redo.setShortcut(QKeySequence("Ctrl+Shift+Z"))
-        redo.triggered.connect(self.redo_current)
-        edit_menu.addAction(redo)
-        
-        edit_menu.addSeparator()
-        
-        cut = QAction("Cu&t", self)
-        cut.setShortcut(QKeySequence("Ctrl+X"))
-        cut.triggered.connect(self.cut_current)
-        edit_menu.addAction(cut)
-        
-        copy = QAction("&Copy", self)
-        copy.setShortcut(QKeySequence("Ctrl+C"))
-        copy.triggered.connect(self.copy_current)
-        edit_menu.addAction(copy)
-        
-        paste = QAction("&Paste", self)
-        paste.setShortcut(QKeySequence("Ctrl+V"))
-        paste.triggered.connect(self.paste_current)
-        edit_menu.addAction(paste)
-        
-        edit_menu.addSeparator()
-        
-        find = QAction("&Find...", self)
-        find.setShortcut(QKeySequence("Ctrl+F"))
-        find.triggered.connect(self.find_in_file)
-        edit_menu.addAction(find)
-        
-        replace = QAction("&Replace...", self)
-        replace.setShortcut(QKeySequence("Ctrl+H"))
-        replace.triggered.connect(self.replace_in_file)
-        edit_menu.addAction(replace)
-        
-        # Меню View
-        view_menu = menubar.addMenu("&View")
-        
-        toggle_explorer = QAction("&Explorer", self)
-        toggle_explorer.setCheckable(True)
-        toggle_explorer.setChecked(True)
-        toggle_explorer.triggered.connect(self.toggle_explorer)
-        view_menu.addAction(toggle_explorer)
-        
-        toggle_git = QAction("🐙 &Git", self)
-        toggle_git.setCheckable(True)
-        toggle_git.triggered.connect(self.toggle_git)
-        view_menu.addAction(toggle_git)
-        
-        toggle_extensions = QAction("E&xtensions", self)
-        toggle_extensions.setCheckable(True)
-        toggle_extensions.triggered.connect(self.toggle_extensions)
-        view_menu.addAction(toggle_extensions)
-        
-        toggle_terminal = QAction("&Terminal", self)
-        toggle_terminal.setCheckable(True)
-        toggle_terminal.setChecked(True)
-        toggle_terminal.triggered.connect(self.toggle_terminal)
-        view_menu.addAction(toggle_terminal)
-        
-        view_menu.addSeparator()
-        
-        fullscreen = QAction("&Full Screen", self)
-        fullscreen.setShortcut(QKeySequence("F11"))
-        fullscreen.triggered.connect(self.toggle_fullscreen)
-        view_menu.addAction(fullscreen)
-        
-        # Меню Run
-        run_menu = menubar.addMenu("&Run")
+        menubar.setObjectName("menuBar")
         
-        run_file = QAction("&Run File", self)
-        run_file.setShortcut(QKeySequence("F5"))
-        run_file.triggered.connect(self.run_code)
-        run_menu.addAction(run_file)
-        
-        debug_file = QAction("&Debug File", self)
-        debug_file.setShortcut(QKeySequence("F6"))
-        debug_file.triggered.connect(self.debug_code)
-        run_menu.addAction(debug_file)
-        
-        # Меню Git
-        git_menu = menubar.addMenu("🐙 &Git")
-        
-        init_git = QAction("🚀 &Init Repository", self)
-        init_git.setShortcut(QKeySequence("Ctrl+Shift+G"))
-        init_git.triggered.connect(self.init_git_repo)
-        git_menu.addAction(init_git)
-        
-        git_menu.addSeparator()
-        
-        git_status = QAction("📊 &Status", self)
-        git_status.setShortcut(QKeySequence("Ctrl+Shift+S"))
-        git_status.triggered.connect(self.show_git_status)
-        git_menu.addAction(git_status)
-        
-        stage_current = QAction("📦 &Stage File", self)
-        stage_current.setShortcut(QKeySequence("Ctrl+Alt+S"))
-        stage_current.triggered.connect(self.stage_git_file)
-        git_menu.addAction(stage_current)
-        
-        stage_all = QAction("📦 Stage &All", self)
-        stage_all.triggered.connect(self.stage_all_git)
-        git_menu.addAction(stage_all)
-        
-        git_menu.addSeparator()
-        
-        git_commit = QAction("💾 &Commit", self)
-        git_commit.setShortcut(QKeySequence("Ctrl+Shift+C"))
-        git_commit.triggered.connect(self.commit_git)
-        git_menu.addAction(git_commit)
-        
-        git_menu.addSeparator()
-        
-        git_pull = QAction("⬇️ &Pull", self)
-        git_pull.setShortcut(QKeySequence("Ctrl+Shift+P"))
-        git_pull.triggered.connect(self.pull_git)
-        git_menu.addAction(git_pull)
-        
-        git_push = QAction("⬆️ Pu&sh", self)
-        git_push.setShortcut(QKeySequence("Ctrl+Shift+U"))
-        git_push.triggered.connect(self.push_git)
-        git_menu.addAction(git_push)
-        
-        git_menu.addSeparator()
-        
-        create_branch = QAction("🌿 &Create Branch...", self)
-        create_branch.triggered.connect(self.create_git_branch)
-        git_menu.addAction(create_branch)
-        
-        checkout_branch = QAction("🔄 Checkout &Branch...", self)
-        checkout_branch.triggered.connect(self.checkout_git_branch)
-        git_menu.addAction(checkout_branch)
-        
-        git_menu.addSeparator()
-        
-        show_git_log = QAction("📜 Show &Log", self)
-        show_git_log.triggered.connect(self.show_git_log)
-        git_menu.addAction(show_git_log)
-        
-        # Меню Extensions
-        extensions_menu = menubar.addMenu("E&xtensions")
-        
-        install_ext = QAction("&Install Extension...", self)
-        install_ext.triggered.connect(self.install_extension)
-        extensions_menu.addAction(install_ext)
-        
-        manage_ext = QAction("&Manage Extensions", self)
-        manage_ext.triggered.connect(self.show_extensions)
-        extensions_menu.addAction(manage_ext)
-        
-        extensions_menu.addSeparator()
-        
-        reload_ext = QAction("&Reload All Extensions", self)
-        reload_ext.triggered.connect(self.reload_extensions)
-        extensions_menu.addAction(reload_ext)
-        
-        # Меню Help
-        help_menu = menubar.addMenu("&Help")
-        
-        docs = QAction("&Documentation", self)
-        docs.triggered.connect(self.show_docs)
-        help_menu.addAction(docs)
-
-        check_updates = QAction("🔍 Проверить обновления", self)
-        check_updates.triggered.connect(self.check_updates)
-        help_menu.addAction(check_updates)
-        
-        about = QAction("&About", self)
-        about.triggered.connect(self.show_about)
-        help_menu.addAction(about)
+        for title, entries in _MENU_SPEC:
+            menu = menubar.addMenu(title)
+            for entry in entries:
+                if entry is None:
+                    menu.addSeparator()
+                    continue
+                text, shortcut, slot = entry[:3]
+                action = QAction(text, self)
+                if shortcut:
+                    action.setShortcut(_key_sequence(shortcut))
+                if len(entry) > 3:
+                    action.setCheckable(True)
+                    action.setChecked(entry[3])
+                action.triggered.connect(getattr(self, slot))
+                menu.addAction(action)
+                self._actions[slot] = action
 
-    def init_git_repo(self):
-        """Инициализируем Git репозиторий"""
-        if not hasattr(self, 'git_manager') or not self.git_manager.git_installed:
+    def _require_git(self, show_panel: bool = False) -> bool:
+        """Git найден; иначе сообщаем об этом (show_panel - сразу открыть Git панель для установки)"""
+        if self.git_manager.git_installed:
+            return True
+        if show_panel:
             QMessageBox.information(self, "Git не установлен", 
                                 "Для использования Git требуется установить Git.\n\n"
                                 "Откройте Git панель (кнопка 🐙 в боковой панели) для установки.\n"
                                 "Или используйте меню 🐙 → Git → 'Установить Git'")
             # Показываем Git панель для установки
-            if hasattr(self, 'git_widget'):
-                self.git_widget.setVisible(True)
-                self.btn_git.setChecked(True)
+            self._ensure_git_widget().setVisible(True)
+            self.btn_git.setChecked(True)
+        else:
+            QMessageBox.information(self, "Git не установлен", 
+                                "Для использования Git требуется установить Git.\n\n"
+                                "Откройте Git панель (кнопка 🐙) для установки.")
+        return False
+    
+    def _schedule_git_refresh(self):
+        """Обновить Git панель после паузы; повторный вызов откладывает обновление"""
+        self._git_refresh_timer.start()
+    
+    def _do_git_refresh(self):
+        """Обновляем Git панель, если она открыта"""
+        if self.git_widget is not None and self.git_widget.isVisible():
+            self.git_widget.refresh_git_info()
+    
+    def _set_git_actions_enabled(self, enabled: bool):
+        """Пункты меню Git доступны только при найденном Git (панель 🐙 остаётся - в ней установка)"""
+        self._git_ready = enabled
+        for slot in _GIT_MENU_SLOTS:
+            action = self._actions.get(slot)
+            if action is not None:
+                action.setEnabled(enabled)
+
+    def init_git_repo(self):
+        """Инициализируем Git репозиторий"""
+        if not self._require_git(show_panel=True):
             return
         
         if not self.current_path:
@@ -3203,20 +5746,11 @@ require(["vs/editor/editor.main"], function () {
             success = self.git_manager.init_repo(self.current_path)
             if success:
                 self.log("✅ Git репозиторий создан", "success")
-                if hasattr(self, 'git_widget') and self.git_widget.isVisible():
-                    self.git_widget.refresh_git_info()
+                self._schedule_git_refresh()
 
     def show_git_status(self):
         """Показываем статус Git"""
-        if not hasattr(self, 'git_manager') or not self.git_manager.git_installed:
-            QMessageBox.information(self, "Git не установлен", 
-                                "Для использования Git требуется установить Git.\n\n"
-                                "Откройте Git панель (кнопка 🐙 в боковой панели) для установки.\n"
-                                "Или используйте меню 🐙 → Git → 'Установить Git'")
-            # Показываем Git панель для установки
-            if hasattr(self, 'git_widget'):
-                self.git_widget.setVisible(True)
-                self.btn_git.setChecked(True)
+        if not self._require_git(show_panel=True):
             return
         
         if not self.current_path:
@@ -3224,7 +5758,7 @@ require(["vs/editor/editor.main"], function () {
             return
         
         # Автоматически показываем Git панель
-        if hasattr(self, 'git_widget') and not self.git_widget.isVisible():
+        if self.git_widget is None or not self.git_widget.isVisible():
             self.toggle_git()
         
         status = self.git_manager.get_status(self.current_path)
@@ -3311,12 +5845,32 @@ require(["vs/editor/editor.main"], function () {
         
         dialog.exec()
 
+    def _run_git_task(self, action: str, fn: Callable, *args, on_done: Callable):
+        """Git команда в пуле потоков: пункт меню выключен, пока она выполняется"""
+        menu_action = self._actions.get(action)
+        if menu_action is not None:
+            menu_action.setEnabled(False)
+        self._update_status_labels(status_label="⏳ Git...")
+        
+        def finish():
+            # Git могли потерять, пока команда выполнялась
+            if menu_action is not None:
+                menu_action.setEnabled(self._git_ready)
+            self._update_status_labels(status_label="Ready")
+        
+        def done(result):
+            finish()
+            on_done(result)
+        
+        def failed(error):
+            finish()
+            self.log(f"❌ Git ошибка: {error}", "error")
+        
+        run_in_background(fn, *args, on_done=done, on_error=failed)
+
     def stage_git_file(self):
         """Добавляем текущий файл в stage"""
-        if not hasattr(self, 'git_manager') or not self.git_manager.git_installed:
-            QMessageBox.information(self, "Git не установлен", 
-                                "Для использования Git требуется установить Git.\n\n"
-                                "Откройте Git панель (кнопка 🐙) для установки.")
+        if not self._require_git():
             return
         
         if not self.current_path:
@@ -3328,43 +5882,50 @@ require(["vs/editor/editor.main"], function () {
             QMessageBox.warning(self, "Ошибка", "Сначала откройте файл!")
             return
         
-        success = self.git_manager.stage_file(self.current_path, current_file)
+        self._run_git_task('stage_git_file', self.git_manager.stage_file, self.current_path, current_file,
+                           on_done=lambda success: self._on_file_staged(current_file, success))
+    
+    def _on_file_staged(self, file_path: str, success: bool):
+        """Файл добавлен в stage (GUI поток)"""
         if success:
-            self.log(f"📦 Файл добавлен в stage: {os.path.basename(current_file)}", "info")
+            self.log(f"📦 Файл добавлен в stage: {os.path.basename(file_path)}", "info")
             # Обновляем Git виджет если открыт
-            if hasattr(self, 'git_widget') and self.git_widget.isVisible():
-                self.git_widget.refresh_git_info()
+            self._schedule_git_refresh()
         else:
             self.log(f"❌ Не удалось добавить файл в stage", "error")
 
     def stage_all_git(self):
         """Добавляем все файлы в stage"""
-        if not hasattr(self, 'git_manager') or not self.git_manager.git_installed:
-            QMessageBox.information(self, "Git не установлен", 
-                                "Для использования Git требуется установить Git.\n\n"
-                                "Откройте Git панель (кнопка 🐙) для установки.")
+        self._stage_all_git()
+    
+    def _stage_all_git(self, on_staged: Optional[Callable] = None, status: Optional[dict] = None):
+        """Добавляем все файлы в stage; on_staged вызывается после успешного git add
+        
+        status - уже прочитанный вызывающим статус, чтобы не запускать git status ещё раз.
+        """
+        if not self._require_git():
             return
         
         if not self.current_path:
             QMessageBox.warning(self, "Ошибка", "Сначала откройте папку!")
             return
         
-        status = self.git_manager.get_status(self.current_path)
+        if status is None:
+            status = self.git_manager.get_status(self.current_path)
         if not status.get('is_git'):
             QMessageBox.warning(self, "Ошибка", "Не Git репозиторий!")
             return
         
-        changed_files = status.get('changed_files', [])
-        untracked_files = status.get('untracked_files', [])
+        staged, unstaged, untracked_files = GitManager.split_status(status)
         
-        if not changed_files and not untracked_files:
+        if not (staged or unstaged or untracked_files):
             QMessageBox.information(self, "Stage All", "Нет файлов для добавления в stage")
             return
         
         reply = QMessageBox.question(
             self, "Stage All Files",
             f"Добавить в stage:\n"
-            f"• {len([f for f in changed_files if not f['staged']])} неиндексированных изменений\n"
+            f"• {len(unstaged)} неиндексированных изменений\n"
             f"• {len(untracked_files)} новых файлов\n\n"
             f"Продолжить?",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
@@ -3373,30 +5934,26 @@ require(["vs/editor/editor.main"], function () {
         if reply != QMessageBox.StandardButton.Yes:
             return
         
-        # Добавляем неиндексированные изменения
-        staged_count = 0
-        for file in changed_files:
-            if not file['staged']:
-                if self.git_manager.stage_file(self.current_path, file['path']):
-                    staged_count += 1
-        
-        # Добавляем новые файлы
-        for file in untracked_files:
-            if self.git_manager.stage_file(self.current_path, file):
-                staged_count += 1
-        
-        self.log(f"📦 Добавлено в stage: {staged_count} файлов", "info")
+        # Неиндексированные изменения и новые файлы - одним git add
+        paths = [file['path'] for file in unstaged]
+        paths.extend(untracked_files)
+        self._run_git_task('stage_all_git', self.git_manager.stage_files, self.current_path, paths,
+                           on_done=lambda success: self._on_all_staged(len(paths), success, on_staged))
+    
+    def _on_all_staged(self, count: int, success: bool, on_staged: Optional[Callable]):
+        """Все изменения добавлены в stage (GUI поток)"""
+        if success:
+            self.log(f"📦 Добавлено в stage: {count} файлов", "info")
         
         # Обновляем Git виджет если открыт
-        if hasattr(self, 'git_widget') and self.git_widget.isVisible():
-            self.git_widget.refresh_git_info()
+        self._schedule_git_refresh()
+        
+        if success and on_staged is not None:
+            on_staged()
 
     def commit_git(self):
         """Создаём Git коммит"""
-        if not hasattr(self, 'git_manager') or not self.git_manager.git_installed:
-            QMessageBox.information(self, "Git не установлен", 
-                                "Для использования Git требуется установить Git.\n\n"
-                                "Откройте Git панель (кнопка 🐙) для установки.")
+        if not self._require_git():
             return
         
         if not self.current_path:
@@ -3409,10 +5966,10 @@ require(["vs/editor/editor.main"], function () {
             QMessageBox.warning(self, "Ошибка", "Не Git репозиторий!")
             return
         
-        has_staged = any(file['staged'] for file in status.get('changed_files', []))
+        staged = GitManager.split_status(status)[0]
         has_changes = status.get('has_changes', False)
         
-        if not has_staged and has_changes:
+        if not staged and has_changes:
             reply = QMessageBox.question(
                 self, "Нет staged файлов",
                 "Нет файлов в stage. Хотите сначала добавить все изменения в stage?",
@@ -3421,99 +5978,53 @@ require(["vs/editor/editor.main"], function () {
             )
             
             if reply == QMessageBox.StandardButton.Yes:
-                self.stage_all_git()
-                # Перепроверяем статус
-                status = self.git_manager.get_status(self.current_path)
-                has_staged = any(file['staged'] for file in status.get('changed_files', []))
-                if not has_staged:
-                    QMessageBox.warning(self, "Ошибка", "Всё ещё нет файлов в stage!")
-                    return
+                # Диалог коммита откроется, когда git add закончит работу
+                self._stage_all_git(on_staged=self._commit_after_staging, status=status)
+                return
             elif reply == QMessageBox.StandardButton.Cancel:
                 return
         
-        # Запрашиваем сообщение коммита
-        dialog = QDialog(self)
-        dialog.setWindowTitle("Git Commit")
-        dialog.setMinimumSize(400, 300)
-        
-        layout = QVBoxLayout(dialog)
-        
-        # Поле для сообщения
-        message_label = QLabel("Сообщение коммита:")
-        layout.addWidget(message_label)
-        
-        message_edit = QTextEdit()
-        message_edit.setPlaceholderText("Введите сообщение коммита...")
-        message_edit.setMinimumHeight(100)
-        
-        # Предзаполняем стандартные сообщения
-        default_messages = [
-            "Update",
-            "Fix bug",
-            "Add feature",
-            "Refactor code",
-            "Initial commit"
-        ]
-        
-        # Показываем staged файлы
-        if has_staged:
-            files_label = QLabel("Файлы в stage:")
-            layout.addWidget(files_label)
-            
-            files_text = QTextEdit()
-            files_text.setReadOnly(True)
-            files_text.setMaximumHeight(80)
-            
-            staged_files = [f"• {file['path']} ({file['change_type']})" 
-                        for file in status.get('changed_files', []) 
-                        if file['staged']]
-            
-            files_text.setText("\n".join(staged_files[:10]))  # Показываем первые 10
-            if len(staged_files) > 10:
-                files_text.append(f"\n... и ещё {len(staged_files) - 10} файлов")
-            
-            layout.addWidget(files_text)
-        
-        layout.addWidget(message_edit)
-        
-        # Кнопки
-        button_box = QDialogButtonBox()
-        
-        # Кнопки с быстрыми сообщениями
-        for msg in default_messages:
-            btn = QPushButton(msg)
-            btn.clicked.connect(lambda checked, m=msg: message_edit.setText(m))
-            layout.addWidget(btn)
-        
-        commit_btn = button_box.addButton("💾 Commit", QDialogButtonBox.ButtonRole.AcceptRole)
-        cancel_btn = button_box.addButton("Cancel", QDialogButtonBox.ButtonRole.RejectRole)
-        
-        button_box.accepted.connect(dialog.accept)
-        button_box.rejected.connect(dialog.reject)
-        
-        layout.addWidget(button_box)
+        self._show_commit_dialog(staged)
+    
+    def _commit_after_staging(self):
+        """Продолжаем коммит после stage всех изменений"""
+        if not self.current_path:
+            return
+        # Перепроверяем статус
+        staged = GitManager.split_status(self.git_manager.get_status(self.current_path))[0]
+        if not staged:
+            QMessageBox.warning(self, "Ошибка", "Всё ещё нет файлов в stage!")
+            return
+        self._show_commit_dialog(staged)
+    
+    def _show_commit_dialog(self, staged: List[dict]):
+        """Запрашиваем сообщение и создаём коммит в фоне (staged - файлы в stage)"""
+        if self._commit_dialog is None:
+            self._commit_dialog = GitCommitDialog(self)
+        dialog = self._commit_dialog
+        dialog.prepare(staged)
         
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            message = message_edit.toPlainText().strip()
+            message = dialog.message()
             if not message:
                 QMessageBox.warning(self, "Ошибка", "Сообщение коммита не может быть пустым!")
                 return
             
-            success = self.git_manager.commit(self.current_path, message)
-            if success:
-                self.log(f"💾 Коммит создан: {message}", "success")
-                # Обновляем Git виджет если открыт
-                if hasattr(self, 'git_widget') and self.git_widget.isVisible():
-                    self.git_widget.refresh_git_info()
-            else:
-                QMessageBox.warning(self, "Ошибка", "Не удалось создать коммит!")
+            self._run_git_task('commit_git', self.git_manager.commit, self.current_path, message,
+                               on_done=lambda success: self._on_commit_done(message, success))
+    
+    def _on_commit_done(self, message: str, success: bool):
+        """Коммит завершён (GUI поток)"""
+        if success:
+            self.log(f"💾 Коммит создан: {message}", "success")
+            # Обновляем Git виджет если открыт
+            self._schedule_git_refresh()
+        else:
+            QMessageBox.warning(self, "Ошибка", "Не удалось создать коммит!")
 
     def pull_git(self):
         """Pull из Git"""
-        if not hasattr(self, 'git_manager') or not self.git_manager.git_installed:
-            QMessageBox.information(self, "Git не установлен", 
-                                "Для использования Git требуется установить Git.\n\n"
-                                "Откройте Git панель (кнопка 🐙) для установки.")
+        if not self._require_git():
             return
         
         if not self.current_path:
@@ -3532,17 +6043,20 @@ require(["vs/editor/editor.main"], function () {
         # Сохраняем все файлы перед pull
         self.save_all()
         
-        result = self.git_manager.pull(self.current_path)
+        self._run_git_task('pull_git', self.git_manager.pull, self.current_path,
+                           on_done=self._on_pull_done)
+    
+    def _on_pull_done(self, result: dict):
+        """Pull завершён (GUI поток)"""
         if result['success']:
             self.log("⬇️ Pull выполнен успешно", "info")
             
-            # Показываем результат
+            # Вывод git - в терминал, без модального окна
             if result.get('stdout'):
-                QMessageBox.information(self, "Pull Result", result['stdout'])
+                self._write_terminal(result['stdout'])
             
             # Обновляем Git виджет если открыт
-            if hasattr(self, 'git_widget') and self.git_widget.isVisible():
-                self.git_widget.refresh_git_info()
+            self._schedule_git_refresh()
         else:
             error_msg = result.get('error', 'Неизвестная ошибка')
             self.log(f"❌ Pull ошибка: {error_msg}", "error")
@@ -3550,19 +6064,15 @@ require(["vs/editor/editor.main"], function () {
 
     def push_git(self):
         """Push в Git"""
-        if not hasattr(self, 'git_manager') or not self.git_manager.git_installed:
-            QMessageBox.information(self, "Git не установлен", 
-                                "Для использования Git требуется установить Git.\n\n"
-                                "Откройте Git панель (кнопка 🐙) для установки.")
+        if not self._require_git():
             return
         
         if not self.current_path:
             QMessageBox.warning(self, "Ошибка", "Сначала откройте папку!")
             return
         
-        # Проверяем есть ли что пушить
-        status = self.git_manager.get_status(self.current_path)
-        if not status.get('is_git'):
+        # Для push достаточно знать, что это репозиторий: git status не нужен
+        if not self.git_manager.get_repo_root(self.current_path):
             QMessageBox.warning(self, "Ошибка", "Не Git репозиторий!")
             return
         
@@ -3575,112 +6085,86 @@ require(["vs/editor/editor.main"], function () {
         if reply != QMessageBox.StandardButton.Yes:
             return
         
-        result = self.git_manager.push(self.current_path)
+        self._run_git_task('push_git', self.git_manager.push, self.current_path,
+                           on_done=self._on_push_done)
+    
+    def _on_push_done(self, result: dict):
+        """Push завершён (GUI поток)"""
         if result['success']:
             self.log("⬆️ Push выполнен успешно", "info")
             
-            # Показываем результат
+            # Вывод git - в терминал, без модального окна
             if result.get('stdout'):
-                QMessageBox.information(self, "Push Result", result['stdout'])
+                self._write_terminal(result['stdout'])
             
             # Обновляем Git виджет если открыт
-            if hasattr(self, 'git_widget') and self.git_widget.isVisible():
-                self.git_widget.refresh_git_info()
+            self._schedule_git_refresh()
         else:
             error_msg = result.get('error', 'Неизвестная ошибка')
             self.log(f"❌ Push ошибка: {error_msg}", "error")
             
             # Показываем подробную ошибку
             error_text = f"Ошибка при выполнении push:\n\n{error_msg}"
-            if result.get('stderr'):
+            if result.get('stderr') and result['stderr'] != error_msg:
                 error_text += f"\n\nДетали:\n{result['stderr']}"
             
             QMessageBox.critical(self, "Push Error", error_text)
 
     def create_git_branch(self):
         """Создаём новую ветку"""
-        if not hasattr(self, 'git_manager') or not self.git_manager.git_installed:
-            QMessageBox.information(self, "Git не установлен", 
-                                "Для использования Git требуется установить Git.\n\n"
-                                "Откройте Git панель (кнопка 🐙) для установки.")
+        if not self._require_git():
             return
         
         if not self.current_path:
             QMessageBox.warning(self, "Ошибка", "Сначала откройте папку!")
             return
         
-        # Получаем текущую ветку
-        status = self.git_manager.get_status(self.current_path)
-        if not status.get('is_git'):
-            QMessageBox.warning(self, "Ошибка", "Не Git репозиторий!")
-            return
-        
-        current_branch = status.get('branch', 'unknown')
-        
-        dialog = QDialog(self)
-        dialog.setWindowTitle("Create Git Branch")
-        dialog.setMinimumSize(400, 200)
-        
-        layout = QVBoxLayout(dialog)
-        
-        layout.addWidget(QLabel(f"Текущая ветка: {current_branch}"))
-        layout.addWidget(QLabel("Имя новой ветки:"))
-        
-        branch_edit = QLineEdit()
-        branch_edit.setPlaceholderText("feature/new-feature")
-        layout.addWidget(branch_edit)
-        
-        # Подсказки для имён веток
-        tips_label = QLabel("Подсказки:\n"
-                        "• feature/имя-фичи\n"
-                        "• bugfix/описание-бага\n"
-                        "• hotfix/срочное-исправление\n"
-                        "• release/версия")
-        tips_label.setStyleSheet("color: #888; font-size: 11px;")
-        layout.addWidget(tips_label)
-        
-        button_box = QDialogButtonBox()
-        create_btn = button_box.addButton("🌿 Create Branch", QDialogButtonBox.ButtonRole.AcceptRole)
-        cancel_btn = button_box.addButton("Cancel", QDialogButtonBox.ButtonRole.RejectRole)
+        # Получаем текущую ветку
+        status = self.git_manager.get_status(self.current_path)
+        if not status.get('is_git'):
+            QMessageBox.warning(self, "Ошибка", "Не Git репозиторий!")
+            return
         
-        button_box.accepted.connect(dialog.accept)
-        button_box.rejected.connect(dialog.reject)
+        current_branch = status.get('branch', 'unknown')
         
-        layout.addWidget(button_box)
+        if self._branch_dialog is None:
+            self._branch_dialog = GitBranchDialog(self)
+        dialog = self._branch_dialog
+        dialog.prepare(current_branch)
         
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            branch_name = branch_edit.text().strip()
+            branch_name = dialog.branch_name()
             if not branch_name:
                 QMessageBox.warning(self, "Ошибка", "Имя ветки не может быть пустым!")
                 return
             
-            success = self.git_manager.create_branch(self.current_path, branch_name)
-            if success:
-                self.log(f"🌿 Ветка создана: {branch_name}", "info")
-                
-                # Предлагаем переключиться на новую ветку
-                reply = QMessageBox.question(
-                    self, "Switch to New Branch",
-                    f"Ветка '{branch_name}' создана.\n\n"
-                    f"Хотите переключиться на неё?",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-                )
-                
-                if reply == QMessageBox.StandardButton.Yes:
-                    self.checkout_git_branch()
-                
-                # Обновляем Git виджет если открыт
-                if hasattr(self, 'git_widget') and self.git_widget.isVisible():
-                    self.git_widget.refresh_git_info()
-            else:
-                QMessageBox.warning(self, "Ошибка", "Не удалось создать ветку!")
+            self._run_git_task('create_git_branch', self.git_manager.create_branch, self.current_path, branch_name,
+                               on_done=lambda success: self._on_branch_created(branch_name, success))
+    
+    def _on_branch_created(self, branch_name: str, success: bool):
+        """Ветка создана (GUI поток)"""
+        if success:
+            self.log(f"🌿 Ветка создана: {branch_name}", "info")
+            
+            # Предлагаем переключиться на новую ветку
+            reply = QMessageBox.question(
+                self, "Switch to New Branch",
+                f"Ветка '{branch_name}' создана.\n\n"
+                f"Хотите переключиться на неё?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            
+            if reply == QMessageBox.StandardButton.Yes:
+                self.checkout_git_branch()
+            
+            # Обновляем Git виджет если открыт
+            self._schedule_git_refresh()
+        else:
+            QMessageBox.warning(self, "Ошибка", "Не удалось создать ветку!")
 
     def checkout_git_branch(self):
         """Переключаемся на ветку"""
-        if not hasattr(self, 'git_manager') or not self.git_manager.git_installed:
-            QMessageBox.information(self, "Git не установлен", 
-                                "Для использования Git требуется установить Git.\n\n"
-                                "Откройте Git панель (кнопка 🐙) для установки.")
+        if not self._require_git():
             return
         
         if not self.current_path:
@@ -3705,13 +6189,14 @@ require(["vs/editor/editor.main"], function () {
         layout.addWidget(QLabel(f"Текущая ветка: {current_branch}"))
         layout.addWidget(QLabel("Выберите ветку:"))
         
+        # Строки добавляем одним addItems, затем выделяем текущую ветку
         branch_list = QListWidget()
-        for branch in branches:
-            item = QListWidgetItem(branch)
-            if branch == current_branch:
-                item.setText(f"✅ {branch} (current)")
-                item.setForeground(QColor(0, 200, 0))
-            branch_list.addItem(item)
+        branch_list.addItems([
+            f"✅ {branch} (current)" if branch == current_branch else branch
+            for branch in branches
+        ])
+        if current_branch in branches:
+            branch_list.item(branches.index(current_branch)).setForeground(QColor(0, 200, 0))
         
         layout.addWidget(branch_list)
         
@@ -3737,37 +6222,38 @@ require(["vs/editor/editor.main"], function () {
             # Сохраняем все файлы перед переключением
             self.save_all()
             
-            success = self.git_manager.checkout_branch(self.current_path, branch)
-            if success:
-                self.log(f"🔄 Переключился на ветку: {branch}", "info")
-                
-                # Обновляем Git виджет если открыт
-                if hasattr(self, 'git_widget') and self.git_widget.isVisible():
-                    self.git_widget.refresh_git_info()
-                
-                # Показываем уведомление
-                QMessageBox.information(self, "Branch Switched", 
-                                    f"Успешно переключились на ветку: {branch}")
-            else:
-                QMessageBox.warning(self, "Ошибка", "Не удалось переключиться на ветку!")
+            self._run_git_task('checkout_git_branch', self.git_manager.checkout_branch, self.current_path, branch,
+                               on_done=lambda success: self._on_branch_checked_out(branch, success))
+    
+    def _on_branch_checked_out(self, branch: str, success: bool):
+        """Переключение ветки завершено (GUI поток)"""
+        if success:
+            self.log(f"🔄 Переключился на ветку: {branch}", "info")
+            
+            # Обновляем Git виджет если открыт
+            self._schedule_git_refresh()
+            
+            # Показываем уведомление
+            QMessageBox.information(self, "Branch Switched", 
+                                f"Успешно переключились на ветку: {branch}")
+        else:
+            QMessageBox.warning(self, "Ошибка", "Не удалось переключиться на ветку!")
 
     def show_git_log(self):
         """Показываем историю коммитов"""
-        if not hasattr(self, 'git_manager') or not self.git_manager.git_installed:
-            QMessageBox.information(self, "Git не установлен", 
-                                "Для использования Git требуется установить Git.\n\n"
-                                "Откройте Git панель (кнопка 🐙) для установки.")
+        if not self._require_git():
             return
         
         if not self.current_path:
             QMessageBox.warning(self, "Ошибка", "Сначала откройте папку!")
             return
         
-        history = self.git_manager.get_history(self.current_path, 50)
-        if not history:
-            QMessageBox.information(self, "Git Log", "Нет истории коммитов")
+        repo_root = self.git_manager.get_repo_root(self.current_path)
+        if not repo_root:
+            QMessageBox.warning(self, "Ошибка", "Не Git репозиторий!")
             return
         
+        # Окно открывается сразу, строки добавляются по мере вывода git log
         dialog = QDialog(self)
         dialog.setWindowTitle("Git Log")
         dialog.setMinimumSize(700, 500)
@@ -3789,32 +6275,6 @@ require(["vs/editor/editor.main"], function () {
         table.setHorizontalHeaderLabels(["Хэш", "Сообщение", "Автор", "Дата", "Файлы"])
         table.horizontalHeader().setStretchLastSection(True)
         
-        for i, commit in enumerate(history):
-            table.insertRow(i)
-            
-            # Хэш
-            hash_item = QTableWidgetItem(commit['hash'])
-            hash_item.setFont(QFont("Consolas", 10))
-            table.setItem(i, 0, hash_item)
-            
-            # Сообщение
-            message_item = QTableWidgetItem(commit['message'])
-            table.setItem(i, 1, message_item)
-            
-            # Автор
-            author_item = QTableWidgetItem(commit['author'])
-            table.setItem(i, 2, author_item)
-            
-            # Дата
-            date_item = QTableWidgetItem(commit['date'])
-            table.setItem(i, 3, date_item)
-            
-            # Файлы
-            files_text = ", ".join(commit['files']) if commit['files'] else "—"
-            files_item = QTableWidgetItem(files_text)
-            table.setItem(i, 4, files_item)
-        
-        table.resizeColumnsToContents()
         layout.addWidget(table)
         
         # Информация о выбранном коммите
@@ -3832,24 +6292,80 @@ require(["vs/editor/editor.main"], function () {
         
         layout.addWidget(button_box)
         
-        # Фильтрация поиска
-        def filter_history():
+        # Коммиты в порядке строк таблицы (строка = индекс, сортировки нет) и их текст
+        # для поиска: все колонки, кроме файлов, в нижнем регистре; "\n" между колонками -
+        # совпадение не перескакивает через границу
+        history: List[dict] = []
+        search_index: List[str] = []
+        hash_font = QFont("Consolas", 10)
+        parser = _GitLogParser()
+        
+        def add_commits(commits: List[dict]):
+            """Дописываем пачку коммитов: без пересчёта раскладки и сигналов на каждую ячейку"""
+            if not commits:
+                return
             search_text = search_edit.text().lower()
-            for i in range(table.rowCount()):
-                show = False
-                if search_text:
-                    # Проверяем все колонки кроме файлов
-                    for col in range(4):
-                        item = table.item(i, col)
-                        if item and search_text in item.text().lower():
-                            show = True
-                            break
-                else:
-                    show = True
+            start = len(history)
+            table.setUpdatesEnabled(False)
+            table.blockSignals(True)
+            table.setRowCount(start + len(commits))
+            for i, commit in enumerate(commits, start):
+                # Хэш
+                hash_item = QTableWidgetItem(commit['hash'])
+                hash_item.setFont(hash_font)
+                table.setItem(i, 0, hash_item)
+                
+                # Сообщение, автор, дата
+                table.setItem(i, 1, QTableWidgetItem(commit['message']))
+                table.setItem(i, 2, QTableWidgetItem(commit['author']))
+                table.setItem(i, 3, QTableWidgetItem(commit['date']))
                 
-                table.setRowHidden(i, not show)
+                # Файлы
+                files_text = ", ".join(commit['files']) if commit['files'] else "—"
+                table.setItem(i, 4, QTableWidgetItem(files_text))
+                
+                haystack = "\n".join((commit['hash'], commit['message'],
+                                      commit['author'], commit['date'])).lower()
+                search_index.append(haystack)
+                # Новые строки сразу подчиняются уже введённому фильтру
+                if search_text and search_text not in haystack:
+                    table.setRowHidden(i, True)
+            history.extend(commits)
+            table.blockSignals(False)
+            table.setUpdatesEnabled(True)
+            if start == 0:
+                table.resizeColumnsToContents()
+        
+        def on_log_finished():
+            add_commits(parser.close())
+            table.resizeColumnsToContents()
+            if not history:
+                info_label.setText("Нет истории коммитов")
+        
+        def on_log_error(error):
+            if error == QProcess.ProcessError.FailedToStart:
+                info_label.setText("❌ Не удалось запустить git log")
+        
+        process = QProcess(dialog)
+        process.readyReadStandardOutput.connect(
+            lambda: add_commits(parser.feed(bytes(process.readAllStandardOutput()))))
+        process.finished.connect(lambda exit_code, exit_status: on_log_finished())
+        process.errorOccurred.connect(on_log_error)
+        self.git_manager.start_history_process(process, repo_root, GIT_LOG_LIMIT)
         
-        search_edit.textChanged.connect(filter_history)
+        def filter_history():
+            search_text = search_edit.text().lower()
+            table.setUpdatesEnabled(False)
+            for i, haystack in enumerate(search_index):
+                table.setRowHidden(i, bool(search_text) and search_text not in haystack)
+            table.setUpdatesEnabled(True)
+        
+        # Быстрый набор - один проход фильтра после паузы
+        filter_timer = QTimer(dialog)
+        filter_timer.setSingleShot(True)
+        filter_timer.setInterval(80)
+        filter_timer.timeout.connect(filter_history)
+        search_edit.textChanged.connect(lambda _text: filter_timer.start())
         
         # Обработка выбора коммита
         def on_item_selected():
@@ -3868,16 +6384,23 @@ require(["vs/editor/editor.main"], function () {
         table.itemSelectionChanged.connect(on_item_selected)
         
         dialog.exec()
+        
+        # Окно закрыли до конца вывода - git log больше не нужен
+        if process.state() != QProcess.ProcessState.NotRunning:
+            process.blockSignals(True)
+            process.kill()
+            process.waitForFinished(1000)
 
     def install_git_tool(self):
         """Установка Git инструмента"""
-        if hasattr(self, 'git_widget'):
+        if self.git_manager is not None:
             # Показываем Git панель
-            self.git_widget.setVisible(True)
+            git_widget = self._ensure_git_widget()
+            git_widget.setVisible(True)
             self.btn_git.setChecked(True)
             
             # Вызываем метод установки Git
-            self.git_widget.install_git()
+            git_widget.install_git()
         else:
             # Если виджет ещё не создан, предлагаем скачать Git
             reply = QMessageBox.question(
@@ -3888,6 +6411,7 @@ require(["vs/editor/editor.main"], function () {
             )
             
             if reply == QMessageBox.StandardButton.Yes:
+                import webbrowser
                 webbrowser.open("https://git-scm.com/download/win")
                 
                 QMessageBox.information(
@@ -3918,34 +6442,32 @@ require(["vs/editor/editor.main"], function () {
         
     def on_git_not_installed(self):
         """Обработка отсутствия Git"""
+        self._set_git_actions_enabled(False)
         self.log("⚠️ Git не установлен. Откройте Git панель для установки.", "warning")
     
+    def on_git_ready(self, installed: bool):
+        """Фоновый поиск Git завершён"""
+        self._set_git_actions_enabled(installed)
+        if installed:
+            self.log("✅ Git обнаружен и готов к работе", "success")
+        else:
+            self.log("⚠️ Git не установлен. Функции Git будут доступны после установки.", "warning")
+    
     def setup_shortcuts(self):
-        """Настраиваем горячие клавиши"""
-        # Основные
-        QShortcut(QKeySequence("Ctrl+S"), self, activated=self.save_current)
-        QShortcut(QKeySequence("Ctrl+F"), self, activated=self.find_in_file)
-        QShortcut(QKeySequence("Ctrl+Z"), self, activated=self.undo_current)
-        QShortcut(QKeySequence("Ctrl+Shift+Z"), self, activated=self.redo_current)
-        QShortcut(QKeySequence("Ctrl+N"), self, activated=self.new_file)
-        QShortcut(QKeySequence("Ctrl+O"), self, activated=self.open_file)
-        QShortcut(QKeySequence("F5"), self, activated=self.run_code)
-        
-        # Навигация по вкладкам
-        QShortcut(QKeySequence("Ctrl+Tab"), self, activated=self.next_tab)
-        QShortcut(QKeySequence("Ctrl+Shift+Tab"), self, activated=self.previous_tab)
-        QShortcut(QKeySequence("Ctrl+W"), self, activated=self.close_current)
-        
-        # Терминал
-        QShortcut(QKeySequence("Ctrl+`"), self, activated=self.toggle_terminal)
+        """Настраиваем горячие клавиши (повторный вызов заменяет прежние)"""
+        for shortcut in self._shortcuts:
+            shortcut.setParent(None)
+        self._shortcuts.clear()
         
-        # Поиск
-        QShortcut(QKeySequence("Ctrl+Shift+F"), self, activated=self.find_in_files)
+        for key, slot in _SHORTCUT_SPEC:
+            shortcut = QShortcut(_key_sequence(key), self)
+            shortcut.activated.connect(getattr(self, slot))
+            self._shortcuts.append(shortcut)
     
     def setup_signals(self):
         """Настраиваем сигналы"""
         # Сигналы от менеджера расширений (если он создан)
-        if hasattr(self, 'ext_manager') and self.ext_manager:
+        if self.ext_manager is not None:
             self.ext_manager.extension_loaded.connect(self.on_extension_loaded)
             self.ext_manager.extension_unloaded.connect(self.on_extension_unloaded)
             self.ext_manager.extension_installed.connect(self.on_extension_installed)
@@ -3953,87 +6475,25 @@ require(["vs/editor/editor.main"], function () {
             self.ext_manager.extension_error.connect(self.on_extension_error)
         
         # Сигналы от API (если он создан)
-        if hasattr(self, 'api') and self.api:
+        if self.api is not None:
             self.api.editor_ready.connect(self.on_editor_ready)
             self.api.file_opened.connect(self.on_file_opened)
             self.api.file_saved.connect(self.on_file_saved)
             self.api.file_closed.connect(self.on_file_closed)
         
         # Сигналы от Git менеджера (если он создан)
-        if hasattr(self, 'git_manager') and self.git_manager:
+        if self.git_manager is not None:
             self.git_manager.git_status_changed.connect(self.on_git_status_changed)
             self.git_manager.git_branch_changed.connect(self.on_git_branch_changed)
             self.git_manager.git_commit_made.connect(self.on_git_commit_made)
             self.git_manager.git_error.connect(self.on_git_error)
             self.git_manager.git_not_installed.connect(self.on_git_not_installed)
+            self.git_manager.git_ready.connect(self.on_git_ready)
 
         # Сигналы от менеджера обновлений
-        if hasattr(self, 'update_manager') and self.update_manager:
+        if self.update_manager is not None:
             self.update_manager.update_downloaded.connect(self.on_update_downloaded)
     
-    def style_tabs(self):
-        """Стилизуем вкладки"""
-        self.tabs.setStyleSheet("""
-            QTabWidget::pane {
-                border: none;
-                background: #1a1b3a;
-            }
-            QTabBar::tab {
-                background: rgba(255, 255, 255, 0.1);
-                color: rgba(255, 255, 255, 0.7);
-                padding: 8px 16px;
-                border-top-left-radius: 6px;
-                border-top-right-radius: 6px;
-                margin-right: 2px;
-                min-width: 100px;
-                font-size: 12px;
-            }
-            QTabBar::tab:selected {
-                background: rgba(91, 60, 196, 0.8);
-                color: white;
-                font-weight: bold;
-            }
-            QTabBar::tab:hover {
-                background: rgba(91, 60, 196, 0.5);
-            }
-            QTabBar::close-button {
-                image: url(none);
-                subcontrol-position: right;
-                padding: 2px;
-            }
-            QTabBar::close-button:hover {
-                background: rgba(255, 255, 255, 0.2);
-                border-radius: 4px;
-            }
-        """)
-    
-    def style_terminal(self):
-        """Стилизуем терминал"""
-        self.terminal.setStyleSheet("""
-            QTextEdit {
-                background: #0f1224;
-                color: #dcd7ff;
-                border: none;
-                border-top: 1px solid rgba(255, 255, 255, 0.1);
-                font-family: 'Consolas', 'Monaco', monospace;
-                font-size: 12px;
-                padding: 10px;
-            }
-            QScrollBar:vertical {
-                background: rgba(255, 255, 255, 0.05);
-                width: 12px;
-                border-radius: 6px;
-            }
-            QScrollBar::handle:vertical {
-                background: rgba(130, 130, 220, 0.4);
-                border-radius: 6px;
-                min-height: 20px;
-            }
-            QScrollBar::handle:vertical:hover {
-                background: rgba(130, 130, 220, 0.6);
-            }
-        """)
-    
     # ===== Методы для работы с файлами =====
     def new_file(self):
         """Создаем новый файл"""
@@ -4046,6 +6506,7 @@ require(["vs/editor/editor.main"], function () {
             filename = dialog.textValue()
             if filename:
                 # Создаем временный файл
+                import tempfile
                 temp_dir = tempfile.gettempdir()
                 filepath = os.path.join(temp_dir, filename)
                 
@@ -4072,102 +6533,208 @@ require(["vs/editor/editor.main"], function () {
             # Устанавливаем корневую папку в проводнике
             model = self.explorer.model()
             if model:
-                self.explorer.setRootIndex(model.index(path))
+                self.explorer.setRootIndex(model.setRootPath(path))
+                self._invalidate_current_path()
                 self.status_label.setText(f"Project: {path}")
     
+    @staticmethod
+    def _tab_key(path: str) -> str:
+        """Один и тот же файл под разными путями даёт один ключ"""
+        return os.path.normcase(os.path.realpath(path))
+    
+    def _set_tab_path(self, data: dict, path: str):
+        """Меняем путь вкладки вместе с индексом путей"""
+        self._path_to_tab.pop(self._tab_key(data['path']), None)
+        data['path'] = path
+        self._path_to_tab[self._tab_key(path)] = data
+        self._invalidate_current_path()
+    
+    def _on_tab_moved(self, from_index: int, to_index: int):
+        """Вкладку перетащили - двигаем и её данные, индексы должны совпадать"""
+        self.tabs_data.insert(to_index, self.tabs_data.pop(from_index))
+    
     def open_tab(self, path: str):
         """Открываем файл в новой вкладке"""
+        # Файл уже открыт - просто переключаемся, без чтения с диска
+        data = self._path_to_tab.get(self._tab_key(path))
+        if data is not None:
+            self.tabs.setCurrentIndex(self.tabs.indexOf(data['view']))
+            return
+        
         try:
             # Читаем файл
             with open(path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
             # Определяем язык по расширению
-            _, ext = os.path.splitext(path)
-            ext = ext.lower()
-            
-            lang_map = {
-                '.py': 'python',
-                '.js': 'javascript',
-                '.html': 'html',
-                '.htm': 'html',
-                '.css': 'css',
-                '.json': 'json',
-                '.xml': 'xml',
-                '.md': 'markdown',
-                '.txt': 'plaintext',
-                '.c': 'c',
-                '.cpp': 'cpp',
-                '.h': 'c',
-                '.hpp': 'cpp',
-                '.java': 'java',
-                '.php': 'php',
-                '.rb': 'ruby',
-                '.go': 'go',
-                '.rs': 'rust',
-                '.swift': 'swift',
-                '.kt': 'kotlin',
-                '.ts': 'typescript',
-                '.sql': 'sql',
-                '.sh': 'shell',
-                '.bat': 'bat',
-                '.ps1': 'powershell',
-                '.yml': 'yaml',
-                '.yaml': 'yaml',
-                '.toml': 'toml',
-                '.ini': 'ini',
-                '.cfg': 'ini'
-            }
+            language = _language_for_path(path)
             
-            language = lang_map.get(ext, 'plaintext')
+            # Вкладка - лёгкая заглушка, сам редактор общий
+            # (раскладку получает только при первом показе)
+            placeholder = QWidget()
             
-            # Создаем WebView
-            view = QWebEngineView()
-            view.setUrl(EDITOR_URL)
+            # Данные сохраняем до addTab: currentChanged придёт уже с ними
+            data = {
+                'path': path,
+                'view': placeholder,
+                'language': language,
+                'content': content,
+                # Хэш кода на диске: совпал - сохранять нечего
+                'saved_hash': hash(content),
+                # Своя модель в общем Monaco (_TAB_MODELS_JS)
+                'model_id': self._next_model_id
+            }
+            self._next_model_id += 1
+            self.tabs_data.append(data)
+            self._path_to_tab[self._tab_key(path)] = data
             
             # Добавляем вкладку
-            tab_index = self.tabs.addTab(view, os.path.basename(path))
+            tab_index = self.tabs.addTab(placeholder, os.path.basename(path))
             self.tabs.setCurrentIndex(tab_index)
-            
-            # Сохраняем данные
-            self.tabs_data.append({
-                'path': path,
-                'view': view,
-                'language': language,
-                'content': content
-            })
+            self._activate_tab(data)
             
             # Переключаемся на редактор
             self.stack.setCurrentIndex(1)
             
-            # Загружаем код в редактор (с задержкой для загрузки WebView)
-            QTimer.singleShot(500, lambda: self._load_code_to_view(view, content, language))
-            
             # Обновляем статус
-            self.status_label.setText(f"Opened: {path}")
-            self.language_label.setText(language)
+            self._update_status_labels(status_label=f"Opened: {path}", language_label=language)
             
             # Сигнал для расширений
             self.api.file_opened.emit(path)
             
-            # Загружаем расширения в эту вкладку
-            self._load_extensions_to_view(view)
+            # JS расширения внедряются скриптами профиля при загрузке страницы
             
         except Exception as e:
             self.log(f"❌ Error opening file {path}: {e}", "error")
             QMessageBox.critical(self, "Error", f"Cannot open file:\n{path}\n\n{str(e)}")
     
-    def _load_code_to_view(self, view, content: str, language: str):
-        """Загружаем код в WebView"""
-        escaped_content = json.dumps(content)
-        js_code = f"window.setCode({escaped_content}, '{language}')"
-        view.page().runJavaScript(js_code)
+    def _editor_view(self):
+        """Общий WebView редактора - создаём и загружаем один раз"""
+        if self.web_view is None:
+            self.web_view = _webengine('QWebEngineView')()
+            # Пока страница грузится (в т.ч. перезагрузка) код берём из кэша вкладок
+            self.web_view.loadStarted.connect(self._on_editor_load_started)
+            self.web_view.loadFinished.connect(self._on_editor_loaded)
+            self.web_view.setUrl(EDITOR_URL)
+        return self.web_view
+    
+    def _warm_up_editor(self):
+        """Создаём общий редактор до первого открытия файла"""
+        if self.web_view is None:
+            view = self._editor_view()
+            # Скрытым держим в окне - вкладка заберёт его в _activate_tab
+            view.setParent(self)
+            view.hide()
+    
+    def _on_editor_load_started(self):
+        """Страница редактора начала (пере)загружаться - getCode пока недоступен"""
+        self._editor_loaded = False
+        self._code_stream = None
+    
+    def _on_editor_loaded(self, ok: bool):
+        """Страница редактора загрузилась - отдаём ей код активной вкладки"""
+        if not ok:
+            # Онлайн редактор не загрузился (сеть пропала после проверки) - берём локальный
+            if self._apply_editor_url(False):
+                self.log("⚠️ Editor page failed to load, switching to offline editor", "warning")
+                SETTINGS.setValue("net/online", False)
+                SETTINGS.setValue("net/checked_at", time.time())
+                self.web_view.setUrl(EDITOR_URL)
+            else:
+                self.log("❌ Editor page failed to load", "error")
+            return
+        self._editor_loaded = True
+        # Онлайн-страница ничего не знает о моделях вкладок - добавляем (локальная уже умеет)
+        self.web_view.page().runJavaScript(_TAB_MODELS_JS)
+        data = self._active_tab
+        if data is not None:
+            self._load_code_to_view(self.web_view, data)
+    
+    def _request_code(self, data: dict, callback: Callable):
+        """Код вкладки: из редактора, если он целиком там, иначе из кэша вкладки"""
+        if data is self._active_tab and self._editor_loaded and self._code_stream is None:
+            self.web_view.page().runJavaScript("window.getCode && window.getCode()", callback)
+        else:
+            callback(data['content'])
+    
+    def _activate_tab(self, data: dict):
+        """Переносим общий редактор во вкладку и подменяем в нём код"""
+        if self._active_tab is data:
+            return
+        view = self._editor_view()
+        
+        # Код уходящей вкладки забираем до setCode: runJavaScript выполняется по порядку
+        previous = self._active_tab
+        # Проверка по индексу путей: `in tabs_data` сравнивал бы словари вместе с кодом
+        if previous is not None and self._path_to_tab.get(self._tab_key(previous['path'])) is previous:
+            self._request_code(previous, lambda code, data=previous: self._store_tab_code(data, code))
+        
+        placeholder = data['view']
+        layout = placeholder.layout()
+        if layout is None:
+            layout = QVBoxLayout(placeholder)
+            layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(view)
+        view.show()
+        self._active_tab = data
+        self._load_code_to_view(view, data)
+    
+    @staticmethod
+    def _store_tab_code(data: dict, code):
+        """Запоминаем код неактивной вкладки"""
+        if isinstance(code, str):
+            data['content'] = code
+    
+    # Крупные файлы передаём в страницу частями: без одного огромного IPC сообщения
+    _CODE_CHUNK = 64 * 1024
+    
+    def _load_code_to_view(self, view, data: dict):
+        """Показываем в WebView модель вкладки с её кодом"""
+        # Новый код отменяет недоотправленный прежний
+        self._code_stream = None
+        if not self._editor_loaded:
+            return  # Код активной вкладки отдаст _on_editor_loaded
+        
+        content, language, key = data['content'], data['language'], data['model_id']
+        if len(content) <= self._CODE_CHUNK:
+            view.page().runJavaScript(self._set_code_js(_json_dumps(content), key, language))
+            return
+        
+        stream = {'view': view, 'content': content, 'language': language, 'key': key, 'pos': 0}
+        self._code_stream = stream
+        view.page().runJavaScript("window.__ludvigChunks = [];")
+        QTimer.singleShot(0, lambda: self._pump_code(stream))
     
-    def _load_extensions_to_view(self, view):
-        """Загружаем расширения в WebView"""
-        # Загружаем JS расширения
-        for name, js_code in self.ext_manager.js_extensions.items():
-            self.ext_manager._inject_js_to_view(view, name, js_code)
+    def _pump_code(self, stream: dict):
+        """Отправляем очередную часть кода; между частями GUI успевает обработать события"""
+        if self._code_stream is not stream:
+            return
+        
+        view, content, pos = stream['view'], stream['content'], stream['pos']
+        chunk = content[pos:pos + self._CODE_CHUNK]
+        view.page().runJavaScript(f"window.__ludvigChunks.push({_json_dumps(chunk)});")
+        stream['pos'] = pos + len(chunk)
+        
+        if stream['pos'] < len(content):
+            QTimer.singleShot(0, lambda: self._pump_code(stream))
+            return
+        
+        self._code_stream = None
+        view.page().runJavaScript(self._set_code_js(
+            "window.__ludvigChunks.splice(0).join('')", stream['key'], stream['language']))
+    
+    @staticmethod
+    def _set_code_js(code_expr: str, key: int, language: str) -> str:
+        # Готовый Monaco - сразу модель вкладки; локальная страница грузит Monaco
+        # из setCode; удалённая объявляет setCode только после загрузки - ждём его
+        return (
+            "(function (code) { (function load() {"
+            " if (window.editor && window.monaco && window.__ludvigShowModel)"
+            f" window.__ludvigShowModel({key}, code, '{language}');"
+            f" else if (window.setCode) window.setCode(code, '{language}', {key});"
+            " else setTimeout(load, 50);"
+            f" }})(); }})({code_expr})"
+        )
     
     def save_current(self):
         """Сохраняем текущий файл"""
@@ -4176,14 +6743,22 @@ require(["vs/editor/editor.main"], function () {
             return
         
         data = self.tabs_data[current_index]
-        view = data['view']
         path = data['path']
         
         # Получаем код из редактора
-        view.page().runJavaScript("window.getCode()", 
-            lambda content: self._save_file_content(path, content))
-    
-    def _save_file_content(self, path: str, content: str):
+        self._request_code(data, lambda content: self._save_tab_content(data, path, content))
+    
+    def _save_tab_content(self, data: dict, path: str, content, force: bool = False):
+        """Сохраняем код вкладки и запоминаем его для переключений"""
+        self._store_tab_code(data, content)
+        # Страница без getCode вернёт null - тогда сохраняем известный код вкладки
+        content_hash = hash(data['content'])
+        if not force and content_hash == data.get('saved_hash'):
+            return  # Не менялся с последнего чтения/записи - файл не трогаем
+        if self._save_file_content(path, data['content']):
+            data['saved_hash'] = content_hash
+    
+    def _save_file_content(self, path: str, content: str) -> bool:
         """Сохраняем содержимое в файл"""
         try:
             with open(path, 'w', encoding='utf-8') as f:
@@ -4192,12 +6767,17 @@ require(["vs/editor/editor.main"], function () {
             self.log(f"💾 Saved: {path}")
             self.status_label.setText(f"Saved: {os.path.basename(path)}")
             
+            # Индекс Git от сохранения не меняется — сбрасываем кэш статуса сами
+            self.git_manager.invalidate_status(path)
+            
             # Сигнал для расширений
             self.api.file_saved.emit(path)
+            return True
             
         except Exception as e:
             self.log(f"❌ Error saving file: {e}", "error")
             QMessageBox.critical(self, "Error", f"Cannot save file:\n{path}\n\n{str(e)}")
+            return False
     
     def save_as(self):
         """Сохраняем как..."""
@@ -4206,7 +6786,6 @@ require(["vs/editor/editor.main"], function () {
             return
         
         data = self.tabs_data[current_index]
-        view = data['view']
         old_path = data['path']
         
         # Диалог выбора файла
@@ -4217,22 +6796,47 @@ require(["vs/editor/editor.main"], function () {
         )
         
         if path:
-            # Получаем код и сохраняем
-            view.page().runJavaScript("window.getCode()", 
-                lambda content: self._save_file_content(path, content))
+            # Получаем код и сохраняем: новый файл пишем даже без изменений
+            self._request_code(data, lambda content: self._save_tab_content(data, path, content, force=True))
             
-            # Обновляем данные вкладки
-            data['path'] = path
+            # Обновляем данные вкладки (новое расширение - новый язык)
+            self._set_tab_path(data, path)
+            data['language'] = _language_for_path(path)
             self.tabs.setTabText(current_index, os.path.basename(path))
+            self._update_status_labels(language_label=data['language'])
     
     def save_all(self):
-        """Сохраняем все открытые файлы"""
-        for i, data in enumerate(self.tabs_data):
-            view = data['view']
-            path = data['path']
-            
-            view.page().runJavaScript("window.getCode()", 
-                lambda content, p=path: self._save_file_content(p, content))
+        """Сохраняем все открытые файлы (неизменённые пропускаются)"""
+        for data in self.tabs_data:
+            # Код неактивных вкладок уже лежит в кэше
+            self._request_code(data, lambda content, d=data, p=data['path']:
+                self._save_tab_content(d, p, content))
+    
+    def _save_cached_tabs(self):
+        """Синхронно пишем изменённые вкладки из кэша - без обращений к редактору"""
+        for data in self.tabs_data:
+            self._save_tab_content(data, data['path'], data['content'])
+    
+    def _collect_code_then_close(self):
+        """Один запрос getCode к активной вкладке, затем повторный close()"""
+        if self._close_pending:
+            return
+        self._close_pending = True
+        
+        def finish(code=None, data=self._active_tab):
+            if self._close_ready:
+                return
+            if data is not None:
+                self._store_tab_code(data, code)
+            self._close_ready = True
+            self.close()
+        
+        if self._active_tab is None or not self._editor_loaded or self._code_stream is not None:
+            finish()
+            return
+        self.web_view.page().runJavaScript("window.getCode && window.getCode()", finish)
+        # Зависшая страница не должна держать окно открытым
+        QTimer.singleShot(1500, lambda: finish())
     
     def close_current(self):
         """Закрываем текущую вкладку"""
@@ -4249,18 +6853,68 @@ require(["vs/editor/editor.main"], function () {
             # Сигнал для расширений
             self.api.file_closed.emit(path)
             
+            # Общий редактор уносим из закрываемой заглушки, пока она жива
+            if self._active_tab is data:
+                self.web_view.setParent(self)
+                self.web_view.hide()
+                self._active_tab = None
+                self._code_stream = None
+            
+            self._drop_models([data])
+            
             # Удаляем данные
             self.tabs_data.pop(index)
+            self._path_to_tab.pop(self._tab_key(path), None)
             self.tabs.removeTab(index)
+            data['view'].deleteLater()
+            self._invalidate_current_path()
             
             # Если вкладок не осталось, показываем welcome screen
             if self.tabs.count() == 0:
                 self.stack.setCurrentIndex(0)
     
+    def _drop_models(self, tabs: List[dict]):
+        """Освобождаем модели Monaco закрытых вкладок"""
+        if self._editor_loaded and tabs:
+            ids = ",".join(str(data['model_id']) for data in tabs)
+            self.web_view.page().runJavaScript(
+                f"window.__ludvigDropModels && window.__ludvigDropModels([{ids}])")
+    
     def close_all(self):
-        """Закрываем все вкладки"""
-        while self.tabs.count() > 0:
-            self.close_tab(0)
+        """Закрываем все вкладки разом: одна перерисовка вместо перестройки на каждую"""
+        if not self.tabs_data:
+            return
+        
+        # Сигналы для расширений
+        for data in self.tabs_data:
+            self.api.file_closed.emit(data['path'])
+        
+        # Общий редактор уносим из заглушек, пока они живы
+        if self._active_tab is not None:
+            self.web_view.setParent(self)
+            self.web_view.hide()
+            self._active_tab = None
+            self._code_stream = None
+        
+        self._drop_models(self.tabs_data)
+        
+        # Без currentChanged редактор не перезагружается кодом вкладок, которые всё равно закроются
+        self.tabs.setUpdatesEnabled(False)
+        self.tabs.blockSignals(True)
+        try:
+            self.tabs.clear()
+        finally:
+            self.tabs.blockSignals(False)
+            self.tabs.setUpdatesEnabled(True)
+        
+        for data in self.tabs_data:
+            data['view'].deleteLater()
+        self.tabs_data.clear()
+        self._path_to_tab.clear()
+        self._invalidate_current_path()
+        
+        # Вкладок не осталось - показываем welcome screen
+        self.stack.setCurrentIndex(0)
     
     def next_tab(self):
         """Переходим на следующую вкладку"""
@@ -4279,49 +6933,49 @@ require(["vs/editor/editor.main"], function () {
         """Отменяем последнее действие"""
         current_index = self.tabs.currentIndex()
         if 0 <= current_index < len(self.tabs_data):
-            view = self.tabs_data[current_index]['view']
+            view = self.web_view
             view.page().runJavaScript("window.editor.trigger('', 'undo')")
     
     def redo_current(self):
         """Повторяем отмененное действие"""
         current_index = self.tabs.currentIndex()
         if 0 <= current_index < len(self.tabs_data):
-            view = self.tabs_data[current_index]['view']
+            view = self.web_view
             view.page().runJavaScript("window.editor.trigger('', 'redo')")
     
     def cut_current(self):
         """Вырезаем выделенный текст"""
         current_index = self.tabs.currentIndex()
         if 0 <= current_index < len(self.tabs_data):
-            view = self.tabs_data[current_index]['view']
+            view = self.web_view
             view.page().runJavaScript("document.execCommand('cut')")
     
     def copy_current(self):
         """Копируем выделенный текст"""
         current_index = self.tabs.currentIndex()
         if 0 <= current_index < len(self.tabs_data):
-            view = self.tabs_data[current_index]['view']
+            view = self.web_view
             view.page().runJavaScript("document.execCommand('copy')")
     
     def paste_current(self):
         """Вставляем текст"""
         current_index = self.tabs.currentIndex()
         if 0 <= current_index < len(self.tabs_data):
-            view = self.tabs_data[current_index]['view']
+            view = self.web_view
             view.page().runJavaScript("document.execCommand('paste')")
     
     def find_in_file(self):
         """Поиск в текущем файле"""
         current_index = self.tabs.currentIndex()
         if 0 <= current_index < len(self.tabs_data):
-            view = self.tabs_data[current_index]['view']
+            view = self.web_view
             view.page().runJavaScript("window.editor.getAction('actions.find').run()")
     
     def replace_in_file(self):
         """Замена в текущем файле"""
         current_index = self.tabs.currentIndex()
         if 0 <= current_index < len(self.tabs_data):
-            view = self.tabs_data[current_index]['view']
+            view = self.web_view
             view.page().runJavaScript("window.editor.getAction('editor.action.startFindReplaceAction').run()")
     
     def find_in_files(self):
@@ -4355,87 +7009,99 @@ require(["vs/editor/editor.main"], function () {
     
     def _run_python(self, path: str):
         """Запускаем Python файл"""
-        try:
-            self.terminal.clear()
-            self.log(f"▶ Running Python: {path}", "info")
-            
-            # Запускаем в отдельном потоке
-            thread = threading.Thread(target=self._execute_python, args=(path,))
-            thread.daemon = True
-            thread.start()
-            
-        except Exception as e:
-            self.log(f"❌ Error running Python: {e}", "error")
-    
-    def _execute_python(self, path: str):
-        """Выполняем Python код"""
-        try:
-            result = subprocess.run(
-                [sys.executable, path],
-                capture_output=True,
-                text=True,
-                encoding='utf-8'
-            )
-            
-            # Выводим результат в терминал
-            output = f"""Running: {path}
-Exit code: {result.returncode}
-
-{'='*50}
-STDOUT:
-{result.stdout}
-
-{'='*50}
-STDERR:
-{result.stderr}
-{'='*50}
-"""
-            
-            # Обновляем UI из главного потока
-            QTimer.singleShot(0, lambda: self.terminal.append(output))
-            
-        except Exception as e:
-            error_msg = f"❌ Execution error: {e}"
-            QTimer.singleShot(0, lambda: self.terminal.append(error_msg))
+        self._clear_terminal()
+        self.log(f"▶ Running Python: {path}", "info")
+        
+        # -u и PYTHONIOENCODING: вывод приходит сразу по мере печати и всегда в utf-8
+        env = QProcessEnvironment.systemEnvironment()
+        env.insert("PYTHONIOENCODING", "utf-8")
+        self._start_script(sys.executable, ['-u', path], env)
+    
+    # Строка без перевода строки длиннее этого уходит в терминал как есть
+    _SCRIPT_LINE_LIMIT = 64 * 1024
+    
+    def _start_script(self, program: str, args: List[str],
+                      env: Optional[QProcessEnvironment] = None):
+        """Запускаем скрипт в QProcess: stdout/stderr идут в терминал по мере поступления"""
+        self._stop_script()
+        process = QProcess(self)
+        if env is not None:
+            process.setProcessEnvironment(env)
+        
+        # Куски вывода режем по строкам: каждая запись терминала - отдельный блок
+        streams = {
+            'stdout': [codecs.getincrementaldecoder('utf-8')('replace'), '', None],
+            'stderr': [codecs.getincrementaldecoder('utf-8')('replace'), '', 'error'],
+        }
+        
+        def forward(name: str, data: bytes, final: bool = False):
+            stream = streams[name]
+            text = stream[1] + stream[0].decode(data, final).replace('\r\n', '\n')
+            if final or len(text) > self._SCRIPT_LINE_LIMIT:
+                lines, stream[1] = text, ''
+            else:
+                cut = text.rfind('\n') + 1
+                lines, stream[1] = text[:cut], text[cut:]
+            if lines:
+                self._write_terminal(lines[:-1] if lines.endswith('\n') else lines, stream[2])
+        
+        def on_finished(exit_code, exit_status):
+            forward('stdout', b'', final=True)
+            forward('stderr', b'', final=True)
+            if exit_status == QProcess.ExitStatus.CrashExit:
+                self.log(f"❌ Process crashed: {program}", "error")
+            else:
+                self.log(f"⏹ Exit code: {exit_code}", "success" if exit_code == 0 else "error")
+            if self._script_process is process:
+                self._script_process = None
+            process.deleteLater()
+        
+        def on_error(error):
+            if error == QProcess.ProcessError.FailedToStart:
+                self.log(f"❌ Cannot start {program}: {process.errorString()}", "error")
+                if self._script_process is process:
+                    self._script_process = None
+                process.deleteLater()
+        
+        process.readyReadStandardOutput.connect(
+            lambda: forward('stdout', bytes(process.readAllStandardOutput())))
+        process.readyReadStandardError.connect(
+            lambda: forward('stderr', bytes(process.readAllStandardError())))
+        process.finished.connect(on_finished)
+        process.errorOccurred.connect(on_error)
+        self._script_process = process
+        process.start(program, args)
+    
+    def _stop_script(self):
+        """Останавливаем ранее запущенный скрипт"""
+        process = self._script_process
+        self._script_process = None
+        if process is not None and process.state() != QProcess.ProcessState.NotRunning:
+            process.blockSignals(True)
+            process.kill()
+            process.waitForFinished(1000)
+            process.deleteLater()
     
     def _run_javascript(self, path: str):
         """Запускаем JavaScript файл"""
+        import tempfile
+        
         try:
+            self._clear_terminal()
+            self.log(f"▶ Running JavaScript: {path}", "info")
+            
+            # Выполняем через node.js если установлен
+            if shutil.which('node') is not None:
+                self._start_script('node', [path])
+                return
+            
+            # Node.js не установлен, выполняем в браузере
+            self.log("⚠️ Node.js not found, opening in browser", "warning")
             with open(path, 'r', encoding='utf-8') as f:
                 js_code = f.read()
             
-            self.terminal.clear()
-            self.log(f"▶ Running JavaScript: {path}", "info")
-            
-            # Пытаемся выполнить через node.js если установлен
-            try:
-                result = subprocess.run(
-                    ['node', '-e', js_code],
-                    capture_output=True,
-                    text=True,
-                    encoding='utf-8'
-                )
-                
-                output = f"""Running JavaScript: {path}
-Exit code: {result.returncode}
-
-{'='*50}
-STDOUT:
-{result.stdout}
-
-{'='*50}
-STDERR:
-{result.stderr}
-{'='*50}
-"""
-                self.terminal.append(output)
-                
-            except FileNotFoundError:
-                # Node.js не установлен, выполняем в браузере
-                self.log("⚠️ Node.js not found, opening in browser", "warning")
-                
-                # Создаем временный HTML файл
-                temp_html = f"""
+            # Создаем временный HTML файл
+            temp_html = f"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -4453,15 +7119,15 @@ STDERR:
 </body>
 </html>
 """
-                
-                # Сохраняем и открываем
-                temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False)
-                temp_file.write(temp_html)
-                temp_file.close()
-                
-                import webbrowser
-                webbrowser.open(f'file://{temp_file.name}')
-                
+            
+            # Сохраняем и открываем
+            temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False)
+            temp_file.write(temp_html)
+            temp_file.close()
+            
+            import webbrowser
+            webbrowser.open(f'file://{temp_file.name}')
+        
         except Exception as e:
             self.log(f"❌ Error running JavaScript: {e}", "error")
     
@@ -4545,6 +7211,7 @@ STDERR:
             path = os.path.join(folder, name)
             with open(path, 'w', encoding='utf-8') as f:
                 f.write("")
+            self._refresh_explorer(folder)
             self.open_tab(path)
     
     def create_folder_in(self, folder: str):
@@ -4553,6 +7220,13 @@ STDERR:
         if ok and name:
             path = os.path.join(folder, name)
             os.makedirs(path, exist_ok=True)
+            self._refresh_explorer(folder)
+    
+    def _refresh_explorer(self, folder: str):
+        """Свои изменения показываем сразу, не дожидаясь наблюдателя за папками"""
+        model = self.explorer.model()
+        if model:
+            model.refresh(folder)
     
     def rename_file(self, path: str):
         """Переименовываем файл или папку"""
@@ -4564,16 +7238,15 @@ STDERR:
         
         if ok and new_name and new_name != os.path.basename(path):
             new_path = os.path.join(os.path.dirname(path), new_name)
+            data = self._path_to_tab.get(self._tab_key(path))
             try:
                 os.rename(path, new_path)
+                self._refresh_explorer(os.path.dirname(path))
                 
                 # Обновляем вкладку если файл открыт
-                for data in self.tabs_data:
-                    if data['path'] == path:
-                        data['path'] = new_path
-                        index = self.tabs.indexOf(data['view'])
-                        self.tabs.setTabText(index, new_name)
-                        break
+                if data is not None:
+                    self._set_tab_path(data, new_path)
+                    self.tabs.setTabText(self.tabs.indexOf(data['view']), new_name)
                         
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Cannot rename:\n{str(e)}")
@@ -4587,14 +7260,14 @@ STDERR:
         )
         
         if reply == QMessageBox.StandardButton.Yes:
+            data = self._path_to_tab.get(self._tab_key(path))
             try:
                 os.remove(path)
+                self._refresh_explorer(os.path.dirname(path))
                 
                 # Закрываем вкладку если файл открыт
-                for i, data in enumerate(self.tabs_data):
-                    if data['path'] == path:
-                        self.close_tab(i)
-                        break
+                if data is not None:
+                    self.close_tab(self.tabs.indexOf(data['view']))
                         
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Cannot delete:\n{str(e)}")
@@ -4610,57 +7283,75 @@ STDERR:
         if reply == QMessageBox.StandardButton.Yes:
             try:
                 shutil.rmtree(path)
+                self._refresh_explorer(os.path.dirname(path))
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Cannot delete folder:\n{str(e)}")
     
     def show_properties(self, path: str):
         """Показываем свойства файла/папки"""
-        try:
-            stat = os.stat(path)
-            size = stat.st_size
-            mtime = datetime.fromtimestamp(stat.st_mtime)
-            
-            if os.path.isfile(path):
-                type_str = "File"
-            else:
-                type_str = "Folder"
-                # Размер папки сложно посчитать
-                size = "N/A"
-            
-            info = f"""Path: {path}
+        # Новый запрос отменяет предыдущий обход - повторные клики не занимают пул
+        if self._properties_cancel is not None:
+            self._properties_cancel.set()
+        cancelled = self._properties_cancel = threading.Event()
+        
+        # stat и обход папки - в фоне: сетевой диск или большая папка не блокируют окно
+        run_in_background(
+            _path_properties, path, cancelled,
+            on_done=lambda props: self._on_properties_ready(path, props, cancelled),
+            on_error=lambda error: QMessageBox.critical(
+                self, "Error", f"Cannot get properties:\n{error}")
+        )
+    
+    def _on_properties_ready(self, path: str, props: Optional[dict], cancelled: threading.Event):
+        """Свойства посчитаны - показываем диалог (если запрос не отменён новым)"""
+        if props is None or cancelled.is_set():
+            return
+        if self._properties_cancel is cancelled:
+            self._properties_cancel = None
+        
+        if props['is_dir']:
+            type_str = "Folder"
+            # Обход упёрся в лимит - показываем нижнюю границу
+            at_least = "≥ " if props['truncated'] else ""
+            size = f"{at_least}{props['size']} ({at_least}{props['files']} files)"
+        else:
+            type_str = "File"
+            size = props['size']
+        
+        info = f"""Path: {path}
 Type: {type_str}
 Size: {size}
-Modified: {mtime}
+Modified: {props['mtime']}
 """
-            
-            QMessageBox.information(self, "Properties", info)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Cannot get properties:\n{str(e)}")
+        
+        QMessageBox.information(self, "Properties", info)
     
     # ===== Методы для расширений =====
     def toggle_extensions(self):
         """Показываем/скрываем менеджер расширений"""
-        visible = not self.ext_widget.isVisible()
-        self.ext_widget.setVisible(visible)
+        ext_widget = self._ensure_ext_widget()
+        visible = not ext_widget.isVisible()
+        ext_widget.setVisible(visible)
         self.btn_extensions.setChecked(visible)
     
     def show_extensions(self):
         """Показываем менеджер расширений"""
-        self.ext_widget.setVisible(True)
+        ext_widget = self._ensure_ext_widget()
+        ext_widget.setVisible(True)
         self.btn_extensions.setChecked(True)
-        self.ext_widget.refresh_list()
+        ext_widget.refresh_list()
     
     def install_extension(self):
         """Устанавливаем расширение"""
-        self.ext_widget.install_extension()
+        self._ensure_ext_widget().install_extension()
     
     def reload_extensions(self):
         """Перезагружаем все расширения"""
-        self.ext_widget.reload_all()
+        self._ensure_ext_widget().reload_all()
     
     def get_all_views(self):
         """Получаем все открытые WebView"""
-        return [data['view'] for data in self.tabs_data]
+        return [self.web_view] if self.web_view is not None else []
     
     def get_current_file(self) -> Optional[str]:
         """Получаем текущий открытый файл"""
@@ -4670,30 +7361,49 @@ Modified: {mtime}
         return None
     
     def get_current_code(self) -> str:
-        """Получаем код из текущего редактора"""
+        """Код текущей вкладки на момент последней синхронизации (смена вкладки, сохранение)"""
         current_index = self.tabs.currentIndex()
         if 0 <= current_index < len(self.tabs_data):
-            # TODO: Реализовать получение кода из WebView
+            # Правки после синхронизации есть только в Monaco - их отдаёт request_current_code
             return self.tabs_data[current_index]['content']
         return ""
     
+    def request_current_code(self, callback: Callable[[str], None]):
+        """Актуальный код текущей вкладки: из Monaco, ответ приходит в callback"""
+        current_index = self.tabs.currentIndex()
+        if not 0 <= current_index < len(self.tabs_data):
+            callback("")
+            return
+        data = self.tabs_data[current_index]
+        
+        def on_code(code):
+            self._store_tab_code(data, code)
+            callback(data['content'])
+        
+        self._request_code(data, on_code)
+    
     def set_current_code(self, code: str):
         """Устанавливаем код в текущем редакторе"""
         current_index = self.tabs.currentIndex()
         if 0 <= current_index < len(self.tabs_data):
             data = self.tabs_data[current_index]
-            view = data['view']
-            self._load_code_to_view(view, code, data['language'])
+            data['content'] = code
+            self._load_code_to_view(self.web_view, data)
     
     def on_tab_changed(self, index: int):
         """Обработка смены вкладки"""
         if 0 <= index < len(self.tabs_data):
             data = self.tabs_data[index]
-            self.language_label.setText(data['language'])
-            self.status_label.setText(f"Editing: {data['path']}")
+            # Та же вкладка (повторный сигнал) - ничего не меняется
+            if data is self._active_tab:
+                return
+            self._activate_tab(data)
+            self._invalidate_current_path()
+            self._update_status_labels(language_label=data['language'],
+                                       status_label=f"Editing: {data['path']}")
             
             # ОБНОВЛЯЕМ GIT WIDGET ПРИ СМЕНЕ ВКЛАДКИ
-            if self.git_widget.isVisible():
+            if self.git_widget is not None and self.git_widget.isVisible():
                 self.git_widget.update_path(self.current_path)
     
     def on_extension_loaded(self, name: str):
@@ -4794,50 +7504,96 @@ Modified: {mtime}
         msg.setIconPixmap(QPixmap())  # Можно добавить иконку
         msg.exec()
     
+    # Цвет и значок строки лога по уровню
+    _LOG_LEVELS = {
+        'error': ("#ff6b6b", "❌"),
+        'warning': ("#ffa500", "⚠️"),
+        'info': ("#4ecdc4", "ℹ️"),
+        'success': ("#5cdb95", "✅"),
+    }
+    _LOG_DEFAULT = ("#ffffff", "📝")
+    
     def log(self, message: str, level: str = "info"):
         """Логирование в терминал с защитой от отсутствия terminal"""
+        # Из фонового потока виджеты и таймеры не трогаем - пересылаем сигналом
+        if threading.current_thread() is not threading.main_thread():
+            self._log_from_thread.emit(message, level)
+            return
+        
         # Проверяем создан ли terminal
-        if not hasattr(self, 'terminal') or self.terminal is None:
+        if self.terminal is None:
             # Если terminal ещё не создан, просто выводим в консоль
             print(f"[{level.upper()}] {message}")
             return
         
         timestamp = datetime.now().strftime("%H:%M:%S")
+        prefix = self._LOG_LEVELS.get(level, self._LOG_DEFAULT)[1]
+        self._write_terminal(f"[{timestamp}] {prefix} {message}", level)
+    
+    def _write_terminal(self, text: str, level: Optional[str] = None):
+        """Ставим текст в очередь терминала (level=None - обычный вывод без цвета; только GUI поток)"""
+        self._terminal_queue.append((text, level))
+        if not self._terminal_timer.isActive():
+            self._terminal_timer.start()
+    
+    def _clear_terminal(self):
+        """Очищаем терминал вместе с недописанными строками"""
+        self._terminal_queue.clear()
+        self.terminal.clear()
+    
+    def _terminal_format(self, level: Optional[str]) -> QTextCharFormat:
+        """Формат строки уровня - создаётся один раз"""
+        fmt = self._terminal_formats.get(level)
+        if fmt is None:
+            fmt = QTextCharFormat()
+            if level is not None:
+                fmt.setForeground(QColor(self._LOG_LEVELS.get(level, self._LOG_DEFAULT)[0]))
+            self._terminal_formats[level] = fmt
+        return fmt
+    
+    def _flush_terminal(self):
+        """Дописываем накопленные строки одной правкой документа"""
+        if not self._terminal_queue:
+            return
         
-        if level == "error":
-            color = "#ff6b6b"
-            prefix = "❌"
-        elif level == "warning":
-            color = "#ffa500"
-            prefix = "⚠️"
-        elif level == "info":
-            color = "#4ecdc4"
-            prefix = "ℹ️"
-        elif level == "success":
-            color = "#5cdb95"
-            prefix = "✅"
-        else:
-            color = "#ffffff"
-            prefix = "📝"
-        
-        html = f'<span style="color:{color}">[{timestamp}] {prefix} {message}</span><br>'
-        self.terminal.append(html)
+        document = self.terminal.document()
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        first = document.isEmpty()
+        cursor.beginEditBlock()
+        while self._terminal_queue:
+            text, level = self._terminal_queue.popleft()
+            if not first:
+                cursor.insertBlock()
+            first = False
+            cursor.insertText(text, self._terminal_format(level))
+        cursor.endEditBlock()
         
         # Прокручиваем вниз
         scrollbar = self.terminal.verticalScrollBar()
         scrollbar.setValue(scrollbar.maximum())
 
+    @staticmethod
+    def _settings_bytes(key: str) -> Optional[QByteArray]:
+        """Двоичное значение настройки; старые версии хранили его hex-строкой"""
+        value = SETTINGS.value(key)
+        if isinstance(value, str):
+            return QByteArray.fromHex(value.encode()) if value else None
+        if isinstance(value, (bytes, bytearray)):
+            value = QByteArray(value)
+        return value if isinstance(value, QByteArray) and not value.isEmpty() else None
+    
     def restore_settings(self):
         """Восстанавливаем настройки"""
         # Геометрия окна
-        geometry = SETTINGS.value("geometry")
-        if geometry:
-            self.restoreGeometry(QByteArray.fromHex(geometry.encode()))
+        geometry = self._settings_bytes("geometry")
+        if geometry is not None:
+            self.restoreGeometry(geometry)
         
         # Состояние разделителей
-        splitter_state = SETTINGS.value("splitter_state")
-        if splitter_state:
-            self.main_splitter.restoreState(QByteArray.fromHex(splitter_state.encode()))
+        splitter_state = self._settings_bytes("splitter_state")
+        if splitter_state is not None:
+            self.main_splitter.restoreState(splitter_state)
         
         # Видимость панелей
         explorer_visible = SETTINGS.value("explorer_visible", True, type=bool)
@@ -4847,98 +7603,164 @@ Modified: {mtime}
         terminal_visible = SETTINGS.value("terminal_visible", True, type=bool)
         self.terminal.setVisible(terminal_visible)
     
+    def changeEvent(self, event):
+        """Сообщаем странице редактора, что окно свёрнуто или развёрнуто"""
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange and self.web_view is not None:
+            visible = 'false' if self.isMinimized() else 'true'
+            self.web_view.page().runJavaScript(
+                f"window.__setEditorVisible && window.__setEditorVisible({visible})")
+    
     def closeEvent(self, event):
         """Обработка закрытия окна"""
+        # Код активной вкладки приходит асинхронно - сначала дожидаемся его
+        if not self._close_ready:
+            event.ignore()
+            self._collect_code_then_close()
+            return
+        
         # Сохраняем настройки
-        SETTINGS.setValue("geometry", self.saveGeometry().toHex().decode())
-        SETTINGS.setValue("splitter_state", self.main_splitter.saveState().toHex().decode())
+        # QSettings хранит QByteArray сам - без перевода в hex
+        SETTINGS.setValue("geometry", self.saveGeometry())
+        SETTINGS.setValue("splitter_state", self.main_splitter.saveState())
         SETTINGS.setValue("explorer_visible", self.explorer.isVisible())
         SETTINGS.setValue("terminal_visible", self.terminal.isVisible())
         
-        # Сохраняем все файлы
-        self.save_all()
+        # Пишем только изменённые файлы, одним проходом по кэшу
+        self._save_cached_tabs()
         
         # Выгружаем расширения
         self.ext_manager.reload_all_extensions()
         
+        # Реестр расширений пишется с задержкой — дописываем перед выходом
+        self.ext_manager.flush_manifest()
+        
+        # Останавливаем постоянные процессы git и оболочки расширений
+        self.git_manager.shutdown()
+        self.api.shutdown()
+        self._stop_script()
+        
         event.accept()
 
 # ===== Главная функция =====
-def main():
-    app = QApplication(sys.argv)
-    
-    # ЗАГРУЗКА ИКОНКИ ПРИЛОЖЕНИЯ
-    # Сначала пробуем загрузить иконку из текущей папки
-    icon_path = "LudvigEditor.png"
-    
-    # Если не нашли в текущей папке, пробуем рядом с исполняемым файлом
-    if not os.path.exists(icon_path):
-        # Получаем директорию, где находится скрипт
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        icon_path = os.path.join(script_dir, "LudvigEditor.png")
-    
-    # Пробуем загрузить PNG
-    if os.path.exists(icon_path):
-        try:
-            app.setWindowIcon(QIcon(icon_path))
-            print(f"✅ Иконка загружена: {icon_path}")
-        except Exception as e:
-            print(f"❌ Ошибка загрузки PNG иконки: {e}")
-            # Пробуем альтернативные форматы
-            icon_path_ico = icon_path.replace('.png', '.ico')
-            if os.path.exists(icon_path_ico):
-                try:
-                    app.setWindowIcon(QIcon(icon_path_ico))
-                    print(f"✅ Загружена ICO иконка: {icon_path_ico}")
-                except Exception as e2:
-                    print(f"❌ Ошибка загрузки ICO иконки: {e2}")
+# Иконка, вшитая в ресурсы Qt, необязательна: ludvigeditor_rc.py собирается из .qrc
+# (pyside6-rcc, импорт PySide6 в нём заменяется на PyQt6) - тогда диск не трогаем вовсе
+try:
+    import ludvigeditor_rc  # noqa: F401  - регистрирует ресурсы при импорте
+    _RESOURCE_ICON = ":/LudvigEditor.png"
+except ImportError:
+    _RESOURCE_ICON = None
+
+# Где искать иконку: (папка, имя) в порядке приоритета; None - текущая папка
+_APP_ICON_CANDIDATES = (
+    (None, "LudvigEditor.png"),
+    (_SCRIPT_DIR, "LudvigEditor.png"),
+    (None, "icon.png"),
+    (None, "icon.ico"),
+    (None, "LudvigEditor.ico"),
+    (os.path.expanduser("~"), "LudvigEditor.png"),
+)
+
+def _find_app_icon(limit: int = len(_APP_ICON_CANDIDATES), cwd_only: bool = False) -> tuple:
+    """Первая иконка среди первых limit вариантов: (номер варианта, путь) или (None, None)
+    
+    По одному scandir на папку вместо exists на каждый вариант; имена сравниваем
+    через normcase - на Windows регистр не важен, как и для exists.
+    """
+    listings: Dict[str, dict] = {}
+    for rank, (folder, name) in enumerate(_APP_ICON_CANDIDATES[:limit]):
+        if cwd_only and folder is not None:
+            continue
+        folder = folder or os.getcwd()
+        names = listings.get(folder)
+        if names is None:
+            try:
+                with os.scandir(folder) as entries:
+                    names = {os.path.normcase(entry.name): entry.name for entry in entries}
+            except OSError:
+                names = {}
+            listings[folder] = names
+        actual = names.get(os.path.normcase(name))
+        if actual is not None:
+            return rank, os.path.join(folder, actual)
+    return None, None
+
+# Палитра приложения: роль -> RGB (QColor создаются уже в _app_palette)
+_PALETTE_COLORS = (
+    (QPalette.ColorRole.Window, (26, 27, 58)),
+    (QPalette.ColorRole.WindowText, (255, 255, 255)),
+    (QPalette.ColorRole.Base, (40, 41, 82)),
+    (QPalette.ColorRole.AlternateBase, (50, 51, 102)),
+    (QPalette.ColorRole.ToolTipBase, (255, 255, 255)),
+    (QPalette.ColorRole.ToolTipText, (255, 255, 255)),
+    (QPalette.ColorRole.Text, (255, 255, 255)),
+    (QPalette.ColorRole.Button, (63, 43, 150)),
+    (QPalette.ColorRole.ButtonText, (255, 255, 255)),
+    (QPalette.ColorRole.BrightText, (255, 0, 0)),
+    (QPalette.ColorRole.Link, (155, 93, 229)),
+    (QPalette.ColorRole.Highlight, (155, 93, 229)),
+    (QPalette.ColorRole.HighlightedText, (255, 255, 255)),
+)
+
+def _app_palette() -> QPalette:
+    """Собираем палитру приложения из _PALETTE_COLORS"""
+    palette = QPalette()
+    for role, rgb in _PALETTE_COLORS:
+        palette.setColor(role, QColor(*rgb))
+    return palette
+
+def _load_app_icon(app: QApplication):
+    """Ставим иконку приложения; найденный путь запоминаем до следующего запуска"""
+    if _RESOURCE_ICON is not None:
+        app.setWindowIcon(QIcon(_RESOURCE_ICON))
+        return
+    
+    icon_path = SETTINGS.value("app/icon_path", "", type=str)
+    if icon_path and os.path.isfile(icon_path):
+        # Запомнена только находка вне текущей папки; варианты из текущей папки
+        # с большим приоритетом проверяем при каждом запуске
+        rank = SETTINGS.value("app/icon_rank", len(_APP_ICON_CANDIDATES), type=int)
+        icon_path = _find_app_icon(rank, cwd_only=True)[1] or icon_path
     else:
-        # Пробуем другие возможные пути
-        alt_paths = [
-            "icon.png",
-            "icon.ico",
-            "LudvigEditor.ico",
-            os.path.join(os.path.expanduser("~"), "LudvigEditor.png"),
-            os.path.join(os.getcwd(), "LudvigEditor.png")
-        ]
-        
-        for alt_path in alt_paths:
-            if os.path.exists(alt_path):
-                try:
-                    app.setWindowIcon(QIcon(alt_path))
-                    print(f"✅ Альтернативная иконка загружена: {alt_path}")
-                    break
-                except Exception as e:
-                    continue
-        
-        # Если вообще не нашли иконку
-        if app.windowIcon().isNull():
+        rank, icon_path = _find_app_icon()
+        if icon_path is None:
+            SETTINGS.remove("app/icon_path")
             print("⚠️ Иконка не найдена, используется стандартная")
+            return
+        if _APP_ICON_CANDIDATES[rank][0] is not None:
+            SETTINGS.setValue("app/icon_path", icon_path)
+            SETTINGS.setValue("app/icon_rank", rank)
+        else:
+            # Текущая папка меняется от запуска к запуску - такую находку не запоминаем
+            SETTINGS.remove("app/icon_path")
+    
+    app.setWindowIcon(QIcon(icon_path))
+
+def main():
+    # QtWebEngine импортируется лениво, уже после создания QApplication —
+    # для этого Qt требует общий OpenGL контекст
+    QApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+    app = QApplication(sys.argv)
     
-    # Настройка стиля приложения
-    app.setStyle("Fusion")
+    # Настройка стиля приложения (Fusion часто уже стоит по умолчанию - не пересоздаём)
+    if app.style().name().lower() != "fusion":
+        app.setStyle("Fusion")
     
     # Настройка палитры
-    palette = QPalette()
-    palette.setColor(QPalette.ColorRole.Window, QColor(26, 27, 58))
-    palette.setColor(QPalette.ColorRole.WindowText, QColor(255, 255, 255))
-    palette.setColor(QPalette.ColorRole.Base, QColor(40, 41, 82))
-    palette.setColor(QPalette.ColorRole.AlternateBase, QColor(50, 51, 102))
-    palette.setColor(QPalette.ColorRole.ToolTipBase, QColor(255, 255, 255))
-    palette.setColor(QPalette.ColorRole.ToolTipText, QColor(255, 255, 255))
-    palette.setColor(QPalette.ColorRole.Text, QColor(255, 255, 255))
-    palette.setColor(QPalette.ColorRole.Button, QColor(63, 43, 150))
-    palette.setColor(QPalette.ColorRole.ButtonText, QColor(255, 255, 255))
-    palette.setColor(QPalette.ColorRole.BrightText, QColor(255, 0, 0))
-    palette.setColor(QPalette.ColorRole.Link, QColor(155, 93, 229))
-    palette.setColor(QPalette.ColorRole.Highlight, QColor(155, 93, 229))
-    palette.setColor(QPalette.ColorRole.HighlightedText, QColor(255, 255, 255))
-    app.setPalette(palette)
+    app.setPalette(_app_palette())
+    
+    # Плагины картинок (qico и т.п.) Qt грузит при первом декодировании - пусть
+    # это случится в пуле потоков, пока строится окно, а не при отрисовке иконки
+    run_in_background(QImageReader.supportedImageFormats)
     
     # Создание и запуск главного окна
     window = LudvigEditor()
     window.show()
     
+    # ЗАГРУЗКА ИКОНКИ ПРИЛОЖЕНИЯ - уже после первой отрисовки окна;
+    # setWindowIcon у приложения обновит и открытые окна
+    QTimer.singleShot(0, lambda: _load_app_icon(app))
+    
     sys.exit(app.exec())
 
 if __name__ == "__main__":
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+from PyQt6 import QtCore  # noqa: E402
+
+import ludvigeditor  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def test_set_root_path_finds_folder_created_after_parent_listed(app, tmp_path):
+    model = ludvigeditor.LazyFileSystemModel()
+    assert model.setRootPath(str(tmp_path)).isValid()
+
+    new_dir = tmp_path / "created_later"
+    new_dir.mkdir()
+
+    index = model.setRootPath(str(new_dir))
+    assert index.isValid()
+    assert os.path.normcase(model.filePath(index)) == os.path.normcase(str(new_dir))
+
+
+def _wait_for_scans(app):
+    # Папки читаются в пуле потоков, результат приходит сигналом в GUI поток
+    QtCore.QThreadPool.globalInstance().waitForDone()
+    app.processEvents()
+
+
+def test_refresh_keeps_expanded_subfolder(app, tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "inner.txt").write_text("")
+
+    model = ludvigeditor.LazyFileSystemModel()
+    view = QtWidgets.QTreeView()
+    view.setModel(model)
+    root = model.setRootPath(str(tmp_path))
+    view.setRootIndex(root)
+    if model.canFetchMore(root):
+        model.fetchMore(root)
+    _wait_for_scans(app)
+
+    sub = model.index(0, 0, root)
+    assert model.filePath(sub) == str(tmp_path / "sub")
+    model.fetchMore(sub)
+    _wait_for_scans(app)
+    view.expand(sub)
+    assert view.isExpanded(sub)
+
+    (tmp_path / "new.txt").write_text("")
+    model.refresh(str(tmp_path))
+    _wait_for_scans(app)
+
+    assert model.rowCount(root) == 2
+    sub = model.index(0, 0, root)
+    assert view.isExpanded(sub)
+    assert model.rowCount(sub) == 1